@@ -0,0 +1,41 @@
+"""
+Сравнение сериализации приказа: Order из Item против колоночного BulkOrder.
+
+Запуск: python benchmarks/bench_bulk_order.py [items]
+"""
+from __future__ import annotations
+
+import sys
+import time
+import uuid
+
+from iiko_api.models import BulkOrder, Item, Order
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    departments = [str(uuid.uuid4()) for _ in range(60)]
+    product_ids = [str(uuid.uuid4()) for _ in range(size)]
+    department_ids = [departments[i % len(departments)] for i in range(size)]
+    prices = [100 + i % 900 for i in range(size)]
+
+    started = time.perf_counter()
+    items = [
+        Item(departmentId=department, productId=product, price=price)
+        for department, product, price in zip(department_ids, product_ids, prices, strict=True)
+    ]
+    pydantic_json = Order(dateIncoming="2024-12-23", items=items).model_dump_json()
+    pydantic_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bulk_json = BulkOrder("2024-12-23", product_ids, department_ids, prices).model_dump_json()
+    bulk_time = time.perf_counter() - started
+
+    assert bulk_json == pydantic_json
+    print(f"items: {size}")
+    print(f"Order + Item: {pydantic_time * 1000:8.1f} ms")
+    print(f"BulkOrder:    {bulk_time * 1000:8.1f} ms ({pydantic_time / bulk_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Себестоимость блюд: поблюдное разложение техкарт против FoodCostMatrix (NumPy и чистый Python).
+
+Запуск: python benchmarks/bench_food_cost.py [dishes]
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from functools import partial
+
+from iiko_api.charts import AssemblyChartGraph, FoodCostMatrix
+
+
+def make_graph(dishes: int, semis: int = 300, ingredients: int = 2000) -> AssemblyChartGraph:
+    rnd = random.Random(42)
+    charts = [
+        {
+            "assembledProductId": f"semi-{n}",
+            "dateFrom": "2026-01-01",
+            "assembledAmount": 1.0,
+            "items": [{"productId": f"ing-{rnd.randrange(ingredients)}", "amountIn": 0.1} for _ in range(6)],
+        }
+        for n in range(semis)
+    ]
+    charts += [
+        {
+            "assembledProductId": f"dish-{n}",
+            "dateFrom": "2026-01-01",
+            "assembledAmount": 1.0,
+            "items": [
+                {"productId": rnd.choice((f"semi-{rnd.randrange(semis)}", f"ing-{rnd.randrange(ingredients)}")),
+                 "amountIn": 0.2}
+                for _ in range(8)
+            ],
+        }
+        for n in range(dishes)
+    ]
+    return AssemblyChartGraph(charts)
+
+
+def best_of(func, repeat: int = 5) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    dishes = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    graph = make_graph(dishes)
+    dish_ids = [f"dish-{n}" for n in range(dishes)]
+    rnd = random.Random(7)
+
+    started = time.perf_counter()
+    matrix = FoodCostMatrix(graph, dish_ids, on_date="2026-02-01")
+    build_time = time.perf_counter() - started
+    prices = {ingredient: rnd.uniform(10, 1000) for ingredient in matrix.ingredients}
+    print(f"dishes: {dishes}, ingredients: {len(matrix.ingredients)}, nnz: {matrix.nnz}, build: {build_time:.2f} s")
+
+    def per_dish() -> None:
+        for dish in dish_ids:
+            sum(quantity * prices[ingredient] for ingredient, quantity in graph.expand(dish, on_date="2026-02-01").items())
+
+    baseline = best_of(per_dish, repeat=1)
+    print(f"{'per-dish expand':<22}: {baseline * 1000:8.1f} ms")
+
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        print(f"{'matrix numpy':<22}: numpy не установлен")
+    else:
+        report("matrix numpy", matrix, prices, baseline)
+    # Без NumPy: FoodCostMatrix выбирает путь на чистом Python
+    sys.modules["numpy"] = None  # type: ignore[assignment]
+    report("matrix python", FoodCostMatrix(graph, dish_ids, on_date="2026-02-01"), prices, baseline)
+
+
+def report(label: str, matrix: FoodCostMatrix, prices: dict[str, float], baseline: float) -> None:
+    compute_time = best_of(partial(matrix.compute, prices))
+    changes = {ingredient: prices[ingredient] * 1.1 for ingredient in matrix.ingredients[:10]}
+    update_time = best_of(partial(matrix.update, changes))
+    print(
+        f"{label:<22}: compute {compute_time * 1000:8.1f} ms ({baseline / compute_time:.1f}x)   "
+        f"update(10 ingredients) {update_time * 1000:6.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
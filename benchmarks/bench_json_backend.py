@@ -0,0 +1,53 @@
+"""
+Сравнение JSON-декодеров на синтетическом OLAP-ответе.
+
+Запуск: python benchmarks/bench_json_backend.py [rows]
+"""
+from __future__ import annotations
+
+import json
+import random
+import sys
+import timeit
+from functools import partial
+
+from iiko_api.core.json_backend import JSON_BACKENDS, get_json_backend
+
+
+def make_payload(rows: int) -> bytes:
+    rnd = random.Random(42)
+    data = [
+        {
+            "OpenDate.Typed": f"2026-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            "Department.Id": f"dept-{rnd.randint(1, 60)}",
+            "DishName": f"Блюдо {rnd.randint(1, 500)}",
+            "DishAmountInt": rnd.randint(1, 50),
+            "DishDiscountSumInt": round(rnd.uniform(10, 50000), 2),
+        }
+        for _ in range(rows)
+    ]
+    return json.dumps({"data": data}, ensure_ascii=False).encode()
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payload = make_payload(rows)
+    print(f"payload: {rows} rows, {len(payload) / 1e6:.1f} MB")
+    baseline = None
+    for name in JSON_BACKENDS:
+        try:
+            backend = get_json_backend(name)
+        except ImportError:
+            print(f"{name:>8}: не установлен")
+            continue
+        for decimal in (False, True):
+            best = min(timeit.repeat(partial(backend.loads, payload, decimal=decimal), number=1, repeat=5))
+            if name == "json" and decimal:
+                baseline = best
+            print(f"{name:>8} decimal={decimal!s:<5}: {best * 1000:8.1f} ms")
+    if baseline:
+        print(f"baseline (json, parse_float=Decimal): {baseline * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Сравнение разбора денежной колонки: построчный _parse_money_decimal против parse_money_column.
+
+Запуск: python benchmarks/bench_money_column.py [values]
+"""
+from __future__ import annotations
+
+import sys
+import time
+from decimal import Decimal
+
+from iiko_api.endpoints.olap import _parse_money_decimal
+from iiko_api.olap.money import parse_money_column
+from iiko_api.olap.stream import RawNumber
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    texts = [f"{i * 37 % 1_000_000}.{i % 1000:03d}" for i in range(size)]
+    columns = {
+        "Decimal": [Decimal(text) for text in texts],
+        "RawNumber": [RawNumber(text) for text in texts],
+        "float": [float(text) for text in texts],
+    }
+
+    print(f"values: {size}")
+    for name, values in columns.items():
+        started = time.perf_counter()
+        expected = [int(_parse_money_decimal(value, field=name).scaleb(2)) for value in values]
+        per_value_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        column = parse_money_column(values, field=name)
+        column_time = time.perf_counter() - started
+
+        assert list(column) == expected
+        print(
+            f"{name:<10} per-value: {per_value_time * 1000:8.1f} ms   "
+            f"column: {column_time * 1000:8.1f} ms ({per_value_time / column_time:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,27 @@
 from .exceptions import (
+    AssemblyChartCycleError,
     EmployeeNotFoundError,
     IikoAPIError,
     IikoConnectionError,
     IikoNotFoundError,
     IikoTimeoutError,
+    IikoValidationError,
     RoleNotFoundError,
 )
 from .iiko_api import IikoApi
 from .services.price_order import IikoPriceOrderService
+from .services.product_import import IikoProductImportService
 
 __all__ = [
     'IikoApi',
     'IikoPriceOrderService',
+    'IikoProductImportService',
     'IikoAPIError',
     'IikoNotFoundError',
     'RoleNotFoundError',
     'EmployeeNotFoundError',
     'IikoTimeoutError',
-    'IikoConnectionError'
+    'IikoConnectionError',
+    'IikoValidationError',
+    'AssemblyChartCycleError',
 ]
@@ -0,0 +1,27 @@
+from iiko_api.endpoints.olap import build_dish_sales_olap_body
+
+from .cost import FoodCostMatrix, ingredient_costs_from_balance
+from .dag import AssemblyChartGraph
+from .demand import (
+    DemandPlan,
+    IngredientShortfall,
+    department_stores,
+    dish_sales_from_olap,
+    forecast_by_weekday,
+)
+from .resolver import ChartEdge, ChartResolver, ChartVersion
+
+__all__ = [
+    'AssemblyChartGraph',
+    'ChartEdge',
+    'ChartResolver',
+    'ChartVersion',
+    'DemandPlan',
+    'FoodCostMatrix',
+    'IngredientShortfall',
+    'build_dish_sales_olap_body',
+    'department_stores',
+    'dish_sales_from_olap',
+    'forecast_by_weekday',
+    'ingredient_costs_from_balance',
+]
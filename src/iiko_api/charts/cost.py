@@ -0,0 +1,330 @@
+"""
+Себестоимость блюд по техкартам и остаткам складов.
+
+Блюда раскладываются до конечных ингредиентов (``AssemblyChartGraph``), по разложению строится
+разреженная матрица блюдо × ингредиент (CSR для расчета всех блюд, CSC для обновлений),
+себестоимость всех блюд — одно умножение матрицы на вектор цен ингредиентов (с NumPy — векторно,
+``np.bincount`` по строкам матрицы; без NumPy — циклом Python по тем же массивам CSR). Цена ингредиента —
+средняя по остаткам складов (``sum / amount`` из ``get_stores_balance``). При изменении цены
+нескольких ингредиентов пересчитываются только блюда, в которые они входят.
+
+Цены и себестоимость хранятся в целых единицах 10^-4 рубля (int64): количества ингредиентов
+остаются float, но сумма строки округляется (HALF_UP) один раз, а наружу отдается ``Decimal``.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Mapping
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any
+
+from iiko_api.charts.dag import AssemblyChartGraph
+from iiko_api.endpoints.assembly_charts import AMOUNT_DIGITS
+from iiko_api.endpoints.stores import balance_rows
+
+# Знаков после запятой в ценах и себестоимости
+COST_SCALE = 4
+_COST_QUANTUM = Decimal(1).scaleb(-COST_SCALE)
+
+
+def _as_decimal(value: Any, *, what: str) -> Decimal:
+    """Число как Decimal без двоичных артефактов float (None и "" — 0)."""
+    if value is None or value == "":
+        return Decimal(0)
+    if isinstance(value, bool):
+        raise ValueError(f"Некорректное значение {what}: {value!r}")
+    try:
+        number = value if isinstance(value, Decimal) else Decimal(str(value))
+    except (InvalidOperation, ValueError) as e:
+        raise ValueError(f"Некорректное значение {what}: {value!r}") from e
+    if not number.is_finite():
+        raise ValueError(f"Некорректное значение {what}: {value!r}")
+    return number
+
+
+def _to_units(value: Any, *, what: str) -> int:
+    """Цена в целых единицах 10^-COST_SCALE (HALF_UP)."""
+    return int(_as_decimal(value, what=what).scaleb(COST_SCALE).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _to_decimal(units: int) -> Decimal:
+    return Decimal(int(units)).scaleb(-COST_SCALE)
+
+
+def _round_units(value: float) -> int:
+    """Сумма строки в целых единицах (HALF_UP, как у Decimal)."""
+    return int(math.copysign(math.floor(abs(value) + 0.5), value))
+
+
+def ingredient_costs_from_balance(
+    balance: Any,
+    *,
+    store_ids: Iterable[str] | None = None,
+) -> dict[str, Decimal]:
+    """
+    Цена единицы каждого продукта по остаткам складов.
+
+    Цена — сумма остатков, деленная на их количество по выбранным складам (в Decimal,
+    с округлением до 10^-4 HALF_UP); строки с неположительным количеством не учитываются.
+
+    :param balance: ответ get_stores_balance (список строк store, product, amount, sum)
+    :param store_ids: склады, по которым считается цена (по умолчанию все)
+    :return: цена по UUID продукта
+    :raises ValueError: если amount или sum строки не является числом
+    """
+    stores = set(store_ids) if store_ids is not None else None
+    amounts: dict[str, Decimal] = {}
+    sums: dict[str, Decimal] = {}
+    for row in balance_rows(balance):
+        if not isinstance(row, Mapping) or (stores is not None and row.get("store") not in stores):
+            continue
+        product_id = row.get("product")
+        amount = _as_decimal(row.get("amount"), what=f"amount остатка {product_id}")
+        if not product_id or amount <= 0:
+            continue
+        amounts[product_id] = amounts.get(product_id, Decimal(0)) + amount
+        sums[product_id] = sums.get(product_id, Decimal(0)) + _as_decimal(row.get("sum"), what=f"sum остатка {product_id}")
+    return {
+        product_id: (sums[product_id] / amount).quantize(_COST_QUANTUM, rounding=ROUND_HALF_UP)
+        for product_id, amount in amounts.items()
+    }
+
+
+class FoodCostMatrix:
+    """
+    Разреженная матрица блюдо × конечный ингредиент с расчетом себестоимости.
+
+    :param graph: граф техкарт
+    :param dishes: UUID блюд (по умолчанию все продукты графа)
+    :param on_date: дата действия техкарт (по умолчанию сегодня)
+    :param department_id: подразделение для storeSpecification строк техкарт
+    :raises AssemblyChartCycleError: если техкарты образуют цикл
+    """
+
+    def __init__(
+        self,
+        graph: AssemblyChartGraph,
+        dishes: Iterable[str] | None = None,
+        *,
+        on_date: date | str | None = None,
+        department_id: str | None = None,
+    ):
+        self.dishes: list[str] = list(dict.fromkeys(graph.products if dishes is None else dishes))
+        self.ingredients: list[str] = []
+        self._dish_index = {dish: row for row, dish in enumerate(self.dishes)}
+        self._ingredient_index: dict[str, int] = {}
+
+        # CSR: строки — блюда
+        self._indptr = array("l", [0])
+        self._indices = array("l")
+        self._data = array("d")
+        for dish in self.dishes:
+            for ingredient, quantity in graph.expand(dish, on_date=on_date, department_id=department_id).items():
+                column = self._ingredient_index.get(ingredient)
+                if column is None:
+                    column = self._ingredient_index[ingredient] = len(self.ingredients)
+                    self.ingredients.append(ingredient)
+                self._indices.append(column)
+                self._data.append(quantity)
+            self._indptr.append(len(self._indices))
+
+        # CSC: столбцы — ингредиенты (для пересчета блюд при изменении цены ингредиента)
+        counts = [0] * (len(self.ingredients) + 1)
+        for column in self._indices:
+            counts[column + 1] += 1
+        for column in range(len(self.ingredients)):
+            counts[column + 1] += counts[column]
+        self._col_ptr = array("l", counts)
+        self._col_rows = array("l", [0]) * len(self._indices)
+        cursor = list(counts[:-1])
+        for row in range(len(self.dishes)):
+            for k in range(self._indptr[row], self._indptr[row + 1]):
+                column = self._indices[k]
+                self._col_rows[cursor[column]] = row
+                cursor[column] += 1
+
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        self._np = np
+        if np is not None:
+            # Представления массивов CSR/CSC без копирования и номер строки каждого элемента
+            self._np_indptr = np.frombuffer(self._indptr, dtype=self._indptr.typecode)
+            self._np_indices = np.frombuffer(self._indices, dtype=self._indices.typecode)
+            self._np_data = np.frombuffer(self._data, dtype=self._data.typecode)
+            self._np_rows = np.repeat(np.arange(len(self.dishes)), np.diff(self._np_indptr))
+            self._np_col_rows = np.frombuffer(self._col_rows, dtype=self._col_rows.typecode)
+            self._prices = np.zeros(len(self.ingredients), dtype=np.int64)
+            self._costs = np.zeros(len(self.dishes), dtype=np.int64)
+        else:
+            self._prices = array("q", bytes(8 * len(self.ingredients)))
+            self._costs = array("q", bytes(8 * len(self.dishes)))
+        self._unpriced: set[str] | None = None
+
+    def __len__(self) -> int:
+        return len(self.dishes)
+
+    @property
+    def nnz(self) -> int:
+        """Число ненулевых элементов матрицы."""
+        return len(self._data)
+
+    def row(self, dish: str) -> dict[str, float]:
+        """Количество конечных ингредиентов на единицу блюда."""
+        row = self._dish_index[dish]
+        return {
+            self.ingredients[self._indices[k]]: self._data[k]
+            for k in range(self._indptr[row], self._indptr[row + 1])
+        }
+
+    def ingredient_demand(self, quantities: Mapping[str, float]) -> dict[str, float]:
+        """
+        Потребность в конечных ингредиентах для количеств блюд (вектор количеств × матрица).
+
+        Блюда, которых нет в матрице, игнорируются. Количества округляются до AMOUNT_DIGITS знаков
+        (точность количеств в техкартах), поэтому пути NumPy и Python дают одинаковый результат.
+
+        :param quantities: количество по UUID блюда
+        :return: количество по UUID ингредиента
+        """
+        np = self._np
+        if np is not None:
+            vector = np.zeros(len(self.dishes))
+            for dish, quantity in quantities.items():
+                row = self._dish_index.get(dish)
+                if row is not None:
+                    vector[row] += quantity
+            weights = vector[self._np_rows]
+            totals = np.bincount(self._np_indices, weights=self._np_data * weights, minlength=len(self.ingredients))
+            touched = np.bincount(self._np_indices, weights=weights != 0, minlength=len(self.ingredients)) > 0
+            return {
+                self.ingredients[column]: round(float(totals[column]), AMOUNT_DIGITS)
+                for column in np.flatnonzero(touched).tolist()
+            }
+
+        totals = [0.0] * len(self.ingredients)
+        touched = bytearray(len(self.ingredients))
+        indptr, indices, data = self._indptr, self._indices, self._data
+        for dish, quantity in quantities.items():
+            row = self._dish_index.get(dish)
+            if row is None or not quantity:
+                continue
+            start, end = indptr[row], indptr[row + 1]
+            for column, value in zip(indices[start:end], data[start:end], strict=True):
+                totals[column] += value * quantity
+                touched[column] = 1
+        return {
+            ingredient: round(total, AMOUNT_DIGITS)
+            for ingredient, total, flag in zip(self.ingredients, totals, touched, strict=True)
+            if flag
+        }
+
+    def compute(self, prices: Mapping[str, Any]) -> dict[str, Decimal]:
+        """
+        Себестоимость всех блюд при заданных ценах ингредиентов.
+
+        Ингредиенты без цены считаются бесплатными (см. unpriced).
+
+        :param prices: цена единицы по UUID ингредиента (Decimal, int, float или str)
+        :return: себестоимость единицы по UUID блюда (Decimal, 4 знака после запятой)
+        :raises ValueError: если цена не является числом
+        """
+        self._unpriced = {ingredient for ingredient in self.ingredients if ingredient not in prices}
+        vector = array("q", (
+            _to_units(prices[ingredient], what=f"цены {ingredient}") if ingredient in prices else 0
+            for ingredient in self.ingredients
+        ))
+        np = self._np
+        if np is not None:
+            self._prices = np.frombuffer(vector, dtype=np.int64).copy()
+            weights = self._np_data * self._prices[self._np_indices]
+            self._costs = _round_units_numpy(np, np.bincount(self._np_rows, weights=weights, minlength=len(self.dishes)))
+            return self.costs
+
+        self._prices = vector
+        self._costs = array("q", (self._row_cost(row) for row in range(len(self.dishes))))
+        return self.costs
+
+    def _row_cost(self, row: int) -> int:
+        """Себестоимость строки в целых единицах по текущим ценам."""
+        indices, data, prices = self._indices, self._data, self._prices
+        return _round_units(math.fsum(
+            data[k] * prices[indices[k]] for k in range(self._indptr[row], self._indptr[row + 1])
+        ))
+
+    def _row_costs_numpy(self, rows: Any) -> Any:
+        """Себестоимость строк rows в целых единицах (суммы в том же порядке, что и в compute)."""
+        np = self._np
+        starts = self._np_indptr[rows]
+        lengths = self._np_indptr[rows + 1] - starts
+        # Позиции элементов выбранных строк подряд: start строки + смещение внутри строки
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        weights = self._np_data[positions] * self._prices[self._np_indices[positions]]
+        owners = np.repeat(np.arange(len(rows)), lengths)
+        return _round_units_numpy(np, np.bincount(owners, weights=weights, minlength=len(rows)))
+
+    def update(self, changes: Mapping[str, Any]) -> dict[str, Decimal]:
+        """
+        Пересчитывает себестоимость блюд, в которые входят ингредиенты с новыми ценами.
+
+        Затронутые блюда пересчитываются по всей строке матрицы (без накопления разностей),
+        поэтому результат совпадает с compute по новым ценам. Ингредиенты, которых нет
+        в матрице, игнорируются.
+
+        :param changes: новая цена по UUID ингредиента
+        :return: новая себестоимость затронутых блюд
+        :raises ValueError: если compute еще не вызывался или цена не является числом
+        """
+        if self._unpriced is None:
+            raise ValueError("Перед update нужно вызвать compute")
+        # Цены разбираются до изменения состояния: при ошибке матрица остается согласованной
+        units = {
+            ingredient: _to_units(price, what=f"цены {ingredient}")
+            for ingredient, price in changes.items() if ingredient in self._ingredient_index
+        }
+        columns = []
+        for ingredient, price in units.items():
+            column = self._ingredient_index[ingredient]
+            self._prices[column] = price
+            self._unpriced.discard(ingredient)
+            columns.append(column)
+
+        col_ptr = self._col_ptr
+        np = self._np
+        if np is not None:
+            if not columns:
+                return {}
+            rows = np.unique(np.concatenate([
+                self._np_col_rows[col_ptr[column]:col_ptr[column + 1]] for column in columns
+            ]))
+            self._costs[rows] = self._row_costs_numpy(rows)
+            affected = rows.tolist()
+        else:
+            affected = sorted({
+                self._col_rows[k] for column in columns for k in range(col_ptr[column], col_ptr[column + 1])
+            })
+            for row in affected:
+                self._costs[row] = self._row_cost(row)
+        return {self.dishes[row]: _to_decimal(self._costs[row]) for row in affected}
+
+    @property
+    def costs(self) -> dict[str, Decimal]:
+        """Текущая себестоимость единицы по UUID блюда."""
+        return {dish: _to_decimal(units) for dish, units in zip(self.dishes, self._costs.tolist(), strict=True)}
+
+    @property
+    def unpriced(self) -> set[str]:
+        """Ингредиенты, для которых не задана цена."""
+        return set(self.ingredients if self._unpriced is None else self._unpriced)
+
+    def cost_of(self, dish: str) -> Decimal:
+        """Текущая себестоимость единицы блюда."""
+        return _to_decimal(self._costs[self._dish_index[dish]])
+
+
+def _round_units_numpy(np: Any, values: Any) -> Any:
+    """_round_units для массива float64: int64 с округлением HALF_UP."""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values).astype(np.int64)
@@ -0,0 +1,158 @@
+"""
+Локальное разложение техкарт до конечных ингредиентов.
+
+``get_all_assembly_charts(include_prepared_charts=True)`` просит сервер разложить вложенные
+техкарты, и ответ становится в разы больше. ``AssemblyChartGraph`` строит граф
+продукт → ингредиент по исходным техкартам (``include_prepared_charts=False``) и раскладывает
+любое блюдо в процессе: количество ингредиента на единицу продукта — ``amountIn / assembledAmount``,
+заготовки раскладываются рекурсивно. Учитываются период действия техкарты и
+``storeSpecification`` строк (действующая версия техкарты берется из ``ChartResolver``),
+результаты разложения кэшируются, циклы обнаруживаются.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import date
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.charts.resolver import ChartEdge, ChartResolver, ChartVersion, chart_version  # noqa: F401
+from iiko_api.core.dates import as_day
+from iiko_api.exceptions import AssemblyChartCycleError
+from iiko_api.models.bulk import BulkAssemblyChart
+from iiko_api.models.models import AssemblyChart
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.assembly_charts import AssemblyChartsEndpoints
+
+
+class AssemblyChartGraph:
+    """
+    Граф техкарт: продукт → ингредиенты с разложением до конечных ингредиентов.
+
+    Конечный ингредиент — продукт, у которого нет техкарты, действующей на дату разложения.
+
+    :param charts: техкарты (AssemblyChart, BulkAssemblyChart или dict из get_all_assembly_charts)
+    """
+
+    def __init__(self, charts: Iterable[AssemblyChart | BulkAssemblyChart | Mapping[str, Any]]):
+        self.resolver = ChartResolver(charts)
+        self._memo: dict[tuple[str, date, str | None], dict[str, float]] = {}
+
+    @classmethod
+    def from_response(cls, payload: Mapping[str, Any]) -> AssemblyChartGraph:
+        """Граф по ответу get_all_assembly_charts (используется только assemblyCharts)."""
+        return cls(chart for chart in payload.get("assemblyCharts") or [] if isinstance(chart, Mapping))
+
+    @classmethod
+    def from_api(
+        cls,
+        assembly_charts: AssemblyChartsEndpoints,
+        date_from: str,
+        date_to: str | None = None,
+    ) -> AssemblyChartGraph:
+        """
+        Загружает исходные техкарты (include_prepared_charts=False) и строит граф.
+
+        :param assembly_charts: эндпоинты техкарт (``iiko_client.assembly_charts``)
+        :param date_from: начало периода в формате "yyyy-MM-dd"
+        :param date_to: окончание периода в формате "yyyy-MM-dd"
+        """
+        return cls.from_response(
+            assembly_charts.get_all_assembly_charts(date_from, date_to, include_prepared_charts=False)
+        )
+
+    @property
+    def products(self) -> list[str]:
+        """UUID продуктов, у которых есть техкарты."""
+        return self.resolver.products
+
+    def chart_for(self, product_id: str, on_date: date | str | None = None) -> ChartVersion | None:
+        """
+        Техкарта продукта, действующая на дату (при пересечении — с самой поздней датой начала).
+
+        :param product_id: UUID продукта
+        :param on_date: дата (по умолчанию сегодня)
+        """
+        return self.resolver.effective(product_id, on_date)
+
+    def expand(
+        self,
+        product_id: str,
+        amount: float = 1.0,
+        *,
+        on_date: date | str | None = None,
+        department_id: str | None = None,
+    ) -> dict[str, float]:
+        """
+        Раскладывает количество продукта до конечных ингредиентов.
+
+        :param product_id: UUID продукта
+        :param amount: количество продукта
+        :param on_date: дата действия техкарт (по умолчанию сегодня)
+        :param department_id: подразделение для storeSpecification строк
+            (без него учитываются только строки без ограничений)
+        :return: количество каждого конечного ингредиента
+        :raises AssemblyChartCycleError: если техкарты образуют цикл
+        """
+        per_unit = self._expand_unit(product_id, as_day(on_date), department_id, [])
+        return {ingredient: quantity * amount for ingredient, quantity in per_unit.items()}
+
+    def expand_many(
+        self,
+        demand: Mapping[str, float],
+        *,
+        on_date: date | str | None = None,
+        department_id: str | None = None,
+    ) -> dict[str, float]:
+        """
+        Раскладывает набор продуктов и суммирует конечные ингредиенты.
+
+        :param demand: количество по UUID продукта
+        :return: суммарное количество каждого конечного ингредиента
+        """
+        day = as_day(on_date)
+        totals: dict[str, float] = {}
+        for product_id, amount in demand.items():
+            for ingredient, quantity in self._expand_unit(product_id, day, department_id, []).items():
+                totals[ingredient] = totals.get(ingredient, 0.0) + quantity * amount
+        return totals
+
+    def check_cycles(self, on_date: date | str | None = None, department_id: str | None = None) -> None:
+        """
+        Раскладывает все продукты графа на дату, чтобы обнаружить циклы.
+
+        :raises AssemblyChartCycleError: если техкарты образуют цикл
+        """
+        day = as_day(on_date)
+        for product_id in self.resolver.products:
+            self._expand_unit(product_id, day, department_id, [])
+
+    def _expand_unit(
+        self,
+        product_id: str,
+        day: date,
+        department_id: str | None,
+        path: list[str],
+    ) -> dict[str, float]:
+        """Конечные ингредиенты на единицу продукта (кэшируется по продукту, дате и подразделению)."""
+        key = (product_id, day, department_id)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        chart = self.chart_for(product_id, day)
+        if chart is None:
+            return {product_id: 1.0}
+        if product_id in path:
+            raise AssemblyChartCycleError([*path[path.index(product_id):], product_id])
+
+        path.append(product_id)
+        totals: dict[str, float] = {}
+        for edge in chart.items:
+            if not edge.applies_to(department_id):
+                continue
+            ratio = edge.amount_in / chart.assembled_amount
+            for ingredient, quantity in self._expand_unit(edge.product_id, day, department_id, path).items():
+                totals[ingredient] = totals.get(ingredient, 0.0) + ratio * quantity
+        path.pop()
+        self._memo[key] = totals
+        return totals
@@ -0,0 +1,239 @@
+"""
+Потребность в ингредиентах по прогнозу продаж блюд.
+
+Прогноз — количество блюд по подразделению и дню (задается пользователем или строится по истории
+продаж из OLAP, см. ``build_dish_sales_olap_body`` и ``forecast_by_weekday``). Блюда раскладываются
+до конечных ингредиентов (``AssemblyChartGraph``), потребность подразделения за день — произведение
+вектора количеств блюд на разреженную матрицу блюдо × ингредиент (``FoodCostMatrix``). Матрица
+строится один раз на подразделение и период, в котором не меняется ни одна техкарта
+(даты смен берутся из ``ChartResolver``). Потребность сравнивается с остатками складов
+(``get_stores_balance``), нехватка считается нарастающим итогом по дням. Потребность и остатки
+суммируются и сравниваются в целых единицах 10^-AMOUNT_DIGITS (точность количеств в техкартах).
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from typing import Any
+
+from iiko_api.charts.cost import FoodCostMatrix
+from iiko_api.charts.dag import AssemblyChartGraph
+from iiko_api.core.dates import as_day, parse_olap_day
+from iiko_api.endpoints.assembly_charts import AMOUNT_DIGITS
+from iiko_api.endpoints.stores import balance_rows
+
+# Прогноз: подразделение -> день -> блюдо -> количество
+Forecast = Mapping[str, Mapping[Any, Mapping[str, float]]]
+
+_AMOUNT_FACTOR = 10 ** AMOUNT_DIGITS
+
+
+def _units(quantity: float) -> int:
+    """Количество в целых единицах 10^-AMOUNT_DIGITS."""
+    return round(quantity * _AMOUNT_FACTOR)
+
+
+def _stock_units(value: Any, *, what: str) -> int:
+    """Остаток из get_stores_balance в целых единицах без двоичных артефактов float."""
+    if value is None or value == "":
+        return 0
+    try:
+        number = value if isinstance(value, Decimal) else Decimal(str(value))
+        return int(number.scaleb(AMOUNT_DIGITS).to_integral_value(rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError, OverflowError) as e:
+        raise ValueError(f"Некорректное значение {what}: {value!r}") from e
+
+
+def dish_sales_from_olap(payload: Mapping[str, Any]) -> dict[str, dict[date, dict[str, float]]]:
+    """
+    Продажи блюд из ответа OLAP (см. build_dish_sales_olap_body).
+
+    :return: {department_id: {date: {dish_id: количество}}}
+    """
+    sales: dict[str, dict[date, dict[str, float]]] = {}
+    for row in payload.get("data") or []:
+        if not isinstance(row, Mapping):
+            continue
+        department_id = row.get("Department.Id")
+        raw_date = row.get("OpenDate.Typed")
+        dish_id = row.get("DishId")
+        if not department_id or not raw_date or not dish_id:
+            continue
+        day = sales.setdefault(department_id, {}).setdefault(parse_olap_day(raw_date), {})
+        day[dish_id] = day.get(dish_id, 0.0) + float(row.get("DishAmountInt") or 0)
+    return sales
+
+
+def forecast_by_weekday(
+    history: Forecast,
+    days: Iterable[date | str],
+) -> dict[str, dict[date, dict[str, float]]]:
+    """
+    Простой прогноз: среднее количество блюда в тот же день недели по истории.
+
+    :param history: продажи {department_id: {день: {dish_id: количество}}} (например dish_sales_from_olap)
+    :param days: дни прогноза
+    :return: прогноз в том же формате
+    """
+    targets = [as_day(day) for day in days]
+    forecast: dict[str, dict[date, dict[str, float]]] = {}
+    for department_id, by_day in history.items():
+        totals: dict[int, dict[str, float]] = {}
+        weeks: dict[int, int] = {}
+        for raw_day, dishes in by_day.items():
+            weekday = as_day(raw_day).weekday()
+            weeks[weekday] = weeks.get(weekday, 0) + 1
+            bucket = totals.setdefault(weekday, {})
+            for dish_id, quantity in dishes.items():
+                bucket[dish_id] = bucket.get(dish_id, 0.0) + float(quantity)
+        forecast[department_id] = {
+            day: {
+                dish_id: quantity / weeks[day.weekday()]
+                for dish_id, quantity in totals.get(day.weekday(), {}).items()
+            }
+            for day in targets
+        }
+    return forecast
+
+
+def department_stores(stores: Iterable[Any]) -> dict[str, str]:
+    """
+    Склад каждого подразделения по списку складов (parentId склада — подразделение).
+
+    Если у подразделения несколько складов, берется первый.
+
+    :param stores: ответ get_stores (dict или StoreRecord)
+    :return: {department_id: store_id}
+    """
+    mapping: dict[str, str] = {}
+    for store in stores:
+        if isinstance(store, Mapping):
+            store_id, parent_id = store.get("id"), store.get("parentId")
+        else:
+            store_id, parent_id = store.id, store.parentId
+        if store_id and parent_id:
+            mapping.setdefault(parent_id, store_id)
+    return mapping
+
+
+@dataclass(frozen=True)
+class IngredientShortfall:
+    """
+    Нехватка ингредиента на складе.
+
+    Attributes:
+        store_id: UUID склада
+        day: день, к концу которого остатка не хватает
+        product_id: UUID ингредиента
+        required: потребность нарастающим итогом по этот день включительно
+        available: остаток на складе
+        shortfall: required - available
+    """
+    store_id: str
+    day: date
+    product_id: str
+    required: float
+    available: float
+    shortfall: float
+
+
+class DemandPlan:
+    """
+    Потребность в конечных ингредиентах по складам и дням.
+
+    :param graph: граф техкарт
+    :param forecast: количество блюд {department_id: {день: {dish_id: количество}}}
+    :param stores: склад подразделения {department_id: store_id} (см. department_stores);
+        подразделения без склада учитываются под своим id
+    :raises AssemblyChartCycleError: если техкарты образуют цикл
+    """
+
+    def __init__(
+        self,
+        graph: AssemblyChartGraph,
+        forecast: Forecast,
+        *,
+        stores: Mapping[str, str] | None = None,
+    ):
+        stores = stores or {}
+        resolver = graph.resolver
+        # Даты, с которых меняется хотя бы одна техкарта: между ними разложение не меняется
+        change_dates = sorted({
+            day
+            for changes in resolver.changes_many(resolver.products, date.min, date.max).values()
+            for day, _ in changes
+        })
+
+        # Потребность в целых единицах: суммы по дням и подразделениям одного склада точные
+        units: dict[str, dict[date, dict[str, int]]] = {}
+        for department_id, by_day in forecast.items():
+            dishes = list(dict.fromkeys(dish_id for quantities in by_day.values() for dish_id in quantities))
+            matrices: dict[int, FoodCostMatrix] = {}
+            store_demand = units.setdefault(stores.get(department_id, department_id), {})
+            for raw_day, quantities in by_day.items():
+                day = as_day(raw_day)
+                period = bisect_right(change_dates, day)
+                matrix = matrices.get(period)
+                if matrix is None:
+                    matrix = matrices[period] = FoodCostMatrix(
+                        graph, dishes, on_date=day, department_id=department_id
+                    )
+                totals = store_demand.setdefault(day, {})
+                for ingredient, quantity in matrix.ingredient_demand(quantities).items():
+                    totals[ingredient] = totals.get(ingredient, 0) + _units(quantity)
+        self._units = {store_id: dict(sorted(by_day.items())) for store_id, by_day in units.items()}
+        self.demand: dict[str, dict[date, dict[str, float]]] = {
+            store_id: {
+                day: {ingredient: amount / _AMOUNT_FACTOR for ingredient, amount in quantities.items()}
+                for day, quantities in by_day.items()
+            }
+            for store_id, by_day in self._units.items()
+        }
+
+    def totals(self, store_id: str) -> dict[str, float]:
+        """Потребность склада за весь период по UUID ингредиента."""
+        totals: dict[str, int] = {}
+        for quantities in self._units.get(store_id, {}).values():
+            for ingredient, amount in quantities.items():
+                totals[ingredient] = totals.get(ingredient, 0) + amount
+        return {ingredient: amount / _AMOUNT_FACTOR for ingredient, amount in totals.items()}
+
+    def shortfalls(self, balance: Any) -> list[IngredientShortfall]:
+        """
+        Сравнивает потребность с остатками складов.
+
+        Остаток не пополняется: для каждого дня потребность берется нарастающим итогом,
+        нехватка выводится за каждый день, к концу которого остатка не хватает.
+
+        :param balance: ответ get_stores_balance (список строк store, product, amount, sum)
+        :return: нехватки, отсортированные по складу, дню и ингредиенту
+        :raises ValueError: если amount строки остатков не является числом
+        """
+        available: dict[tuple[str, str], int] = {}
+        for row in balance_rows(balance):
+            if isinstance(row, Mapping) and row.get("store") and row.get("product"):
+                key = (row["store"], row["product"])
+                amount = _stock_units(row.get("amount"), what=f"amount остатка {row['product']}")
+                available[key] = available.get(key, 0) + amount
+
+        result = []
+        for store_id in sorted(self._units):
+            required: dict[str, int] = {}
+            for day, quantities in self._units[store_id].items():
+                for ingredient, amount in quantities.items():
+                    required[ingredient] = required.get(ingredient, 0) + amount
+                for ingredient in sorted(required):
+                    stock = available.get((store_id, ingredient), 0)
+                    if required[ingredient] > stock:
+                        result.append(IngredientShortfall(
+                            store_id,
+                            day,
+                            ingredient,
+                            required[ingredient] / _AMOUNT_FACTOR,
+                            stock / _AMOUNT_FACTOR,
+                            (required[ingredient] - stock) / _AMOUNT_FACTOR,
+                        ))
+        return result
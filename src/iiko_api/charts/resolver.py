@@ -0,0 +1,235 @@
+"""
+Индекс версий техкарт по датам действия.
+
+``get_all_assembly_charts`` возвращает все версии техкарт, интервал действия которых пересекает
+запрошенный период. ``ChartResolver`` раскладывает версии каждого продукта в отсортированный
+массив отрезков, на каждом из которых действует одна версия (или ни одной), и отвечает
+на вопросы «какая техкарта действует на дату» и «как менялась техкарта за период»
+двоичным поиском (bisect).
+"""
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+
+from iiko_api.core.dates import as_day, iso_day
+from iiko_api.models.bulk import BulkAssemblyChart
+from iiko_api.models.models import AssemblyChart
+
+
+@dataclass(frozen=True)
+class ChartEdge:
+    """
+    Строка техкарты: ребро продукт → ингредиент.
+
+    Attributes:
+        product_id: UUID ингредиента
+        amount_in: количество ингредиента на входе (брутто)
+        amount_out: выход ингредиента (нетто)
+        departments: подразделения storeSpecification (пустой кортеж — строка действует везде)
+        inverse: storeSpecification исключающая
+    """
+    product_id: str
+    amount_in: float
+    amount_out: float = 0.0
+    departments: tuple[str, ...] = ()
+    inverse: bool = False
+
+    def applies_to(self, department_id: str | None) -> bool:
+        """
+        Действует ли строка для подразделения.
+
+        Без подразделения действуют только строки без ограничений по подразделениям.
+        """
+        if not self.departments:
+            return True
+        if department_id is None:
+            return False
+        return (department_id in self.departments) != self.inverse
+
+
+@dataclass(frozen=True)
+class ChartVersion:
+    """
+    Версия техкарты продукта.
+
+    Attributes:
+        product_id: UUID продукта
+        date_from: начало действия
+        date_to: окончание действия (не включается; None — без ограничения)
+        assembled_amount: количество готового продукта, на которое рассчитаны строки
+        items: строки техкарты
+    """
+    product_id: str
+    date_from: date
+    date_to: date | None
+    assembled_amount: float
+    items: tuple[ChartEdge, ...]
+
+    def valid_on(self, day: date) -> bool:
+        return self.date_from <= day and (self.date_to is None or day < self.date_to)
+
+
+def chart_version(chart: AssemblyChart | BulkAssemblyChart | Mapping[str, Any]) -> ChartVersion:
+    """
+    Версия техкарты из AssemblyChart, BulkAssemblyChart или техкарты ответа get_all_assembly_charts.
+
+    :raises ValueError: если нет продукта, даты начала или assembledAmount не положителен
+    """
+    if isinstance(chart, BulkAssemblyChart):
+        header = chart.header
+        rows = [
+            {"productId": product_id, "amountIn": amount_in, "amountOut": amount_out,
+             "storeSpecification": spec.model_dump() if spec is not None else None}
+            for product_id, amount_in, amount_out, spec in zip(
+                chart.product_ids, chart.amounts_in, chart.amounts_out, chart.store_specifications, strict=True
+            )
+        ]
+        chart = {**header.model_dump(mode="json"), "items": rows}
+    elif isinstance(chart, AssemblyChart):
+        chart = chart.model_dump(mode="json")
+    product_id = chart.get("assembledProductId")
+    date_from = iso_day(chart.get("dateFrom"))
+    if not product_id or not date_from:
+        raise ValueError("Техкарта без assembledProductId или dateFrom")
+    assembled_amount = float(chart.get("assembledAmount") or 0)
+    if assembled_amount <= 0:
+        raise ValueError(f"Техкарта продукта {product_id}: assembledAmount должен быть положительным")
+    items = []
+    for row in chart.get("items") or []:
+        spec = row.get("storeSpecification") or {}
+        items.append(ChartEdge(
+            product_id=row["productId"],
+            amount_in=float(row.get("amountIn") or 0),
+            amount_out=float(row.get("amountOut") or 0),
+            departments=tuple(spec.get("departments") or ()),
+            inverse=bool(spec.get("inverse", False)),
+        ))
+    date_to = iso_day(chart.get("dateTo"))
+    return ChartVersion(
+        product_id=product_id,
+        date_from=date.fromisoformat(date_from),
+        date_to=date.fromisoformat(date_to) if date_to else None,
+        assembled_amount=assembled_amount,
+        items=tuple(items),
+    )
+
+
+def _segments(versions: list[ChartVersion]) -> tuple[list[int], list[ChartVersion | None]]:
+    """
+    Отрезки действия версий: начала отрезков (порядковые номера дат) и действующая версия.
+
+    При пересечении интервалов действует версия с самой поздней датой начала.
+    """
+    boundaries = sorted(
+        {version.date_from.toordinal() for version in versions}
+        | {version.date_to.toordinal() for version in versions if version.date_to is not None}
+    )
+    starts: list[int] = []
+    effective: list[ChartVersion | None] = []
+    for boundary in boundaries:
+        winner = None
+        for version in versions:
+            end = version.date_to.toordinal() if version.date_to is not None else None
+            if version.date_from.toordinal() <= boundary and (end is None or boundary < end):
+                if winner is None or version.date_from >= winner.date_from:
+                    winner = version
+        if effective and effective[-1] is winner:
+            continue
+        starts.append(boundary)
+        effective.append(winner)
+    return starts, effective
+
+
+class ChartResolver:
+    """
+    Индекс версий техкарт по продуктам и датам действия.
+
+    :param charts: техкарты (AssemblyChart, BulkAssemblyChart, dict из get_all_assembly_charts
+        или готовые ChartVersion)
+    """
+
+    def __init__(self, charts: Iterable[AssemblyChart | BulkAssemblyChart | Mapping[str, Any] | ChartVersion]):
+        versions: dict[str, list[ChartVersion]] = {}
+        for chart in charts:
+            version = chart if isinstance(chart, ChartVersion) else chart_version(chart)
+            versions.setdefault(version.product_id, []).append(version)
+        self._versions = {
+            product_id: sorted(product_versions, key=lambda version: version.date_from)
+            for product_id, product_versions in versions.items()
+        }
+        self._index = {product_id: _segments(product_versions) for product_id, product_versions in self._versions.items()}
+
+    @classmethod
+    def from_response(cls, payload: Mapping[str, Any]) -> ChartResolver:
+        """Индекс по ответу get_all_assembly_charts (используется только assemblyCharts)."""
+        return cls(chart for chart in payload.get("assemblyCharts") or [] if isinstance(chart, Mapping))
+
+    @property
+    def products(self) -> list[str]:
+        """UUID продуктов, у которых есть техкарты."""
+        return list(self._versions)
+
+    def versions(self, product_id: str) -> list[ChartVersion]:
+        """Все версии техкарты продукта в порядке даты начала."""
+        return list(self._versions.get(product_id, ()))
+
+    def effective(self, product_id: str, on_date: date | str | None = None) -> ChartVersion | None:
+        """
+        Техкарта продукта, действующая на дату (при пересечении — с самой поздней датой начала).
+
+        :param product_id: UUID продукта
+        :param on_date: дата (по умолчанию сегодня)
+        """
+        index = self._index.get(product_id)
+        if index is None:
+            return None
+        starts, effective = index
+        position = bisect_right(starts, as_day(on_date).toordinal()) - 1
+        return effective[position] if position >= 0 else None
+
+    def changes(
+        self,
+        product_id: str,
+        date_from: date | str,
+        date_to: date | str,
+    ) -> list[tuple[date, ChartVersion | None]]:
+        """
+        Смены действующей техкарты продукта в периоде (date_from, date_to].
+
+        :return: (дата смены, техкарта с этой даты или None, если техкарта перестала действовать)
+        """
+        index = self._index.get(product_id)
+        if index is None:
+            return []
+        starts, effective = index
+        low = bisect_right(starts, as_day(date_from).toordinal())
+        high = bisect_right(starts, as_day(date_to).toordinal())
+        return [(date.fromordinal(starts[i]), effective[i]) for i in range(low, high)]
+
+    def effective_many(
+        self,
+        product_ids: Iterable[str],
+        on_date: date | str | None = None,
+    ) -> dict[str, ChartVersion | None]:
+        """Действующие на дату техкарты для набора продуктов."""
+        day = as_day(on_date)
+        return {product_id: self.effective(product_id, day) for product_id in product_ids}
+
+    def changes_many(
+        self,
+        product_ids: Iterable[str],
+        date_from: date | str,
+        date_to: date | str,
+    ) -> dict[str, list[tuple[date, ChartVersion | None]]]:
+        """Смены техкарт в периоде (date_from, date_to] для набора продуктов (только продукты со сменами)."""
+        low, high = as_day(date_from), as_day(date_to)
+        result = {}
+        for product_id in product_ids:
+            changes = self.changes(product_id, low, high)
+            if changes:
+                result[product_id] = changes
+        return result
@@ -18,6 +18,8 @@ from requests import Response
 from requests.exceptions import ConnectionError, HTTPError, RequestException, Timeout
 
 from iiko_api.core.config.logging_config import get_logger
+from iiko_api.core.json_backend import STDLIB_JSON_BACKEND, JsonBackend, get_json_backend
+from iiko_api.core.spill import spilled_body, spool_response
 from iiko_api.exceptions import IikoConnectionError, IikoTimeoutError
 
 logger = get_logger(__name__)
@@ -77,6 +79,9 @@ def sanitize_url(url: str | None, sensitive_params: list[str] | None = None) ->
 class BaseClient:
     """Базовый класс для работы с API iiko."""
 
+    # JSON-декодер для ответов; по умолчанию стандартный json (как Response.json)
+    json_backend: JsonBackend = STDLIB_JSON_BACKEND
+
     def __init__(
         self,
         base_url: str,
@@ -85,15 +90,24 @@ class BaseClient:
         timeout: float = 30.0,
         *,
         log_bodies: bool = False,
+        json_backend: str | JsonBackend | None = None,
+        spill_threshold: int | None = None,
+        spill_dir: str | None = None,
     ):
+        if spill_threshold is not None and spill_threshold < 0:
+            raise ValueError("spill_threshold не может быть отрицательным")
         self.base_url = base_url
         self.secret = hash_password
         self.username = login
         self.timeout = timeout
         self.log_bodies = log_bodies
+        self.json_backend = get_json_backend(json_backend)
+        # Тела ответов больше порога (в байтах) сбрасываются во временный файл в spill_dir
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
         self.session = requests.Session()
 
-    def _log_exchange(self, response: Response, *, level: str = "debug") -> None:
+    def _log_exchange(self, response: Response, *, level: str = "debug", streamed: bool = False) -> None:
         request = response.request
         message = (
             f"Request URL: {sanitize_url(request.url)}\n"
@@ -101,9 +115,17 @@ class BaseClient:
             f"  Status: {response.status_code}"
         )
         if self.log_bodies:
+            body = spilled_body(response)
+            if streamed:
+                # Тело читает вызывающий код, логирование не должно его потреблять
+                response_body = "<stream>"
+            elif body is None:
+                response_body = response.text
+            else:
+                response_body = f"{body.prefix()}... ({body.size} bytes)"
             message += (
                 f"\n  Request Body: {request.body}\n"
-                f"  Response Body: {response.text}"
+                f"  Response Body: {response_body}"
             )
         log_fn = logger.debug if level == "debug" else logger.error
         log_fn(message)
@@ -114,7 +136,10 @@ class BaseClient:
             try:
                 response: Response = func(self, *args, **kwargs)
                 response.raise_for_status()
-                self._log_exchange(response, level="debug")
+                streamed = kwargs.get("stream", False)
+                if self.spill_threshold is not None and not streamed:
+                    spool_response(response, self.spill_threshold, directory=self.spill_dir)
+                self._log_exchange(response, level="debug", streamed=streamed)
                 return response
             except HTTPError as http_error:
                 logger.error(
@@ -147,8 +172,20 @@ class BaseClient:
         return wrapper
 
     @_handle_request_errors
-    def get(self, endpoint: str, params: dict[str, Any] | None = None) -> Response:
-        return self.session.get(self.base_url + endpoint, params=params, timeout=self.timeout)
+    def get(
+        self,
+        endpoint: str,
+        params: dict[str, Any] | None = None,
+        *,
+        stream: bool = False,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> Response:
+        return self.session.get(
+            self.base_url + endpoint,
+            params=params,
+            timeout=self.timeout if timeout is None else timeout,
+            stream=stream or self.spill_threshold is not None,
+        )
 
     @_handle_request_errors
     def post(
@@ -158,13 +195,16 @@ class BaseClient:
         headers: dict[str, Any] | None = None,
         *,
         json: dict[str, Any] | None = None,
+        stream: bool = False,
+        timeout: float | tuple[float, float] | None = None,
     ) -> Response:
         return self.session.post(
             self.base_url + endpoint,
             data=data,
             json=json,
             headers=headers,
-            timeout=self.timeout,
+            timeout=self.timeout if timeout is None else timeout,
+            stream=stream or self.spill_threshold is not None,
         )
 
     def login(self) -> str:
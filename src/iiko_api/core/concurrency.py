@@ -0,0 +1,97 @@
+"""
+Параллельное выполнение запросов к API iiko с ограничением числа потоков.
+
+Запросы идут через общий ``requests.Session`` клиента, поэтому используют одну
+сессию аутентификации. Значение max_workers больше размера пула соединений
+requests (10 по умолчанию) не ускоряет работу.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class TaskOutcome(Generic[T]):
+    """
+    Результат одной задачи.
+
+    Attributes:
+        index: позиция задачи во входной последовательности
+        item: входной элемент задачи
+        result: результат (None при ошибке)
+        error: исключение задачи (None при успехе)
+        elapsed: время выполнения в секундах
+    """
+    index: int
+    item: Any
+    result: T | None = None
+    error: BaseException | None = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def run_concurrently(
+    func: Callable[[Any], T],
+    items: Iterable[Any],
+    *,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fail_fast: bool = False,
+) -> Iterator[TaskOutcome[T]]:
+    """
+    Выполняет func для каждого элемента не более чем в max_workers потоках.
+
+    Результаты отдаются по мере завершения задач. Ошибка задачи не прерывает остальные
+    (сохраняется в TaskOutcome.error), если не задан fail_fast.
+
+    :param func: функция от одного элемента
+    :param items: входные элементы
+    :param max_workers: максимальное число одновременных задач
+    :param fail_fast: при первой ошибке отменить невыполненные задачи и пробросить исключение
+    :raises ValueError: если max_workers < 1
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers должен быть не меньше 1")
+
+    def _timed(index: int, item: Any) -> TaskOutcome[T]:
+        started = time.perf_counter()
+        try:
+            return TaskOutcome(index, item, result=func(item), elapsed=time.perf_counter() - started)
+        except Exception as e:
+            return TaskOutcome(index, item, error=e, elapsed=time.perf_counter() - started)
+
+    pending_items = iter(enumerate(items))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        running: set[Future[TaskOutcome[T]]] = set()
+
+        def _submit_next() -> bool:
+            try:
+                index, item = next(pending_items)
+            except StopIteration:
+                return False
+            running.add(executor.submit(_timed, index, item))
+            return True
+
+        # Задачи подаются порциями, чтобы не держать в очереди весь вход (он может быть генератором)
+        while len(running) < max_workers and _submit_next():
+            pass
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                outcome = future.result()
+                if fail_fast and outcome.error is not None:
+                    for other in running:
+                        other.cancel()
+                    raise outcome.error
+                yield outcome
+                _submit_next()
@@ -0,0 +1,54 @@
+"""
+Общие преобразования дат.
+
+API iiko отдает даты строками ("yyyy-MM-dd" или "yyyy-MM-ddTHH:mm:ss[.fff]"),
+а пользовательский код передает date, datetime или строки — здесь они приводятся к дню.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Any
+
+
+def as_date(value: datetime | date) -> date:
+    """date из date или datetime (время отбрасывается)."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def olap_day_start(value: datetime | date) -> str:
+    """Начало дня в формате фильтров OLAP: "yyyy-MM-ddT00:00:00.000"."""
+    return as_date(value).strftime("%Y-%m-%dT00:00:00.000")
+
+
+def parse_olap_day(raw_date: Any) -> date:
+    """
+    День из значения OLAP-поля даты ("yyyy-MM-dd" или "yyyy-MM-ddTHH:mm:ss").
+
+    :raises ValueError: если значение не является датой
+    """
+    text = str(raw_date).strip()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError as e:
+        raise ValueError(f"Некорректная дата в OLAP ответе: {raw_date!r}") from e
+
+
+def iso_day(value: Any) -> str | None:
+    """День "yyyy-MM-dd" из даты API (строка с временем или без) или None для пустого значения."""
+    return str(value)[:10] if value else None
+
+
+def as_day(value: date | str | None) -> date:
+    """
+    День из date/datetime или строки "yyyy-MM-dd[...]".
+
+    :param value: дата; None — сегодня
+    :raises ValueError: если строка не начинается с даты ISO
+    """
+    if value is None:
+        return date.today()
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
@@ -0,0 +1,176 @@
+"""
+Журнал записей для возобновляемых пакетных операций.
+
+Перед отправкой записи (приказа, продукта, техкарты) в журнал SQLite заносится хэш
+ее канонического тела со статусом ``pending``, после ответа — ``confirmed`` или ``failed``.
+Если процесс прервался, повторный запуск пропускает подтвержденные записи, а записи,
+оставшиеся в ``pending`` (отправлены, но ответ не получен), перепроверяет через
+переданную функцию проверки, прежде чем отправлять заново.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class JournalEntry:
+    """
+    Запись журнала.
+
+    Attributes:
+        kind: вид записи ("order", "product", "assembly_chart", ...)
+        payload_hash: sha256 канонического тела
+        status: pending, confirmed или failed
+        response: ответ API для confirmed (JSON-совместимое значение)
+        error: текст ошибки для failed
+        updated_at: время последнего изменения (unix time)
+    """
+    kind: str
+    payload_hash: str
+    status: str
+    response: Any = None
+    error: str | None = None
+    updated_at: float = 0.0
+
+
+def payload_hash(payload: Any) -> str:
+    """
+    Хэш канонического тела записи.
+
+    :param payload: pydantic-модель или объект с model_dump_json (Order, BulkOrder, Product, ...),
+        dict/list (сериализуется с сортировкой ключей), str или bytes
+    """
+    if hasattr(payload, "model_dump_json"):
+        payload = payload.model_dump_json()
+    elif not isinstance(payload, (str, bytes)):
+        payload = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+class WriteJournal:
+    """
+    Журнал записей в файле SQLite.
+
+    Безопасен для использования из нескольких потоков одного процесса.
+
+    :param path: путь к файлу журнала (":memory:" — журнал в памяти, для тестов)
+    """
+
+    def __init__(self, path: str | Path):
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            if str(path) != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS write_journal ("
+                "kind TEXT NOT NULL, payload_hash TEXT NOT NULL, status TEXT NOT NULL, "
+                "response TEXT, error TEXT, updated_at REAL NOT NULL, PRIMARY KEY (kind, payload_hash))"
+            )
+
+    def get(self, kind: str, payload: Any) -> JournalEntry | None:
+        """Запись журнала для тела payload (None, если тело не отправлялось)."""
+        digest = payload_hash(payload)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, response, error, updated_at FROM write_journal WHERE kind = ? AND payload_hash = ?",
+                (kind, digest),
+            ).fetchone()
+        if row is None:
+            return None
+        status, response, error, updated_at = row
+        return JournalEntry(kind, digest, status, json.loads(response) if response else None, error, updated_at)
+
+    def entries(self, status: str | None = None) -> list[JournalEntry]:
+        """Записи журнала (все или с заданным статусом)."""
+        query = "SELECT kind, payload_hash, status, response, error, updated_at FROM write_journal"
+        params: tuple = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._connection.execute(query + " ORDER BY updated_at", params).fetchall()
+        return [
+            JournalEntry(kind, digest, entry_status, json.loads(response) if response else None, error, updated_at)
+            for kind, digest, entry_status, response, error, updated_at in rows
+        ]
+
+    def _set(self, kind: str, digest: str, status: str, response: Any = None, error: str | None = None) -> None:
+        text = json.dumps(response, ensure_ascii=False, default=str) if response is not None else None
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO write_journal (kind, payload_hash, status, response, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, digest, status, text, error, time.time()),
+            )
+
+    def run(
+        self,
+        kind: str,
+        payload: Any,
+        send: Callable[[], T],
+        *,
+        verify: Callable[[], bool] | None = None,
+        changed: bool = False,
+    ) -> T | Any:
+        """
+        Выполняет запись через журнал.
+
+        - confirmed: запись не отправляется, возвращается сохраненный ответ (кроме changed=True);
+        - pending (прошлая отправка прервана): если задан verify и он подтверждает, что запись
+          уже применена на сервере, запись помечается confirmed без отправки (ответ — None);
+        - иначе запись помечается pending, отправляется и помечается confirmed или failed.
+
+        :param kind: вид записи
+        :param payload: каноническое тело записи (см. payload_hash)
+        :param send: функция отправки, возвращает ответ API
+        :param verify: проверка для неподтвержденных записей: True — запись уже применена
+        :param changed: вызывающий сравнил запись с текущими данными сервера и нашел отличия:
+            подтвержденная запись отправляется заново (данные на сервере изменились после нее)
+        :return: ответ send (или сохраненный ответ)
+        """
+        digest = payload_hash(payload)
+        entry = self.get(kind, payload)
+        if entry is not None and entry.status == CONFIRMED and not changed:
+            return entry.response
+        if entry is not None and entry.status == PENDING and verify is not None and verify():
+            self._set(kind, digest, CONFIRMED)
+            return None
+
+        self._set(kind, digest, PENDING)
+        try:
+            response = send()
+        except Exception as e:
+            self._set(kind, digest, FAILED, error=f"{type(e).__name__}: {e}")
+            raise
+        self._set(kind, digest, CONFIRMED, response=response)
+        return response
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM write_journal")
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def __enter__(self) -> WriteJournal:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
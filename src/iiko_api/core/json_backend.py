@@ -0,0 +1,167 @@
+"""
+Модуль выбора JSON-декодера для ответов API iiko.
+
+Стандартный ``json`` заметно нагружает CPU на больших OLAP-отчетах и прайс-листах,
+поэтому клиент может использовать orjson, msgspec или ujson, если они установлены.
+Для денежных данных есть режим ``decimal=True``: нецелые JSON-числа возвращаются
+как ``Decimal`` при любом декодере. msgspec делает это нативно (``float_hook``);
+orjson и ujson не умеют создавать Decimal при разборе, а обход готового дерева
+с заменой float медленнее стандартного ``json`` с ``parse_float=Decimal``,
+поэтому для них в этом режиме используется стандартный декодер.
+
+Тело, сброшенное на диск (``spill_threshold``), без копирования разбирают только msgspec
+и orjson (без ``decimal``): стандартный ``json`` и ujson принимают только bytes/str,
+поэтому буфер mmap копируется в память и пиковое потребление остается кратным размеру тела.
+"""
+from __future__ import annotations
+
+import importlib
+import json
+import warnings
+from collections.abc import Callable
+from decimal import Decimal
+from typing import Any
+
+from requests import Response
+
+from iiko_api.core.spill import spilled_body
+
+AUTO_BACKEND = "auto"
+STDLIB_BACKEND = "json"
+
+# Порядок перебора при json_backend="auto": от самого быстрого к стандартному.
+JSON_BACKENDS = ("msgspec", "orjson", "ujson", STDLIB_BACKEND)
+
+
+def _stdlib_decimal_loads(data: bytes | bytearray | str) -> Any:
+    return json.loads(data, parse_float=Decimal)
+
+
+class JsonBackend:
+    """
+    Обертка над конкретной JSON-библиотекой.
+
+    Attributes:
+        name: имя библиотеки ("orjson", "msgspec", "ujson" или "json")
+    """
+
+    def __init__(
+        self,
+        name: str,
+        loads: Callable[[Any], Any],
+        decimal_loads: Callable[[Any], Any] = _stdlib_decimal_loads,
+        errors: tuple[type[BaseException], ...] = (ValueError,),
+    ):
+        self.name = name
+        self._loads = loads
+        self._decimal_loads = decimal_loads
+        self._errors = errors
+
+    def __repr__(self) -> str:
+        return f"JsonBackend({self.name!r})"
+
+    @property
+    def is_stdlib(self) -> bool:
+        return self.name == STDLIB_BACKEND
+
+    def copies_buffer(self, *, decimal: bool = False) -> bool:
+        """Копирует ли декодер memoryview в bytes (стандартный json и ujson не читают буфер напрямую)."""
+        decode = self._decimal_loads if decimal else self._loads
+        return decode in (json.loads, _stdlib_decimal_loads) or self.name == "ujson"
+
+    def loads(self, data: bytes | bytearray | memoryview | str, *, decimal: bool = False) -> Any:
+        """
+        Декодирует JSON.
+
+        :param data: JSON в виде bytes/str/memoryview (memoryview копируется, см. copies_buffer)
+        :param decimal: если True — нецелые числа возвращаются как Decimal
+        :raises ValueError: если data не является валидным JSON
+        """
+        if isinstance(data, memoryview) and self.copies_buffer(decimal=decimal):
+            data = data.tobytes()
+        try:
+            if decimal:
+                return self._decimal_loads(data)
+            return self._loads(data)
+        except self._errors as e:
+            if isinstance(e, ValueError):
+                raise
+            raise ValueError(f"Некорректный JSON ({self.name}): {e}") from e
+
+
+def _make_backend(name: str) -> JsonBackend:
+    if name == STDLIB_BACKEND:
+        return JsonBackend(name, json.loads)
+    module = importlib.import_module(name)
+    if name == "orjson":
+        return JsonBackend(name, module.loads, errors=(module.JSONDecodeError,))
+    if name == "msgspec":
+        decoder = module.json.Decoder()
+        decimal_decoder = module.json.Decoder(float_hook=Decimal)
+        return JsonBackend(name, decoder.decode, decimal_decoder.decode, errors=(module.DecodeError,))
+    # ujson: собственный JSONDecodeError наследуется от ValueError
+    return JsonBackend(name, module.loads)
+
+
+def get_json_backend(name: str | JsonBackend | None = AUTO_BACKEND) -> JsonBackend:
+    """
+    Возвращает JSON backend по имени.
+
+    :param name: "auto" (первая доступная библиотека из JSON_BACKENDS), "orjson", "msgspec", "ujson", "json"
+                 или уже готовый JsonBackend; None — стандартный json
+    :raises ValueError: если имя неизвестно
+    :raises ImportError: если запрошенная библиотека не установлена
+    """
+    if isinstance(name, JsonBackend):
+        return name
+    if name is None:
+        return STDLIB_JSON_BACKEND
+    if name == AUTO_BACKEND:
+        for candidate in JSON_BACKENDS:
+            try:
+                return _make_backend(candidate)
+            except ImportError:
+                continue
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Неизвестный JSON backend: {name!r}. Допустимые значения: {', '.join(JSON_BACKENDS)}, auto")
+    try:
+        return _make_backend(name)
+    except ImportError as e:
+        raise ImportError(
+            f"JSON backend {name!r} не установлен. Установите его: pip install {name}"
+        ) from e
+
+
+STDLIB_JSON_BACKEND = _make_backend(STDLIB_BACKEND)
+
+
+def response_json(response: Response, backend: JsonBackend | None = None, *, decimal: bool = False) -> Any:
+    """
+    Декодирует JSON-тело ответа выбранным backend.
+
+    Для стандартного json (или если backend не задан) используется ``Response.json``.
+    Тело, сброшенное на диск (BaseClient(spill_threshold=...)), разбирается из mmap.
+    Если backend не умеет читать буфер напрямую (стандартный json, ujson, orjson с decimal=True),
+    тело копируется в память и выдается RuntimeWarning: сброс на диск в этом случае
+    не снижает пиковое потребление памяти.
+
+    :param response: ответ requests
+    :param backend: JSON backend клиента
+    :param decimal: если True — нецелые числа возвращаются как Decimal
+    :raises ValueError: если тело ответа не является валидным JSON
+    """
+    body = spilled_body(response)
+    if body is not None:
+        backend = backend if isinstance(backend, JsonBackend) else STDLIB_JSON_BACKEND
+        if backend.copies_buffer(decimal=decimal):
+            warnings.warn(
+                f"JSON backend {backend.name!r} копирует сброшенное на диск тело ({body.size} байт) в память: "
+                "spill_threshold снижает пиковую память только с msgspec или orjson (без decimal)",
+                RuntimeWarning,
+                stacklevel=2,
+            )
+        with body.view() as view:
+            return backend.loads(view, decimal=decimal)
+    if not isinstance(backend, JsonBackend) or backend.is_stdlib:
+        return response.json(parse_float=Decimal) if decimal else response.json()
+    return backend.loads(response.content, decimal=decimal)
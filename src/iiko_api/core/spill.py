@@ -0,0 +1,135 @@
+"""
+Сброс больших тел ответов на диск.
+
+Большие OLAP-отчеты и выгрузки каталога requests держит в памяти целиком (``content``),
+затем ``text`` создает вторую копию, а разобранный JSON — третью. В режиме
+``BaseClient(spill_threshold=...)`` тело ответа больше порога читается потоком
+во временный файл и разбирается из memory-mapped буфера, а сообщения об ошибках
+читают только нужный им префикс.
+"""
+from __future__ import annotations
+
+import mmap
+import tempfile
+import weakref
+from typing import IO, Any
+
+from requests import Response
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+PREVIEW_LIMIT = 200
+
+
+class SpilledBody:
+    """
+    Тело ответа во временном файле с доступом через mmap.
+
+    Attributes:
+        size: размер тела в байтах
+        encoding: кодировка тела (из заголовков ответа, по умолчанию utf-8)
+    """
+
+    def __init__(self, file: IO[bytes], encoding: str | None = None):
+        self._file = file
+        self.size = file.seek(0, 2)
+        self.encoding = encoding or "utf-8"
+        self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def view(self) -> memoryview:
+        """Буфер тела без копирования (memoryview над mmap)."""
+        if self._mmap is None:
+            return memoryview(b"")
+        return memoryview(self._mmap)
+
+    def prefix(self, limit: int = PREVIEW_LIMIT) -> str:
+        """Первые limit символов тела (читается только префикс файла)."""
+        if self._mmap is None:
+            return ""
+        # В UTF-8 символ занимает до 4 байт
+        return self._mmap[: limit * 4].decode(self.encoding, errors="replace")[:limit]
+
+    def open(self) -> IO[bytes]:
+        """Файловый объект тела, перемотанный в начало (для потоковых парсеров)."""
+        self._file.seek(0)
+        return self._file
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+def spool_response(
+    response: Response,
+    threshold: int,
+    *,
+    directory: str | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> None:
+    """
+    Читает тело потокового ответа: в память, если оно не больше threshold, иначе во временный файл.
+
+    Большое тело доступно через ``response.spilled_body`` (SpilledBody), ``response.content``
+    для него не заполняется. Файл удаляется вместе с объектом ответа.
+
+    :param response: ответ, полученный с stream=True
+    :param threshold: порог в байтах
+    :param directory: каталог для временных файлов (по умолчанию системный)
+    :param chunk_size: размер блока чтения
+    """
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit() and int(length) <= threshold:
+        response.content  # noqa: B018 - тело небольшое, читаем как обычно
+        return
+
+    chunks = response.iter_content(chunk_size)
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        if len(buffer) > threshold:
+            break
+    else:
+        # Порог не превышен (Content-Length отсутствовал): тело остается в памяти
+        response._content = bytes(buffer)
+        response._content_consumed = True
+        return
+
+    file = tempfile.TemporaryFile(dir=directory)
+    try:
+        file.write(buffer)
+        del buffer
+        for chunk in chunks:
+            file.write(chunk)
+        file.flush()
+        body = SpilledBody(file, response.encoding)
+    except BaseException:
+        file.close()
+        raise
+    response.spilled_body = body
+    weakref.finalize(response, body.close)
+
+
+def spilled_body(response: Any) -> SpilledBody | None:
+    """SpilledBody ответа или None, если тело хранится в памяти."""
+    body = getattr(response, "spilled_body", None)
+    return body if isinstance(body, SpilledBody) else None
+
+
+def response_preview(response: Response, limit: int = PREVIEW_LIMIT) -> str:
+    """Начало тела ответа для сообщений об ошибках; большое тело целиком не читается."""
+    body = spilled_body(response)
+    if body is not None:
+        return body.prefix(limit)
+    return response.text[:limit]
+
+
+def response_source(response: Response) -> str | IO[bytes]:
+    """Тело ответа для парсеров, принимающих строку или файл (например xmltodict)."""
+    body = spilled_body(response)
+    if body is not None:
+        return body.open()
+    return response.text
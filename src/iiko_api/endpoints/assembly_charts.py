@@ -1,13 +1,113 @@
+from __future__ import annotations
+
 import json
 import re
-from typing import Any
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
 
 from requests import Response
 
 from iiko_api.core import BaseClient
-from iiko_api.exceptions import IikoAPIError
+from iiko_api.core.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+from iiko_api.core.dates import iso_day
+from iiko_api.core.journal import WriteJournal
+from iiko_api.core.json_backend import response_json
+from iiko_api.core.spill import response_preview
+from iiko_api.exceptions import IikoAPIError, IikoValidationError
+from iiko_api.models.bulk import BulkAssemblyChart
 from iiko_api.models.models import AssemblyChart
 
+if TYPE_CHECKING:
+    from iiko_api.services.reference_validator import IikoReferenceValidator
+
+# Точность сравнения количеств в техкартах
+AMOUNT_DIGITS = 6
+
+_ITEM_AMOUNTS = (
+    "amountIn", "amountMiddle", "amountOut",
+    "amountIn1", "amountOut1", "amountIn2", "amountOut2", "amountIn3", "amountOut3",
+)
+_COMMENTS = ("technologyDescription", "description", "appearance", "organoleptic", "outputComment")
+
+
+@dataclass
+class AssemblyChartSaveResult:
+    """
+    Результат пакетного сохранения одной техкарты.
+
+    Attributes:
+        index: Позиция техкарты во входной последовательности
+        chart: Сохраняемая техкарта
+        action: saved (отправлена), unchanged (совпадает с текущей) или failed
+        existing_id: UUID текущей версии техкарты с той же датой начала (None, если ее нет)
+        response: Ответ save_assembly_chart
+        error: Исключение (для failed)
+    """
+    index: int
+    chart: AssemblyChart | BulkAssemblyChart
+    action: str
+    existing_id: str | None = None
+    response: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _amount(value: Any) -> float:
+    return round(float(value or 0.0), AMOUNT_DIGITS)
+
+
+def _store_spec(spec: Any) -> tuple[tuple[str, ...], bool] | None:
+    if not spec:
+        return None
+    return tuple(sorted(spec.get("departments") or ())), bool(spec.get("inverse", False))
+
+
+def assembly_chart_canonical(chart: AssemblyChart | BulkAssemblyChart | dict[str, Any]) -> dict[str, Any]:
+    """
+    Каноническая форма техкарты для сравнения версий.
+
+    Даты сокращаются до "yyyy-MM-dd", количества округляются до AMOUNT_DIGITS знаков,
+    списки подразделений сортируются, пустые комментарии и null не различаются,
+    порядок ингредиентов не учитывается (sortWeight сравнивается как поле).
+    Служебные поля сервера (id техкарты и ингредиентов) не учитываются.
+
+    :param chart: AssemblyChart, BulkAssemblyChart или техкарта из get_all_assembly_charts
+    """
+    if not isinstance(chart, dict):
+        chart = json.loads(chart.model_dump_json(exclude_none=True))
+    items = [
+        (
+            item.get("productId"),
+            int(item.get("sortWeight") or 0),
+            tuple(_amount(item.get(name)) for name in _ITEM_AMOUNTS),
+            _store_spec(item.get("storeSpecification")),
+            item.get("packageTypeId"),
+            json.dumps(item.get("productSizeSpecification"), sort_keys=True),
+        )
+        for item in chart.get("items") or []
+    ]
+    return {
+        "assembledProductId": chart.get("assembledProductId"),
+        "dateFrom": iso_day(chart.get("dateFrom")),
+        "dateTo": iso_day(chart.get("dateTo")),
+        "assembledAmount": _amount(chart.get("assembledAmount")),
+        "productWriteoffStrategy": chart.get("productWriteoffStrategy"),
+        "productSizeAssemblyStrategy": chart.get("productSizeAssemblyStrategy"),
+        "effectiveDirectWriteoffStoreSpecification": _store_spec(
+            chart.get("effectiveDirectWriteoffStoreSpecification")
+        ) or ((), False),
+        "items": sorted(items, key=repr),
+        **{name: chart.get(name) or "" for name in _COMMENTS},
+    }
+
+
+def _chart_header(chart: AssemblyChart | BulkAssemblyChart) -> AssemblyChart:
+    return chart.header if isinstance(chart, BulkAssemblyChart) else chart
+
 
 class AssemblyChartsEndpoints:
     """
@@ -67,17 +167,18 @@ class AssemblyChartsEndpoints:
         result: Response = self.client.get(url, params=params)
 
         try:
-            return result.json()
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
-    def save_assembly_chart(self, assembly_chart: AssemblyChart) -> dict:
+    def save_assembly_chart(self, assembly_chart: AssemblyChart | BulkAssemblyChart) -> dict:
         """
         Сохранение технологической карты.
 
         :param assembly_chart: Объект AssemblyChart с данными технологической карты
+                               (или BulkAssemblyChart — ингредиенты заданы колонками)
         :return: Словарь с полной технологической картой, созданной на сервере.
                  Возвращаемая техкарта содержит все поля из запроса плюс дополнительные поля от сервера:
                  - id: UUID созданной техкарты
@@ -99,10 +200,10 @@ class AssemblyChartsEndpoints:
 
         # Безопасный парсинг JSON ответа
         try:
-            response_data = result.json()
+            response_data = response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
         # Проверяем, что ответ - словарь (не список и не строка)
@@ -146,3 +247,68 @@ class AssemblyChartsEndpoints:
                 f"API вернул неожиданный статус результата: {result_status}. "
                 f"Полный ответ: {response_data}"
             )
+
+    def save_assembly_charts(
+            self,
+            charts: Iterable[AssemblyChart | BulkAssemblyChart],
+            *,
+            max_workers: int = DEFAULT_MAX_WORKERS,
+            journal: WriteJournal | None = None,
+            validator: IikoReferenceValidator | None = None,
+    ) -> list[AssemblyChartSaveResult]:
+        """
+        Пакетное сохранение техкарт с пропуском неизмененных.
+
+        Текущие техкарты загружаются одним get_all_assembly_charts начиная с самой ранней
+        dateFrom пакета. Техкарта сравнивается (в канонической форме, см. assembly_chart_canonical)
+        с текущей версией того же продукта с той же датой начала; совпадающие не отправляются,
+        остальные сохраняются параллельно. Ошибка одной техкарты не прерывает остальные.
+
+        :param charts: Техкарты для сохранения
+        :param max_workers: Максимальное число одновременных запросов
+        :param journal: Журнал записей (WriteJournal), фиксирующий результат каждого сохранения;
+                        прерванные сохранения перепроверяются сравнением с текущими техкартами
+        :param validator: Проверка ссылок (IikoReferenceValidator): техкарты с несуществующими
+                          assembledProductId или productId ингредиентов отклоняются без запроса
+        :return: результаты в порядке charts
+        """
+        charts = list(charts)
+        if not charts:
+            return []
+        date_from = min(iso_day(_chart_header(chart).dateFrom) for chart in charts)
+        current = self.get_all_assembly_charts(date_from, include_prepared_charts=False)
+        versions: dict[tuple[str, str | None], dict[str, Any]] = {}
+        for existing in (current or {}).get("assemblyCharts") or []:
+            if isinstance(existing, dict):
+                versions[(existing.get("assembledProductId"), iso_day(existing.get("dateFrom")))] = existing
+
+        results = []
+        pending = []
+        for index, chart in enumerate(charts):
+            header = _chart_header(chart)
+            existing = versions.get((header.assembledProductId, iso_day(header.dateFrom)))
+            result = AssemblyChartSaveResult(index, chart, "saved", existing_id=(existing or {}).get("id"))
+            results.append(result)
+            issues = validator.assembly_chart_issues(chart, index) if validator is not None else []
+            if issues:
+                result.action = "failed"
+                result.error = IikoValidationError("; ".join(issue["message"] for issue in issues), errors=issues)
+            elif existing is not None and assembly_chart_canonical(existing) == assembly_chart_canonical(chart):
+                result.action = "unchanged"
+            else:
+                pending.append(result)
+
+        def _save(result: AssemblyChartSaveResult) -> dict:
+            if journal is None:
+                return self.save_assembly_chart(result.chart)
+            # Техкарта отличается от текущей: подтвержденная ранее запись не пропускается
+            return journal.run(
+                "assembly_chart", result.chart, lambda: self.save_assembly_chart(result.chart), changed=True,
+            )
+
+        for outcome in run_concurrently(_save, pending, max_workers=max_workers):
+            result = outcome.item
+            result.response, result.error = outcome.result, outcome.error
+            if not outcome.ok:
+                result.action = "failed"
+        return results
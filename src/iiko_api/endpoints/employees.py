@@ -5,7 +5,9 @@ import xmltodict
 from requests.exceptions import HTTPError
 
 from iiko_api.core import BaseClient
+from iiko_api.core.spill import response_preview, response_source
 from iiko_api.exceptions import EmployeeNotFoundError, RoleNotFoundError
+from iiko_api.models.records import AttendanceRecord, EmployeeRecord, RoleRecord, parse_xml_records
 
 
 class EmployeesEndpoints:
@@ -16,7 +18,9 @@ class EmployeesEndpoints:
     def __init__(self, client: BaseClient):
         self.client = client
 
-    def get_employees(self, include_deleted: bool = False) -> list[dict]:
+    def get_employees(
+            self, include_deleted: bool = False, *, as_records: bool = False
+    ) -> list[dict] | list[EmployeeRecord]:
         """
         Получение списка сотрудников.
 
@@ -24,6 +28,7 @@ class EmployeesEndpoints:
         в запрос добавляется ``includeDeleted=true``.
 
         :param include_deleted: включать ли удалённых сотрудников (RMS ``includeDeleted``)
+        :param as_records: вернуть компактные записи EmployeeRecord вместо словарей
         :return: список словарей, где каждый словарь представляет сотрудника
         :raises ValueError: если XML не может быть распарсен или структура данных неожиданная
         """
@@ -31,12 +36,15 @@ class EmployeesEndpoints:
         params = {"includeDeleted": "true"} if include_deleted else None
         xml_data = self.client.get("/resto/api/employees/", params=params)
 
+        if as_records:
+            return parse_xml_records(xml_data, "employee", EmployeeRecord)
+
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         # Безопасное извлечение данных из структуры XML
@@ -60,7 +68,7 @@ class EmployeesEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура employees/employee. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
     def get_employee_by_id(self, employee_id: UUID) -> dict:
@@ -84,17 +92,17 @@ class EmployeesEndpoints:
 
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
             employee_data = dict_data.get('employee')
             if employee_data is None:
                 raise ValueError(
-                    f"Сотрудник с ID {employee_id} не найден. Ответ: {xml_data.text[:200]}"
+                    f"Сотрудник с ID {employee_id} не найден. Ответ: {response_preview(xml_data)}"
                 )
 
             # Нормализация departmentCodes
@@ -107,14 +115,17 @@ class EmployeesEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура employee. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
-    def get_employees_by_department(self, department_code: str) -> list[dict]:
+    def get_employees_by_department(
+            self, department_code: str, *, as_records: bool = False
+    ) -> list[dict] | list[EmployeeRecord]:
         """
         Получение списка сотрудников по коду отдела
 
         :param department_code: Код отдела
+        :param as_records: вернуть компактные записи EmployeeRecord вместо словарей
         :return: список словарей, где каждый словарь представляет сотрудника привязанного к отделу
         :raises ValueError: если department_code пустой, XML не может быть распарсен или структура данных неожиданная
         """
@@ -124,12 +135,15 @@ class EmployeesEndpoints:
         # Декоратор _handle_request_errors уже обработал ошибки (status >= 400)
         xml_data = self.client.get(f'/resto/api/employees/byDepartment/{department_code}')
 
+        if as_records:
+            return parse_xml_records(xml_data, "employee", EmployeeRecord)
+
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
@@ -157,21 +171,24 @@ class EmployeesEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура employees/employee. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
     def get_attendances_for_department(
             self,
             department_code: str,
             date_from: datetime,
-            date_to: datetime
-    ) -> list[dict]:
+            date_to: datetime,
+            *,
+            as_records: bool = False
+    ) -> list[dict] | list[AttendanceRecord]:
         """
         Получение явок сотрудников по отделу за период.
 
         :param department_code: Код отдела
         :param date_from: Начало периода
         :param date_to: Конец периода, включительно
+        :param as_records: вернуть компактные записи AttendanceRecord вместо словарей
         :return: Список словарей, где каждый словарь представляет явку
         :raises ValueError: если department_code пустой, date_from > date_to, XML не может быть распарсен или структура данных неожиданная
         """
@@ -194,12 +211,15 @@ class EmployeesEndpoints:
         # Декоратор _handle_request_errors уже обработал ошибки (status >= 400)
         xml_data = self.client.get(endpoint=endpoint, params=params)
 
+        if as_records:
+            return parse_xml_records(xml_data, "attendance", AttendanceRecord)
+
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
@@ -222,7 +242,7 @@ class EmployeesEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура attendances/attendance. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
 
@@ -234,22 +254,26 @@ class RolesEndpoints:
     def __init__(self, client: BaseClient):
         self.client = client
 
-    def get_roles(self) -> list[dict]:
+    def get_roles(self, *, as_records: bool = False) -> list[dict] | list[RoleRecord]:
         """
         Получение списка всех ролей
 
+        :param as_records: вернуть компактные записи RoleRecord вместо словарей
         :return: Список словарей, где каждый словарь представляет роль
         :raises ValueError: если XML не может быть распарсен или структура данных неожиданная
         """
         # Декоратор _handle_request_errors уже обработал ошибки (status >= 400)
         xml_data = self.client.get('/resto/api/employees/roles/')
 
+        if as_records:
+            return parse_xml_records(xml_data, "role", RoleRecord)
+
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
@@ -272,7 +296,7 @@ class RolesEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура employeeRoles/role. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
     def get_role_by_id(self, role_id: str) -> dict:
@@ -299,21 +323,21 @@ class RolesEndpoints:
 
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
             role_data = dict_data.get('role')
             if role_data is None:
                 raise ValueError(
-                    f"Роль с ID {role_id} не найдена. Ответ: {xml_data.text[:200]}"
+                    f"Роль с ID {role_id} не найдена. Ответ: {response_preview(xml_data)}"
                 )
             return role_data
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура role. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
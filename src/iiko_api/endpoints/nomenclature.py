@@ -3,8 +3,11 @@ import json
 from requests import Response
 
 from iiko_api.core import BaseClient
+from iiko_api.core.json_backend import response_json
+from iiko_api.core.spill import response_preview
 from iiko_api.exceptions import IikoAPIError
 from iiko_api.models.models import Product
+from iiko_api.models.records import GroupRecord, ProductRecord, parse_json_records
 
 
 class NomenclatureEndpoints:
@@ -22,7 +25,9 @@ class NomenclatureEndpoints:
                               category_ids: list[str] | None = None,
                               parent_ids: list[str] | None = None,
                               include_deleted: bool = False,
-                              ) -> list[dict]:
+                              *,
+                              as_records: bool = False,
+                              ) -> list[dict] | list[ProductRecord]:
         """
         Получение списка элементов номенклатуры, по артикулу, по id, по типу элемента номенклатуры, по категории продукта и по родительской группе.
 
@@ -33,6 +38,7 @@ class NomenclatureEndpoints:
         :param ids: список id, по которым необходимо отфильтровать список, если None - получить все
         :param category_ids: список категорий, по которым необходимо отфильтровать список, если None - получить все
         :param parent_ids: список родительских групп, по которым необходимо отфильтровать список, если None - получить все
+        :param as_records: вернуть компактные записи ProductRecord вместо словарей
         :return: список словарей, где каждый словарь представляет элемент номенклатуры
         :raises ValueError: если ответ API не является валидным JSON
         """
@@ -58,10 +64,12 @@ class NomenclatureEndpoints:
         result: Response = self.client.get(url, params=params if params else None)
 
         try:
-            return result.json()
+            if as_records:
+                return parse_json_records(result, ProductRecord, self.client.json_backend)
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
     def get_nomenclature_groups(
@@ -69,7 +77,9 @@ class NomenclatureEndpoints:
             parent_ids: list[str] | None = None,
             nums: list[str] | None = None,
             include_deleted: bool = False,
-    ) -> list[dict]:
+            *,
+            as_records: bool = False,
+    ) -> list[dict] | list[GroupRecord]:
         """
         Получение списка групп номенклатуры
 
@@ -79,6 +89,7 @@ class NomenclatureEndpoints:
          если None - получить все
         :param nums: список артикулов групп номенклатуры, по которым необходимо получить список,
          если None - получить все
+        :param as_records: вернуть компактные записи GroupRecord вместо словарей
 
         :return: список словарей, где каждый словарь представляет группу номенклатуры
         :raises ValueError: если ответ API не является валидным JSON
@@ -100,10 +111,12 @@ class NomenclatureEndpoints:
         result: Response = self.client.get(url, params=params if params else None)
 
         try:
-            return result.json()
+            if as_records:
+                return parse_json_records(result, GroupRecord, self.client.json_backend)
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
     def import_product(self, product: Product) -> dict:
@@ -125,53 +138,89 @@ class NomenclatureEndpoints:
             headers=headers
         )
 
-        # Безопасный парсинг JSON ответа
-        try:
-            response_data = result.json()
-        except (json.JSONDecodeError, ValueError) as e:
-            # Если ответ - не JSON (например, просто строка)
-            raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
-            ) from e
+        return _save_response(result, self.client, "Ошибка при импорте продукта")
+
+    def update_product(self, product_id: str, product: Product) -> dict:
+        """
+        Обновление существующего элемента номенклатуры
+
+        :param product_id: UUID обновляемого элемента номенклатуры
+        :param product: Объект Product с новыми данными элемента номенклатуры
+        :return: Словарь с результатом обновления (содержит обновленный продукт)
+        :raises IikoAPIError: если API вернул ошибку (result != SUCCESS или неожиданный формат ответа)
+        :raises ValueError: если product_id не задан или ответ API не является валидным JSON
+        """
+        if not product_id:
+            raise ValueError("Не задан параметр product_id")
+        url = "/resto/api/v2/entities/products/update"
+        headers = {"Content-Type": "application/json"}
+
+        body = product.model_dump(mode="json", exclude_none=True)
+        body["id"] = product_id
+        result: Response = self.client.post(
+            endpoint=url,
+            data=json.dumps(body, ensure_ascii=False),
+            headers=headers
+        )
+        return _save_response(result, self.client, "Ошибка при обновлении продукта")
+
 
-        # Проверяем, что ответ - словарь (не список и не строка)
-        if not isinstance(response_data, dict):
-            raise IikoAPIError(
-                f"API вернул неожиданный формат ответа (ожидался dict, получен {type(response_data).__name__}): {response_data}"
-            )
-
-        # API возвращает структуру с полями result, errors, response
-        # response содержит созданный продукт
-        result_status = response_data.get("result")
-
-        if result_status == "SUCCESS":
-            response_result = response_data.get("response")
-            if response_result is None:
-                # Если response отсутствует, возвращаем весь ответ
-                return response_data
-            return response_result
-        elif result_status == "ERROR":
-            # Бизнес-ошибка API: HTTP 200, но операция не выполнена
-            errors = response_data.get("errors", [])
-            # Безопасная обработка errors - может быть не списком
-            if not isinstance(errors, list):
-                errors = []
-
-            error_messages = [
-                f"{err.get('code', 'UNKNOWN')}: {err.get('value', '')}"
-                for err in errors
-                if isinstance(err, dict)
-            ]
-            error_message = "Ошибка при импорте продукта"
-            if error_messages:
-                error_message += f". Ошибки: {', '.join(error_messages)}"
-            else:
-                error_message += f". Статус: {result_status}"
-
-            raise IikoAPIError(error_message, errors=errors)
+def _save_response(result: Response, client: BaseClient, error_title: str) -> dict:
+    """
+    Разбор ответа сохранения элемента номенклатуры (структура с полями result, errors, response)
+
+    :param result: ответ API
+    :param client: клиент (для выбора JSON-декодера)
+    :param error_title: начало сообщения об ошибке API
+    :return: поле response (или весь ответ, если response отсутствует)
+    """
+    # Безопасный парсинг JSON ответа
+    try:
+        response_data = response_json(result, client.json_backend)
+    except (json.JSONDecodeError, ValueError) as e:
+        # Если ответ - не JSON (например, просто строка)
+        raise ValueError(
+            f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
+        ) from e
+
+    # Проверяем, что ответ - словарь (не список и не строка)
+    if not isinstance(response_data, dict):
+        raise IikoAPIError(
+            f"API вернул неожиданный формат ответа (ожидался dict, получен {type(response_data).__name__}): {response_data}"
+        )
+
+    # API возвращает структуру с полями result, errors, response
+    # response содержит сохраненный продукт
+    result_status = response_data.get("result")
+
+    if result_status == "SUCCESS":
+        response_result = response_data.get("response")
+        if response_result is None:
+            # Если response отсутствует, возвращаем весь ответ
+            return response_data
+        return response_result
+    elif result_status == "ERROR":
+        # Бизнес-ошибка API: HTTP 200, но операция не выполнена
+        errors = response_data.get("errors", [])
+        # Безопасная обработка errors - может быть не списком
+        if not isinstance(errors, list):
+            errors = []
+
+        error_messages = [
+            f"{err.get('code', 'UNKNOWN')}: {err.get('value', '')}"
+            for err in errors
+            if isinstance(err, dict)
+        ]
+        error_message = error_title
+        if error_messages:
+            error_message += f". Ошибки: {', '.join(error_messages)}"
         else:
-            # Неожиданный статус (не SUCCESS и не ERROR)
-            raise IikoAPIError(
-                f"API вернул неожиданный статус результата: {result_status}. "
-                f"Полный ответ: {response_data}"
-            )
+            error_message += f". Статус: {result_status}"
+
+        raise IikoAPIError(error_message, errors=errors)
+    else:
+        # Неожиданный статус (не SUCCESS и не ERROR)
+        raise IikoAPIError(
+            f"API вернул неожиданный статус результата: {result_status}. "
+            f"Полный ответ: {response_data}"
+        )
@@ -2,35 +2,31 @@ from __future__ import annotations
 
 import json
 import math
+from collections.abc import Iterator
 from datetime import date, datetime, timedelta
 from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
-from typing import Any
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
 from uuid import UUID
 
 from requests import Response
 
 from iiko_api.core import BaseClient
+from iiko_api.core.dates import as_date, olap_day_start, parse_olap_day
+from iiko_api.core.json_backend import JsonBackend, response_json
+from iiko_api.core.spill import response_preview
+
+if TYPE_CHECKING:
+    from iiko_api.core.concurrency import TaskOutcome
+    from iiko_api.olap.frame import OlapFrame
+    from iiko_api.olap.many import OlapManyResult
+    from iiko_api.olap.presets import PresetPeriodResult
+    from iiko_api.olap.stream import OlapRow
 
 OLAP_ENDPOINT = "/resto/api/v2/reports/olap"
 MONEY_QUANT = Decimal("0.01")
 
 
-def _as_date(value: datetime | date) -> date:
-    return value.date() if isinstance(value, datetime) else value
-
-
-def _olap_day_start(value: datetime | date) -> str:
-    return _as_date(value).strftime("%Y-%m-%dT00:00:00.000")
-
-
-def _parse_olap_day(raw_date: Any) -> date:
-    text = str(raw_date).strip()
-    try:
-        return date.fromisoformat(text[:10])
-    except ValueError as e:
-        raise ValueError(f"Некорректная дата в OLAP ответе: {raw_date!r}") from e
-
-
 def _parse_decimal(value: Any, *, field: str) -> Decimal:
     """Parse OLAP numeric values without float binary artifacts."""
     if value is None or value == "":
@@ -62,48 +58,47 @@ def _parse_money_decimal(value: Any, *, field: str) -> Decimal:
     return _parse_decimal(value, field=field).quantize(MONEY_QUANT, rounding=ROUND_HALF_UP)
 
 
-def _response_json_object(result: Response) -> dict[str, Any]:
+def _response_json_object(result: Response, backend: JsonBackend | None = None) -> dict[str, Any]:
     try:
         # Prefer Decimal for JSON numbers so sales never become binary floats.
-        payload = result.json(parse_float=Decimal)
+        payload = response_json(result, backend, decimal=True)
     except (json.JSONDecodeError, ValueError) as e:
         raise ValueError(
-            f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+            f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
         ) from e
     if not isinstance(payload, dict):
         raise ValueError("API вернул неожиданный JSON (ожидался object)")
     return payload
 
 
-def build_fiscal_sales_olap_body(
+def _fiscal_sales_body(
     date_from: datetime | date,
     date_to: datetime | date,
-    department_id: str,
+    department_ids: list[str],
+    group_by: list[str],
 ) -> dict[str, Any]:
-    if not str(department_id).strip():
-        raise ValueError("department_id не может быть пустым")
-    start = _as_date(date_from)
-    end = _as_date(date_to)
+    start = as_date(date_from)
+    end = as_date(date_to)
     if start > end:
         raise ValueError("date_from должен быть меньше или равен date_to")
     return {
         "reportType": "SALES",
         "buildSummary": False,
-        "groupByRowFields": ["OpenDate.Typed"],
+        "groupByRowFields": group_by,
         "groupByColFields": [],
         "aggregateFields": ["DishDiscountSumInt"],
         "filters": {
             "OpenDate.Typed": {
                 "filterType": "DateRange",
                 "periodType": "CUSTOM",
-                "from": _olap_day_start(start),
-                "to": _olap_day_start(end + timedelta(days=1)),
+                "from": olap_day_start(start),
+                "to": olap_day_start(end + timedelta(days=1)),
                 "includeLow": True,
                 "includeHigh": False,
             },
             "Department.Id": {
                 "filterType": "IncludeValues",
-                "values": [department_id],
+                "values": department_ids,
             },
             "PayTypes.IsPrintCheque": {
                 "filterType": "IncludeValues",
@@ -113,6 +108,96 @@ def build_fiscal_sales_olap_body(
     }
 
 
+def build_fiscal_sales_olap_body(
+    date_from: datetime | date,
+    date_to: datetime | date,
+    department_id: str,
+) -> dict[str, Any]:
+    if not str(department_id).strip():
+        raise ValueError("department_id не может быть пустым")
+    return _fiscal_sales_body(date_from, date_to, [department_id], ["OpenDate.Typed"])
+
+
+def _unique_department_ids(department_ids: list[str]) -> list[str]:
+    unique = list(dict.fromkeys(department_ids))
+    if not unique:
+        raise ValueError("department_ids не может быть пустым")
+    if any(not str(department_id).strip() for department_id in unique):
+        raise ValueError("department_id не может быть пустым")
+    return unique
+
+
+def build_fiscal_sales_by_department_olap_body(
+    date_from: datetime | date,
+    date_to: datetime | date,
+    department_ids: list[str],
+) -> dict[str, Any]:
+    """Тело fiscal OLAP SALES по нескольким подразделениям (группировка Department.Id, OpenDate.Typed)."""
+    return _fiscal_sales_body(
+        date_from,
+        date_to,
+        _unique_department_ids(department_ids),
+        ["Department.Id", "OpenDate.Typed"],
+    )
+
+
+def build_dish_sales_olap_body(
+    date_from: datetime | date,
+    date_to: datetime | date,
+    department_ids: list[str],
+) -> dict[str, Any]:
+    """Тело OLAP SALES: количество блюд (DishAmountInt) по Department.Id, OpenDate.Typed и DishId."""
+    start = as_date(date_from)
+    end = as_date(date_to)
+    if start > end:
+        raise ValueError("date_from должен быть меньше или равен date_to")
+    return {
+        "reportType": "SALES",
+        "buildSummary": False,
+        "groupByRowFields": ["Department.Id", "OpenDate.Typed", "DishId"],
+        "groupByColFields": [],
+        "aggregateFields": ["DishAmountInt"],
+        "filters": {
+            "OpenDate.Typed": {
+                "filterType": "DateRange",
+                "periodType": "CUSTOM",
+                "from": olap_day_start(start),
+                "to": olap_day_start(end + timedelta(days=1)),
+                "includeLow": True,
+                "includeHigh": False,
+            },
+            "Department.Id": {
+                "filterType": "IncludeValues",
+                "values": _unique_department_ids(department_ids),
+            },
+        },
+    }
+
+
+def fiscal_sales_from_payload(payload: dict[str, Any]) -> dict[date, Decimal]:
+    """
+    Выручка по дням из ответа OLAP на тело build_fiscal_sales_olap_body.
+
+    Строки без даты пропускаются.
+
+    :return: {date: DishDiscountSumInt}
+    :raises ValueError: если дата или сумма в строке некорректны
+    """
+    sales: dict[date, Decimal] = {}
+    for row in payload.get("data") or []:
+        if not isinstance(row, dict):
+            continue
+        raw_date = row.get("OpenDate.Typed")
+        if not raw_date:
+            continue
+        day = parse_olap_day(raw_date)
+        sales[day] = _parse_money_decimal(
+            row.get("DishDiscountSumInt"),
+            field="DishDiscountSumInt",
+        )
+    return sales
+
+
 class OLAP:
     """Класс представляющий методы работы с OLAP отчетами."""
 
@@ -145,8 +230,8 @@ class OLAP:
         if date_to is not None and not isinstance(date_to, date):
             raise TypeError("date_to должен быть типа date или datetime")
 
-        start = _as_date(date_from) if date_from is not None else None
-        end = _as_date(date_to) if date_to is not None else None
+        start = as_date(date_from) if date_from is not None else None
+        end = as_date(date_to) if date_to is not None else None
         if start is not None and end is not None and start == end:
             raise ValueError("date_from и date_to должны быть разными")
         if start is not None and end is not None and start > end:
@@ -160,49 +245,336 @@ class OLAP:
 
         params = {"dateFrom": date_from_str, "dateTo": date_to_str}
         result: Response = self.client.get(url, params=params)
-        return _response_json_object(result)
+        return _response_json_object(result, self.client.json_backend)
+
+    def get_olap_by_preset_periods(
+        self,
+        preset_id: str,
+        periods: list[tuple[datetime | date, datetime | date]] | None = None,
+        *,
+        date_from: datetime | date | None = None,
+        date_to: datetime | date | None = None,
+        granularity: str | int = "month",
+        max_workers: int = 4,
+        checkpoint: str | Path | None = None,
+        fail_fast: bool = False,
+    ) -> list[PresetPeriodResult]:
+        """
+        Преднастроенный отчет за несколько периодов с параллельным выполнением.
+
+        Периоды задаются списком (date_from, date_to) или диапазоном date_from/date_to
+        с гранулярностью ("day", "week", "month" или число дней). Ошибка одного периода
+        не прерывает остальные: она сохраняется в PresetPeriodResult.error.
+        С checkpoint ответы выполненных периодов сохраняются в файл, и повторный вызов
+        запрашивает только невыполненные периоды.
+
+        :param preset_id: UUID преднастроенного отчета
+        :param periods: периоды (date_from включается, date_to не включается)
+        :param date_from: начало диапазона (если periods не заданы)
+        :param date_to: конец диапазона, не включается (если periods не заданы)
+        :param granularity: длина периодов при делении диапазона
+        :param max_workers: максимальное число одновременных запросов
+        :param checkpoint: путь к JSON-файлу контрольной точки
+        :param fail_fast: при первой ошибке прекратить выполнение и пробросить исключение
+        :return: результаты в порядке периодов
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.presets import run_preset_periods, split_periods
+
+        try:
+            UUID(preset_id)
+        except ValueError:
+            raise ValueError("preset_id должен быть валидным UUID") from None
+        if periods is None:
+            if date_from is None or date_to is None:
+                raise ValueError("Укажите periods или date_from и date_to")
+            periods = split_periods(date_from, date_to, granularity)
+        elif date_from is not None or date_to is not None:
+            raise ValueError("periods нельзя указывать вместе с date_from/date_to")
+        return run_preset_periods(
+            self,
+            preset_id,
+            periods,
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            fail_fast=fail_fast,
+        )
+
+    def query_olap(
+        self,
+        body: dict[str, Any],
+        *,
+        timeout: float | tuple[float, float] | None = None,
+    ) -> dict[str, Any]:
+        """
+        Произвольный OLAP-запрос (POST /resto/api/v2/reports/olap).
+
+        :param body: тело OLAP-запроса
+        :param timeout: таймаут запроса в секундах (или (connect, read)); по умолчанию — таймаут клиента
+        """
+        if not isinstance(body, dict) or not body:
+            raise ValueError("body должен быть непустым dict")
+        result = self.client.post(OLAP_ENDPOINT, json=body, timeout=timeout)
+        return _response_json_object(result, self.client.json_backend)
+
+    def query_olap_many(
+        self,
+        bodies: list[dict[str, Any]],
+        *,
+        timeout: float | list[float | None] | None = None,
+        max_workers: int = 4,
+        fail_fast: bool = False,
+    ) -> OlapManyResult:
+        """
+        Несколько OLAP-запросов параллельно через общую сессию клиента.
+
+        Ошибка одного запроса не прерывает остальные (если не задан fail_fast).
+
+        :param bodies: тела OLAP-запросов
+        :param timeout: таймаут в секундах — общий или список по телам (None — таймаут клиента)
+        :param max_workers: максимальное число одновременных запросов
+        :param fail_fast: при первой ошибке отменить оставшиеся запросы и пробросить исключение
+        :return: OlapManyResult — результаты в порядке bodies и сводная статистика времени
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.many import query_olap_many
 
-    def query_olap(self, body: dict[str, Any]) -> dict[str, Any]:
-        """Произвольный OLAP-запрос (POST /resto/api/v2/reports/olap)."""
+        return query_olap_many(self, bodies, timeout=timeout, max_workers=max_workers, fail_fast=fail_fast)
+
+    def iter_olap_many(
+        self,
+        bodies: list[dict[str, Any]],
+        *,
+        timeout: float | list[float | None] | None = None,
+        max_workers: int = 4,
+        fail_fast: bool = False,
+    ) -> Iterator[TaskOutcome[dict[str, Any]]]:
+        """
+        Несколько OLAP-запросов параллельно с результатами по мере завершения.
+
+        Закрытие итератора (break) отменяет еще не начатые запросы. Параметры — как у query_olap_many.
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.many import iter_olap_many
+
+        return iter_olap_many(self, bodies, timeout=timeout, max_workers=max_workers, fail_fast=fail_fast)
+
+    def iter_olap_rows(
+        self,
+        body: dict[str, Any],
+        *,
+        chunk_size: int = 64 * 1024,
+    ) -> Iterator[OlapRow]:
+        """
+        Произвольный OLAP-запрос с потоковым чтением строк.
+
+        Массив data разбирается из потока ответа по одной строке, весь ответ в памяти
+        не хранится. Строки — OlapRow: дробные числа разбираются в Decimal только при
+        обращении к полю (``row["DishDiscountSumInt"]``, ``row.money(...)``, ``row.day()``).
+        Соединение закрывается, когда итератор исчерпан или закрыт.
+
+        :param body: тело OLAP-запроса
+        :param chunk_size: размер блока чтения ответа в байтах
+        :raises ValueError: если ответ не является корректным JSON
+        """
         if not isinstance(body, dict) or not body:
             raise ValueError("body должен быть непустым dict")
-        result = self.client.post(OLAP_ENDPOINT, json=body)
-        return _response_json_object(result)
+        return self._stream_olap_rows(body, chunk_size)
+
+    def _stream_olap_rows(self, body: dict[str, Any], chunk_size: int) -> Iterator[OlapRow]:
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.stream import iter_olap_rows
+
+        result = self.client.post(OLAP_ENDPOINT, json=body, stream=True)
+        try:
+            yield from iter_olap_rows(result.iter_content(chunk_size), encoding=result.encoding or "utf-8")
+        finally:
+            result.close()
+
+    def export_olap(
+        self,
+        body: dict[str, Any],
+        target: str | Path | IO[bytes],
+        format: str = "ndjson",
+        *,
+        scales: dict[str, int] | None = None,
+        batch_size: int = 65_536,
+    ) -> int:
+        """
+        OLAP-запрос с выгрузкой результата в файл (NDJSON, Arrow IPC или Parquet).
+
+        Ответ читается потоком (iter_olap_rows) и пишется пачками по batch_size строк, поэтому
+        память не зависит от размера отчета. Схема: измерения — строки, меры — десятичные
+        с фиксированным числом знаков, без float. Файл по пути пишется во временный файл
+        в том же каталоге и заменяет целевой только после успешного запроса и записи.
+
+        :param body: тело OLAP-запроса
+        :param target: путь к файлу или бинарный файловый объект
+        :param format: "ndjson", "arrow" или "parquet" (два последних требуют pyarrow)
+        :param scales: число знаков после запятой для отдельных мер (по умолчанию 2)
+        :param batch_size: число строк в пачке (группе строк Parquet)
+        :return: число выгруженных строк
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.export import OlapSchema, export_olap_rows
+
+        schema = OlapSchema.from_body(body, scales)
+        return export_olap_rows(self.iter_olap_rows(body), target, format, schema=schema, batch_size=batch_size)
+
+    def query_olap_frame(
+        self,
+        body: dict[str, Any],
+        scales: dict[str, int] | None = None,
+    ) -> OlapFrame:
+        """
+        OLAP-запрос с результатом в колоночном виде (OlapFrame).
+
+        Измерения (groupByRowFields, groupByColFields) хранятся словарно-кодированными колонками,
+        меры (aggregateFields) — массивами int64 с фиксированной точкой.
+
+        :param body: тело OLAP-запроса
+        :param scales: число знаков после запятой для отдельных мер (по умолчанию 2 — копейки)
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.olap.frame import OlapFrame
+
+        return OlapFrame.from_payload(self.query_olap(body), body, scales)
+
+    def query_olap_split(
+        self,
+        body: dict[str, Any],
+        window_days: int = 31,
+        *,
+        max_workers: int = 4,
+        date_field: str | None = None,
+        additive_fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        OLAP-запрос за длинный период частями.
+
+        Период фильтра DateRange делится на окна по window_days дней, окна запрашиваются
+        параллельно (не более max_workers одновременно), строки с одинаковыми значениями
+        groupByRowFields/groupByColFields суммируются. Результат совпадает с ответом
+        query_olap на исходное тело, поэтому допускаются только аддитивные aggregateFields.
+
+        :param body: тело OLAP-запроса с фильтром DateRange (periodType=CUSTOM)
+        :param window_days: длина окна в днях
+        :param max_workers: максимальное число одновременных запросов
+        :param date_field: поле фильтра DateRange, если их в теле несколько
+        :param additive_fields: поля, которые следует считать аддитивными независимо от имени
+        :raises ValueError: если в теле есть неаддитивные поля, buildSummary=True
+            или период задан некорректно
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.core.concurrency import run_concurrently
+        from iiko_api.olap.split import check_additive, merge_olap_payloads, split_olap_body
+
+        if not isinstance(body, dict) or not body:
+            raise ValueError("body должен быть непустым dict")
+        check_additive(body, additive_fields)
+        bodies = split_olap_body(body, window_days, date_field=date_field)
+        if len(bodies) == 1:
+            return self.query_olap(bodies[0])
+        payloads: list[dict[str, Any]] = [{}] * len(bodies)
+        for outcome in run_concurrently(self.query_olap, bodies, max_workers=max_workers, fail_fast=True):
+            payloads[outcome.index] = outcome.result
+        return merge_olap_payloads(payloads, body)
 
     def get_fiscal_sales_olap_raw(
         self,
         date_from: datetime | date,
         date_to: datetime | date,
         department_id: str,
+        *,
+        window_days: int | None = None,
+        max_workers: int = 4,
     ) -> dict[str, Any]:
-        """Сырой fiscal OLAP SALES payload (DishDiscountSumInt, FISCAL)."""
+        """
+        Сырой fiscal OLAP SALES payload (DishDiscountSumInt, FISCAL).
+
+        :param window_days: если задано, период запрашивается частями по window_days дней
+            (см. query_olap_split)
+        :param max_workers: максимальное число одновременных запросов при разбиении
+        """
         if not str(department_id).strip():
             raise ValueError("department_id не может быть пустым")
-        return self.query_olap(build_fiscal_sales_olap_body(date_from, date_to, department_id))
+        body = build_fiscal_sales_olap_body(date_from, date_to, department_id)
+        if window_days is None:
+            return self.query_olap(body)
+        return self.query_olap_split(body, window_days, max_workers=max_workers)
+
+    def get_fiscal_sales_by_day_for_departments(
+        self,
+        date_from: datetime | date,
+        date_to: datetime | date,
+        department_ids: list[str],
+        *,
+        max_departments_per_request: int = 50,
+        max_workers: int = 4,
+    ) -> dict[str, dict[date, Decimal]]:
+        """
+        Фискальная выручка по дням для нескольких подразделений.
+
+        Все id передаются одним фильтром Department.Id; если их больше max_departments_per_request,
+        запрос делится на части, которые выполняются параллельно (не более max_workers одновременно).
+        Суммы квантуются до 0.01 (HALF_UP).
+
+        :param department_ids: id подразделений (повторы игнорируются)
+        :param max_departments_per_request: максимальное число id в одном запросе
+        :param max_workers: максимальное число одновременных запросов
+        :return: {department_id: {date: Decimal}}; подразделение без продаж — пустой dict
+        """
+        # Локальный импорт: iiko_api.olap использует парсеры этого модуля
+        from iiko_api.core.concurrency import run_concurrently
+
+        if max_departments_per_request < 1:
+            raise ValueError("max_departments_per_request должен быть не меньше 1")
+        unique_ids = _unique_department_ids(department_ids)
+        bodies = [
+            build_fiscal_sales_by_department_olap_body(
+                date_from, date_to, unique_ids[i:i + max_departments_per_request]
+            )
+            for i in range(0, len(unique_ids), max_departments_per_request)
+        ]
+
+        sales: dict[str, dict[date, Decimal]] = {department_id: {} for department_id in unique_ids}
+        for outcome in run_concurrently(self.query_olap, bodies, max_workers=max_workers, fail_fast=True):
+            for row in outcome.result.get("data") or []:
+                if not isinstance(row, dict):
+                    continue
+                raw_date = row.get("OpenDate.Typed")
+                department_id = row.get("Department.Id")
+                if not raw_date or department_id is None:
+                    continue
+                sales.setdefault(department_id, {})[parse_olap_day(raw_date)] = _parse_money_decimal(
+                    row.get("DishDiscountSumInt"),
+                    field="DishDiscountSumInt",
+                )
+        return {department_id: dict(sorted(days.items())) for department_id, days in sales.items()}
 
     def get_fiscal_sales_by_day(
         self,
         date_from: datetime | date,
         date_to: datetime | date,
         department_id: str,
+        *,
+        window_days: int | None = None,
+        max_workers: int = 4,
     ) -> dict[date, Decimal]:
         """
         Фискальная выручка по дням как Decimal (не float).
 
         Поле: DishDiscountSumInt, фильтр PayTypes.IsPrintCheque=FISCAL.
         Суммы квантуются до 0.01 (HALF_UP).
+
+        :param window_days: если задано, период запрашивается частями по window_days дней
+        :param max_workers: максимальное число одновременных запросов при разбиении
         """
-        payload = self.get_fiscal_sales_olap_raw(date_from, date_to, department_id)
-        sales: dict[date, Decimal] = {}
-        for row in payload.get("data") or []:
-            if not isinstance(row, dict):
-                continue
-            raw_date = row.get("OpenDate.Typed")
-            if not raw_date:
-                continue
-            day = _parse_olap_day(raw_date)
-            sales[day] = _parse_money_decimal(
-                row.get("DishDiscountSumInt"),
-                field="DishDiscountSumInt",
-            )
-        return sales
+        payload = self.get_fiscal_sales_olap_raw(
+            date_from,
+            date_to,
+            department_id,
+            window_days=window_days,
+            max_workers=max_workers,
+        )
+        return fiscal_sales_from_payload(payload)
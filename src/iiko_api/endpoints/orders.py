@@ -4,9 +4,13 @@ from typing import Any
 from requests import Response
 
 from iiko_api.core import BaseClient
+from iiko_api.core.json_backend import response_json
+from iiko_api.core.spill import response_preview
 from iiko_api.exceptions import IikoAPIError
 
+from ..models.bulk import BulkOrder
 from ..models.models import Order
+from ..models.records import PriceRecord, parse_json_records
 
 
 class OrdersEndpoints:
@@ -16,11 +20,12 @@ class OrdersEndpoints:
     def __init__(self, client: BaseClient):
         self.client = client
 
-    def set_new_order(self, order: Order) -> dict:
+    def set_new_order(self, order: Order | BulkOrder) -> dict:
         """
         Создание нового приказа
 
         :param order: Объект Order с данными приказа
+                      (или BulkOrder — колоночный построитель для приказов на десятки тысяч позиций)
         :return: словарь с результатом создания приказа
         :raises IikoAPIError: если API вернул ошибку (result != SUCCESS или неожиданный формат ответа)
         :raises ValueError: если ответ API не является валидным JSON
@@ -37,10 +42,10 @@ class OrdersEndpoints:
 
         # Безопасный парсинг JSON ответа
         try:
-            response_data = result.json()
+            response_data = response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
         # Проверяем, что ответ - словарь (не список и не строка)
@@ -90,8 +95,10 @@ class OrdersEndpoints:
             date_from: str,
             date_to: str = None,
             type_: str = "BASE",
-            department_id: str | list = None
-    ) -> dict:
+            department_id: str | list = None,
+            *,
+            as_records: bool = False
+    ) -> dict | list[PriceRecord]:
         """
         Получение цен установленных приказами
 
@@ -102,6 +109,7 @@ class OrdersEndpoints:
             BASE - Цена, которая действует на всем заданном интервале, т.е. из базового приказа.
             SCHEDULED - Цена, которая действует по расписанию на заданном интервале, т.е. из приказа по времени.
         :param department_id: Список ресторанов, по которым делается запрос. Если не задан, то для всех.
+        :param as_records: вернуть список компактных записей PriceRecord (строки из поля response)
         :return: словарь с данными о ценах
         :raises ValueError: если date_from не задан или ответ API не является валидным JSON
         """
@@ -131,8 +139,10 @@ class OrdersEndpoints:
         result: Response = self.client.get(endpoint=url, params=params)
 
         try:
-            return result.json()
+            if as_records:
+                return parse_json_records(result, PriceRecord, self.client.json_backend, key="response")
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
@@ -3,6 +3,8 @@ import json
 from requests import Response
 
 from iiko_api.core import BaseClient
+from iiko_api.core.json_backend import response_json
+from iiko_api.core.spill import response_preview
 from iiko_api.models.models import ReferenceType
 
 
@@ -32,10 +34,10 @@ class ReferencesEndpoints:
         result: Response = self.client.get(url, params=params)
 
         try:
-            return result.json()
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
 
     def get_measure_units(self) -> list[dict]:
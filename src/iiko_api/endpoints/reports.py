@@ -3,6 +3,7 @@ from datetime import date, datetime
 import xmltodict
 
 from iiko_api.core import BaseClient
+from iiko_api.core.spill import response_preview, response_source
 
 
 class ReportsEndpoints:
@@ -52,10 +53,10 @@ class ReportsEndpoints:
 
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         try:
@@ -87,5 +88,5 @@ class ReportsEndpoints:
         except (KeyError, AttributeError, ValueError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа или ошибка обработки данных. "
-                f"Ожидалась структура dayDishValues/dayDishValue. Ответ: {xml_data.text[:200]}"
+                f"Ожидалась структура dayDishValues/dayDishValue. Ответ: {response_preview(xml_data)}"
             ) from e
@@ -1,5 +1,6 @@
 import json
 import re
+from collections.abc import Mapping
 from datetime import datetime
 from typing import Any
 
@@ -7,6 +8,20 @@ import xmltodict
 from requests import Response
 
 from iiko_api.core import BaseClient
+from iiko_api.core.json_backend import response_json
+from iiko_api.core.spill import response_preview, response_source
+from iiko_api.models.records import StoreRecord, parse_xml_records
+
+
+def balance_rows(balance: Any) -> list[Any]:
+    """
+    Строки остатков (store, product, amount, sum) из ответа get_stores_balance.
+
+    :param balance: список строк или dict с ключом "response"
+    """
+    if isinstance(balance, Mapping):
+        balance = balance.get("response") or []
+    return list(balance or [])
 
 
 class StoresEndpoints:
@@ -17,11 +32,12 @@ class StoresEndpoints:
     def __init__(self, client: BaseClient):
         self.client = client
 
-    def get_stores(self, auto_login=True) -> list[dict]:
+    def get_stores(self, auto_login=True, *, as_records: bool = False) -> list[dict] | list[StoreRecord]:
         """
         Метод для получения списка складов
 
         :param auto_login: Параметр оставлен для обратной совместимости, но больше не используется
+        :param as_records: вернуть компактные записи StoreRecord вместо словарей
         :return: Список словарей, где каждый словарь представляет склад
         :raises ValueError: если XML не может быть распарсен или структура данных неожиданная
         """
@@ -30,12 +46,15 @@ class StoresEndpoints:
         # Декоратор _handle_request_errors уже обработал ошибки (status >= 400)
         xml_data = self.client.get(url)
 
+        if as_records:
+            return parse_xml_records(xml_data, "corporateItemDto", StoreRecord)
+
         try:
             # Преобразование XML-данных в словарь
-            dict_data = xmltodict.parse(xml_data.text)
+            dict_data = xmltodict.parse(response_source(xml_data))
         except Exception as e:
             raise ValueError(
-                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {xml_data.text[:200]}"
+                f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(xml_data)}"
             ) from e
 
         # Безопасное извлечение данных из структуры XML
@@ -59,7 +78,7 @@ class StoresEndpoints:
         except (KeyError, AttributeError) as e:
             raise ValueError(
                 f"Неожиданная структура XML ответа. Ожидалась структура corporateItemDtoes/corporateItemDto. "
-                f"Ответ: {xml_data.text[:200]}"
+                f"Ответ: {response_preview(xml_data)}"
             ) from e
 
     def get_stores_balance(self, timestamp: str = "now", auto_login=True) -> dict:
@@ -92,8 +111,8 @@ class StoresEndpoints:
         result: Response = self.client.get(url, params=params)
 
         try:
-            return result.json()
+            return response_json(result, self.client.json_backend)
         except (json.JSONDecodeError, ValueError) as e:
             raise ValueError(
-                f"API вернул невалидный JSON. Ответ: {result.text[:200]}"
+                f"API вернул невалидный JSON. Ответ: {response_preview(result)}"
             ) from e
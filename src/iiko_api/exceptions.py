@@ -58,3 +58,27 @@ class IikoConnectionError(Exception):
     def __init__(self, message: str = "Ошибка подключения к API iiko", original_exception: Exception = None):
         self.original_exception = original_exception
         super().__init__(message)
+
+
+class IikoValidationError(ValueError):
+    """
+    Исключение локальной проверки данных перед отправкой в API iiko.
+
+    Список найденных ошибок сохраняется в атрибуте errors: словари с ключами
+    index (позиция элемента в пакете), field (поле), value (значение) и message.
+    """
+    def __init__(self, message: str, errors: list[dict] = None):
+        self.errors = errors or []
+        super().__init__(message)
+
+
+class AssemblyChartCycleError(ValueError):
+    """
+    Исключение, возникающее при циклической ссылке техкарт
+    (продукт прямо или через заготовки входит в собственную техкарту).
+
+    Цепочка UUID продуктов цикла сохраняется в атрибуте cycle.
+    """
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__(f"Цикл в техкартах: {' -> '.join(cycle)}")
@@ -18,6 +18,9 @@ class IikoApi:
         timeout: float = 30.0,
         *,
         log_bodies: bool = False,
+        json_backend: str | None = None,
+        spill_threshold: int | None = None,
+        spill_dir: str | None = None,
     ):
         """
         Инициализация клиента iiko API
@@ -27,6 +30,11 @@ class IikoApi:
         :param hash_password: хэш пароля
         :param timeout: таймаут для HTTP запросов в секундах (по умолчанию 30)
         :param log_bodies: если True — логировать request/response body (опасно)
+        :param json_backend: JSON-декодер ответов: "auto", "orjson", "msgspec", "ujson" или "json"
+                             (по умолчанию None — стандартный json)
+        :param spill_threshold: порог в байтах, выше которого тело ответа пишется во временный файл
+                                и разбирается через mmap (по умолчанию None — всё в памяти)
+        :param spill_dir: каталог для временных файлов (по умолчанию системный)
         """
         self.client = BaseClient(
             base_url,
@@ -34,6 +42,9 @@ class IikoApi:
             hash_password,
             timeout=timeout,
             log_bodies=log_bodies,
+            json_backend=json_backend,
+            spill_threshold=spill_threshold,
+            spill_dir=spill_dir,
         )
         self.with_authorization = self.client.with_auth
         self.auth_context = self.client.auth
@@ -1,3 +1,25 @@
+from .bulk import BulkAssemblyChart, BulkOrder
 from .models import Item, Order
+from .records import (
+    AttendanceRecord,
+    EmployeeRecord,
+    GroupRecord,
+    PriceRecord,
+    ProductRecord,
+    RoleRecord,
+    StoreRecord,
+)
 
-__all__ = ["Order", "Item"]
+__all__ = [
+    "Order",
+    "Item",
+    "BulkOrder",
+    "BulkAssemblyChart",
+    "ProductRecord",
+    "GroupRecord",
+    "EmployeeRecord",
+    "RoleRecord",
+    "AttendanceRecord",
+    "StoreRecord",
+    "PriceRecord",
+]
@@ -0,0 +1,245 @@
+"""
+Колоночные построители больших приказов и техкарт.
+
+``Order`` с десятками тысяч ``Item`` валидирует и сериализует каждый элемент через pydantic,
+что на переоценке всей сети занимает секунды. ``BulkOrder`` и ``BulkAssemblyChart`` принимают
+данные колонками (последовательности id, цен, количеств), проверяют каждую колонку один раз
+и пишут JSON напрямую. Результат ``model_dump_json()`` совпадает с JSON соответствующей
+pydantic-модели, поэтому объекты можно передавать в ``set_new_order`` и ``save_assembly_chart``.
+"""
+from __future__ import annotations
+
+import math
+import sys
+from collections.abc import Sequence
+from json.encoder import encode_basestring
+from numbers import Integral, Real
+from typing import Any
+
+from .models import AssemblyChart, Status, StoreSpecification
+
+_JSON_BOOL = {True: "true", False: "false"}
+
+
+def _column(name: str, values: Any, size: int) -> Sequence:
+    """Разворачивает скаляр в колонку длины size и проверяет длину последовательности."""
+    if values is None or isinstance(values, (str, Real, *_bool_types())):
+        return [values] * size
+    if len(values) != size:
+        raise ValueError(f"Длина колонки {name} ({len(values)}) не совпадает с числом строк ({size})")
+    return values
+
+
+def _check_ids(name: str, values: Sequence) -> None:
+    if all(isinstance(value, str) and value for value in values):
+        return
+    index = next(i for i, value in enumerate(values) if not isinstance(value, str) or not value)
+    raise ValueError(f"{name}[{index}] должен быть непустой строкой, получено: {values[index]!r}")
+
+
+def _bool_types() -> tuple[type, ...]:
+    # numpy.bool_ из колонок DataFrame; numpy не импортируется, если вызывающий код его не загрузил
+    np = sys.modules.get("numpy")
+    return (bool, np.bool_) if np is not None else (bool,)
+
+
+def _bool_column(name: str, values: Sequence) -> Sequence[bool]:
+    if all(value is True or value is False for value in values):
+        return values
+    types = _bool_types()
+    for index, value in enumerate(values):
+        if not isinstance(value, types):
+            raise ValueError(f"{name}[{index}] должен быть bool, получено: {value!r}")
+    return [bool(value) for value in values]
+
+
+def _int_column(name: str, values: Sequence) -> Sequence[int]:
+    if all(type(value) is int for value in values):
+        return values
+    bools = _bool_types()
+    for index, value in enumerate(values):
+        if not isinstance(value, Integral) or isinstance(value, bools):
+            raise ValueError(f"{name}[{index}] должен быть int, получено: {value!r}")
+    return [int(value) for value in values]
+
+
+def _float_column(name: str, values: Sequence) -> list[float]:
+    bools = _bool_types()
+    try:
+        column = [float(value) for value in values if not isinstance(value, bools)]
+    except (TypeError, ValueError):
+        column = []
+    if len(column) == len(values) and all(map(math.isfinite, column)):
+        return column
+    for index, value in enumerate(values):
+        try:
+            number = float(value) if not isinstance(value, bools) else None
+        except (TypeError, ValueError):
+            number = None
+        if number is None:
+            raise ValueError(f"{name}[{index}] должен быть числом, получено: {value!r}")
+        if not math.isfinite(number):
+            # NaN и бесконечность не представимы в JSON
+            raise ValueError(f"{name}[{index}] должен быть конечным числом, получено: {value!r}")
+    raise ValueError(f"Колонка {name} содержит нечисловые значения")
+
+
+class BulkOrder:
+    """
+    Приказ об изменении цен (menuChange), заданный колонками.
+
+    Эквивалент ``Order(dateIncoming=..., items=[Item(...), ...])`` для больших объемов.
+
+    Attributes:
+        dateIncoming: Дата приказа вида "2024-12-23"
+        shortName: Короткое название приказа
+        size: Количество строк приказа
+    """
+
+    def __init__(
+        self,
+        date_incoming: str,
+        product_ids: Sequence[str],
+        department_ids: str | Sequence[str],
+        prices: Sequence[int],
+        *,
+        including: bool | Sequence[bool] = True,
+        flyer_program: bool | Sequence[bool] = False,
+        dish_of_day: bool | Sequence[bool] = False,
+        short_name: str = "",
+    ):
+        """
+        :param date_incoming: Дата приказа вида "2024-12-23"
+        :param product_ids: ID продуктов
+        :param department_ids: ID отделов (одна строка — для всех строк приказа)
+        :param prices: Цены (int, как в Item.price)
+        :param including: Включен ли продукт в приказ (bool или колонка)
+        :param flyer_program: Программа "Флаер" (bool или колонка)
+        :param dish_of_day: "Блюдо дня" (bool или колонка)
+        :param short_name: Короткое название приказа
+        :raises ValueError: если длины колонок не совпадают или значение колонки некорректно
+        """
+        if not isinstance(date_incoming, str) or not date_incoming:
+            raise ValueError("date_incoming должен быть непустой строкой")
+        size = len(product_ids)
+        self.dateIncoming = date_incoming
+        self.shortName = short_name
+        self.size = size
+        self.product_ids = product_ids
+        self.department_ids = _column("department_ids", department_ids, size)
+        self.prices = _column("prices", prices, size)
+        self.including = _column("including", including, size)
+        self.flyer_program = _column("flyer_program", flyer_program, size)
+        self.dish_of_day = _column("dish_of_day", dish_of_day, size)
+
+        _check_ids("product_ids", self.product_ids)
+        _check_ids("department_ids", self.department_ids)
+        self.prices = _int_column("prices", self.prices)
+        self.including = _bool_column("including", self.including)
+        self.flyer_program = _bool_column("flyer_program", self.flyer_program)
+        self.dish_of_day = _bool_column("dish_of_day", self.dish_of_day)
+
+    def model_dump_json(self) -> str:
+        """JSON приказа в том же виде, что и ``Order.model_dump_json()``."""
+        ids = {value: encode_basestring(value) for value in set(self.department_ids)}
+        items = ",".join(
+            f'{{"departmentId":{ids[department]},"productId":{encode_basestring(product)},'
+            f'"including":{_JSON_BOOL[including]},"price":{price},'
+            f'"flyerProgram":{_JSON_BOOL[flyer]},"dishOfDay":{_JSON_BOOL[dish]}}}'
+            for department, product, including, price, flyer, dish in zip(
+                self.department_ids,
+                self.product_ids,
+                self.including,
+                self.prices,
+                self.flyer_program,
+                self.dish_of_day,
+                strict=True,
+            )
+        )
+        return (
+            f'{{"status":"{Status.NEW.value}","dateIncoming":{encode_basestring(self.dateIncoming)},'
+            f'"shortName":{encode_basestring(self.shortName)},"deletePreviousMenu":false,"items":[{items}]}}'
+        )
+
+
+class BulkAssemblyChart:
+    """
+    Технологическая карта, ингредиенты которой заданы колонками.
+
+    Заголовок (все поля ``AssemblyChart`` кроме items) валидируется pydantic один раз,
+    ингредиенты — по колонкам.
+    """
+
+    def __init__(
+        self,
+        product_ids: Sequence[str],
+        amounts_in: Sequence[float],
+        amounts_out: Sequence[float] | float = 0.0,
+        amounts_middle: Sequence[float] | float = 0.0,
+        *,
+        sort_weights: Sequence[int] | int = 0,
+        store_specifications: Sequence[StoreSpecification | None] | None = None,
+        package_type_ids: Sequence[str | None] | None = None,
+        **header: Any,
+    ):
+        """
+        :param product_ids: UUID продуктов-ингредиентов
+        :param amounts_in: Количество на входе
+        :param amounts_out: Выход (число — для всех строк)
+        :param amounts_middle: Количество в процессе (число — для всех строк)
+        :param sort_weights: Веса сортировки (число — для всех строк)
+        :param store_specifications: Спецификации подразделений по строкам (None — без ограничений)
+        :param package_type_ids: UUID фасовок по строкам
+        :param header: Поля заголовка AssemblyChart (assembledProductId, dateFrom, ...)
+        :raises ValueError: если заголовок или колонки некорректны
+        """
+        self.header = AssemblyChart(items=[], **header)
+        size = len(product_ids)
+        self.size = size
+        self.product_ids = product_ids
+        _check_ids("product_ids", product_ids)
+        self.amounts_in = _float_column("amounts_in", _column("amounts_in", amounts_in, size))
+        self.amounts_out = _float_column("amounts_out", _column("amounts_out", amounts_out, size))
+        self.amounts_middle = _float_column("amounts_middle", _column("amounts_middle", amounts_middle, size))
+        self.sort_weights = _int_column("sort_weights", _column("sort_weights", sort_weights, size))
+        self.store_specifications = _column("store_specifications", store_specifications, size)
+        for index, spec in enumerate(self.store_specifications):
+            if spec is not None and not isinstance(spec, StoreSpecification):
+                raise ValueError(f"store_specifications[{index}] должен быть StoreSpecification или None")
+        self.package_type_ids = _column("package_type_ids", package_type_ids, size)
+        if any(value is not None for value in self.package_type_ids):
+            _check_ids("package_type_ids", [value for value in self.package_type_ids if value is not None])
+
+    def model_dump_json(self, exclude_none: bool = True) -> str:
+        """JSON техкарты в том же виде, что и ``AssemblyChart.model_dump_json(exclude_none=True)``."""
+        if not exclude_none:
+            raise ValueError("BulkAssemblyChart поддерживает только exclude_none=True")
+        specs: dict[int, str] = {}
+        rows = []
+        for weight, product, spec, amount_in, amount_middle, amount_out, package in zip(
+            self.sort_weights,
+            self.product_ids,
+            self.store_specifications,
+            self.amounts_in,
+            self.amounts_middle,
+            self.amounts_out,
+            self.package_type_ids,
+            strict=True,
+        ):
+            row = f'{{"sortWeight":{weight},"productId":{encode_basestring(product)},'
+            if spec is not None:
+                spec_json = specs.get(id(spec))
+                if spec_json is None:
+                    spec_json = specs[id(spec)] = spec.model_dump_json()
+                row += f'"storeSpecification":{spec_json},'
+            row += (
+                f'"amountIn":{amount_in!r},"amountMiddle":{amount_middle!r},"amountOut":{amount_out!r},'
+                '"amountIn1":0.0,"amountOut1":0.0,"amountIn2":0.0,"amountOut2":0.0,"amountIn3":0.0,"amountOut3":0.0'
+            )
+            if package is not None:
+                row += f',"packageTypeId":{encode_basestring(package)}'
+            rows.append(row + "}")
+        # "items":[] без экранирования может встретиться только как ключ заголовка
+        return self.header.model_dump_json(exclude_none=True).replace(
+            '"items":[]', f'"items":[{",".join(rows)}]', 1
+        )
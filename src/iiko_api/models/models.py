@@ -74,6 +74,7 @@ class Product(BaseModel):
 
     Attributes:
         name: Название элемента номенклатуры (обязательный)
+        num: Артикул (опциональный)
         description: Описание элемента (опциональный)
         parent: ID родительской группы номенклатуры (опциональный)
         modifiers: Список модификаторов (опциональный, пока не используется)
@@ -94,6 +95,7 @@ class Product(BaseModel):
         notInStoreMovement: Не учитывать в движении склада (по умолчанию False)
     """
     name: str
+    num: str | None = None
     description: str | None = None
     parent: str | None = None
     modifiers: list | None = None
@@ -0,0 +1,268 @@
+"""
+Компактные типизированные записи для результатов эндпоинтов.
+
+Альтернатива спискам dict для больших выгрузок (каталог, явки за год и т.п.):
+записи — dataclass со ``__slots__``, без словаря атрибутов на каждый экземпляр,
+поэтому занимают в несколько раз меньше памяти и дают быстрый доступ к полям.
+Имена полей совпадают с ключами ответа API. Записи содержат основные поля сущности;
+для полного набора полей используйте режим по умолчанию (dict).
+
+XML-ответы разбираются в записи потоково. JSON-ответ с декодером msgspec (``json_backend="msgspec"``
+или ``"auto"`` при установленном msgspec) декодируется сразу в записи, без промежуточного списка dict.
+С другими декодерами сначала строится весь список dict, а затем записи: снижается только
+память, занятая результатом после разбора, но не пиковое потребление.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from functools import cache
+from typing import Any, TypeVar
+
+import xmltodict
+from requests import Response
+
+from iiko_api.core.json_backend import JsonBackend, response_json
+from iiko_api.core.spill import response_preview, response_source, spilled_body
+
+R = TypeVar("R", bound="_Record")
+
+
+def _as_bool(value: Any) -> bool | None:
+    """Приводит JSON bool или XML-строку "true"/"false" к bool."""
+    if value is None or isinstance(value, bool):
+        return value
+    return str(value).strip().lower() == "true"
+
+
+@cache
+def _field_names(record_type: type) -> tuple[str, ...]:
+    return tuple(f.name for f in fields(record_type))
+
+
+def _as_tuple(value: Any) -> tuple:
+    """Приводит XML-значение (None, строка или список) к кортежу."""
+    if value is None:
+        return ()
+    if isinstance(value, list):
+        return tuple(value)
+    return (value,)
+
+
+class _Record:
+    """Базовый класс записей: построение из dict ответа API."""
+
+    __slots__ = ()
+
+    # Поля, которые в XML приходят строками "true"/"false"
+    _bool_fields: tuple[str, ...] = ()
+    # Поля, которые в XML могут быть одиночным значением или списком
+    _tuple_fields: tuple[str, ...] = ()
+
+    @classmethod
+    def from_dict(cls: type[R], data: dict[str, Any]) -> R:
+        values = {name: data.get(name) for name in _field_names(cls)}
+        for name in cls._bool_fields:
+            values[name] = _as_bool(values[name])
+        for name in cls._tuple_fields:
+            values[name] = _as_tuple(values[name])
+        return cls(**values)
+
+
+@dataclass(slots=True, frozen=True)
+class ProductRecord(_Record):
+    """Элемент номенклатуры (/resto/api/v2/entities/products/list)."""
+    id: str
+    name: str | None = None
+    num: str | None = None
+    code: str | None = None
+    type: str | None = None
+    parent: str | None = None
+    category: str | None = None
+    accountingCategory: str | None = None
+    taxCategory: str | None = None
+    mainUnit: str | None = None
+    defaultSalePrice: Any = None
+    unitWeight: Any = None
+    deleted: bool | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class GroupRecord(_Record):
+    """Группа номенклатуры (/resto/api/v2/entities/products/group/list)."""
+    id: str
+    name: str | None = None
+    num: str | None = None
+    code: str | None = None
+    parent: str | None = None
+    category: str | None = None
+    deleted: bool | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class EmployeeRecord(_Record):
+    """Сотрудник (/resto/api/employees)."""
+    _bool_fields = ("deleted",)
+    _tuple_fields = ("departmentCodes",)
+
+    id: str
+    code: str | None = None
+    name: str | None = None
+    login: str | None = None
+    mainRoleId: str | None = None
+    mainRoleCode: str | None = None
+    departmentCodes: tuple[str, ...] = ()
+    deleted: bool | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class RoleRecord(_Record):
+    """Роль сотрудника (/resto/api/employees/roles)."""
+    _bool_fields = ("deleted",)
+
+    id: str
+    code: str | None = None
+    name: str | None = None
+    paymentPerHour: str | None = None
+    steadySalary: str | None = None
+    scheduleType: str | None = None
+    deleted: bool | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class AttendanceRecord(_Record):
+    """Явка сотрудника (/resto/api/employees/attendance)."""
+    id: str
+    employeeId: str | None = None
+    roleId: str | None = None
+    departmentId: str | None = None
+    dateFrom: str | None = None
+    dateTo: str | None = None
+    attendanceType: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class StoreRecord(_Record):
+    """Склад (/resto/api/corporation/stores)."""
+    id: str
+    parentId: str | None = None
+    code: str | None = None
+    name: str | None = None
+    type: str | None = None
+
+
+@dataclass(slots=True, frozen=True)
+class PriceRecord(_Record):
+    """Строка цены из приказов (/resto/api/v2/price)."""
+    departmentId: str
+    productId: str
+    productSizeId: str | None = None
+    dateFrom: str | None = None
+    dateTo: str | None = None
+    price: Any = None
+    including: bool | None = None
+    dishOfDay: bool | None = None
+    flyerProgram: bool | None = None
+
+
+def to_records(record_type: type[R], rows: list[dict[str, Any]]) -> list[R]:
+    """
+    Преобразует список dict в список записей.
+
+    Список dict к этому моменту уже в памяти: уменьшается только память, занятая результатом.
+
+    :param record_type: класс записи (например ProductRecord)
+    :param rows: список dict из ответа API
+    :raises ValueError: если элемент списка не является dict
+    """
+    from_dict = record_type.from_dict
+    records = []
+    for row in rows:
+        if not isinstance(row, dict):
+            raise ValueError(f"Неожиданный элемент ответа (ожидался dict): {type(row).__name__}")
+        records.append(from_dict(row))
+    return records
+
+
+@cache
+def _msgspec_decoder(record_type: type, key: str | None) -> Any:
+    import msgspec
+
+    target: Any = list[record_type]
+    if key is not None:
+        # Строки в поле key объекта-обертки или (как и в dict-режиме) голый список
+        wrapper = msgspec.defstruct(
+            f"{record_type.__name__}Response",
+            [(key, list[record_type], msgspec.field(default_factory=list))],
+        )
+        target = target | wrapper
+    return msgspec.json.Decoder(target)
+
+
+def parse_json_records(
+    response: Response,
+    record_type: type[R],
+    backend: JsonBackend | None = None,
+    *,
+    key: str | None = None,
+) -> list[R]:
+    """
+    Разбирает JSON-список сразу в записи.
+
+    С backend msgspec тело декодируется прямо в записи (в том числе из сброшенного на диск тела),
+    с остальными — через список dict (см. to_records).
+
+    :param response: ответ API с JSON
+    :param record_type: класс записи
+    :param backend: JSON backend клиента
+    :param key: поле объекта-обертки со списком (например "response"); None — ответ является списком
+    :raises ValueError: если JSON невалиден или элемент списка не подходит под запись
+    """
+    if isinstance(backend, JsonBackend) and backend.name == "msgspec":
+        import msgspec
+
+        decoder = _msgspec_decoder(record_type, key)
+        try:
+            body = spilled_body(response)
+            if body is None:
+                decoded = decoder.decode(response.content)
+            else:
+                with body.view() as view:
+                    decoded = decoder.decode(view)
+        except msgspec.ValidationError as e:
+            raise ValueError(f"Неожиданный элемент ответа для {record_type.__name__}: {e}") from e
+        except msgspec.DecodeError as e:
+            raise ValueError(f"Некорректный JSON (msgspec): {e}") from e
+        return decoded if isinstance(decoded, list) else getattr(decoded, key)
+
+    payload = response_json(response, backend)
+    rows = payload.get(key) if key is not None and isinstance(payload, dict) else payload
+    return to_records(record_type, rows or [])
+
+
+def parse_xml_records(response: Response, item_tag: str, record_type: type[R]) -> list[R]:
+    """
+    Разбирает XML-список (``<root><item>...</item>...</root>``) сразу в записи.
+
+    Элементы разбираются потоково (xmltodict item_depth=2): промежуточный список dict
+    для всего ответа не строится.
+
+    :param response: ответ API с XML
+    :param item_tag: имя тега элемента (например "employee")
+    :param record_type: класс записи
+    :raises ValueError: если XML не может быть распарсен
+    """
+    records: list[R] = []
+    from_dict = record_type.from_dict
+
+    def _collect(path: list, item: Any) -> bool:
+        if path and path[-1][0] == item_tag and isinstance(item, dict):
+            records.append(from_dict(item))
+        return True
+
+    try:
+        xmltodict.parse(response_source(response), item_depth=2, item_callback=_collect)
+    except Exception as e:
+        raise ValueError(
+            f"Не удалось распарсить XML ответ. Ошибка: {e}. Ответ: {response_preview(response)}"
+        ) from e
+    return records
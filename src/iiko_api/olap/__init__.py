@@ -0,0 +1,14 @@
+from .batcher import OlapBatcher
+from .cache import CachedOLAP, MemoryOlapStore, SqliteOlapStore
+from .frame import DictColumn, OlapFrame
+from .rollup import OlapRollup
+
+__all__ = [
+    'OlapFrame',
+    'DictColumn',
+    'OlapRollup',
+    'OlapBatcher',
+    'CachedOLAP',
+    'MemoryOlapStore',
+    'SqliteOlapStore',
+]
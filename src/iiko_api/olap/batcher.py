@@ -0,0 +1,261 @@
+"""
+Объединение совместимых OLAP-запросов в один запрос к серверу.
+
+При обновлении дашбордов разные части сервиса одновременно отправляют десятки небольших
+``query_olap``, отличающихся только значениями ``Department.Id`` или подпериодом одного
+фильтра дат. ``OlapBatcher`` собирает запросы за короткое окно времени, объединяет
+совместимые в один (объединение подразделений, охватывающий период, объединение полей
+группировки и мер, плюс ``Department.Id`` и поле даты в группировке) и раскладывает
+ответ обратно по вызывающим: строки отбираются по подразделениям и дням каждого запроса
+и сворачиваются до его группировки. Объединяются только запросы с аддитивными мерами.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from collections.abc import Mapping
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.core.concurrency import run_concurrently
+from iiko_api.core.dates import parse_olap_day
+from iiko_api.olap.split import (
+    day_bounds,
+    find_date_range_filter,
+    is_additive_field,
+    merge_olap_rows,
+    with_date_range,
+)
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.olap import OLAP
+
+DEPARTMENT_FIELD = "Department.Id"
+DEFAULT_WINDOW = 0.05
+
+
+@dataclass
+class _Request:
+    body: dict[str, Any]
+    future: Future
+    departments: frozenset[str] | None = None
+    date_field: str | None = None
+    days: tuple[date, date] | None = None
+
+
+@dataclass
+class BatcherStats:
+    """
+    Счетчики OlapBatcher.
+
+    Attributes:
+        submitted: принято запросов
+        server_requests: выполнено запросов к серверу
+        fused: запросов, выполненных в составе объединенных
+    """
+    submitted: int = 0
+    server_requests: int = 0
+    fused: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, **counters: int) -> None:
+        with self._lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+def _fusion_key(request: _Request) -> str | None:
+    """Ключ совместимости запроса или None, если запрос выполняется отдельно."""
+    body = request.body
+    if body.get("buildSummary") is True:
+        return None
+    if not all(is_additive_field(name) for name in body.get("aggregateFields", [])):
+        return None
+    filters = dict(body.get("filters") or {})
+    if request.departments is not None:
+        filters.pop(DEPARTMENT_FIELD)
+    if request.date_field is not None:
+        filters.pop(request.date_field)
+    key = {
+        "reportType": body.get("reportType"),
+        "groupByColFields": body.get("groupByColFields", []),
+        "filters": filters,
+        "departments": request.departments is not None,
+        "dateField": request.date_field,
+    }
+    return json.dumps(key, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _describe(body: dict[str, Any]) -> _Request:
+    request = _Request(body, Future())
+    department_filter = (body.get("filters") or {}).get(DEPARTMENT_FIELD)
+    if isinstance(department_filter, Mapping) and department_filter.get("filterType") == "IncludeValues":
+        request.departments = frozenset(department_filter.get("values", ()))
+    try:
+        date_field, date_filter = find_date_range_filter(body)
+        days = day_bounds(date_filter)
+    except ValueError:
+        return request
+    if days is not None and days[0] <= days[1]:
+        request.date_field, request.days = date_field, days
+    return request
+
+
+def _fuse(requests: list[_Request]) -> dict[str, Any]:
+    """Объединенное тело запроса для группы совместимых запросов."""
+    first = requests[0]
+    body = copy.deepcopy(first.body)
+    body["buildSummary"] = False
+    group_by = list(dict.fromkeys(name for r in requests for name in r.body.get("groupByRowFields", [])))
+    if first.departments is not None:
+        departments = sorted(set().union(*(r.departments for r in requests)))
+        body["filters"][DEPARTMENT_FIELD] = {"filterType": "IncludeValues", "values": departments}
+        group_by.append(DEPARTMENT_FIELD)
+    if first.date_field is not None:
+        start = min(r.days[0] for r in requests)
+        end = max(r.days[1] for r in requests)
+        body = with_date_range(
+            body,
+            first.date_field,
+            datetime.combine(start, datetime.min.time()),
+            datetime.combine(end + timedelta(days=1), datetime.min.time()),
+        )
+        group_by.append(first.date_field)
+    body["groupByRowFields"] = list(dict.fromkeys(group_by))
+    body["aggregateFields"] = list(dict.fromkeys(name for r in requests for name in r.body.get("aggregateFields", [])))
+    return body
+
+
+def _split(request: _Request, rows: list[dict[str, Any]]) -> dict[str, Any]:
+    """Строки объединенного ответа, относящиеся к запросу, в его группировке."""
+    selected = rows
+    if request.departments is not None:
+        selected = [row for row in selected if row.get(DEPARTMENT_FIELD) in request.departments]
+    if request.date_field is not None:
+        first, last = request.days
+        selected = [row for row in selected if first <= parse_olap_day(row.get(request.date_field)) <= last]
+    body = request.body
+    key_fields = [*body.get("groupByRowFields", []), *body.get("groupByColFields", [])]
+    return {"data": merge_olap_rows(selected, key_fields, list(body.get("aggregateFields", [])))}
+
+
+class OlapBatcher:
+    """
+    Объединяет совместимые OLAP-запросы, поступившие в течение окна, в один запрос к серверу.
+
+    Совместимы запросы с одинаковыми reportType, groupByColFields и фильтрами, кроме фильтра
+    Department.Id (IncludeValues) и фильтра DateRange с границами на начало суток; меры
+    должны быть аддитивными. Остальные запросы выполняются как есть.
+
+    :param olap: эндпоинты OLAP (``iiko_client.olap``)
+    :param window: окно сбора запросов в секундах
+    :param max_batch: число ожидающих запросов, при котором окно закрывается досрочно
+        (запросы выполняются в потоке таймера, submit не блокируется)
+    :param max_workers: максимальное число одновременных запросов к серверу
+    """
+
+    def __init__(
+        self,
+        olap: OLAP,
+        *,
+        window: float = DEFAULT_WINDOW,
+        max_batch: int = 100,
+        max_workers: int = 4,
+    ):
+        if window < 0:
+            raise ValueError("window не может быть отрицательным")
+        if max_batch < 1:
+            raise ValueError("max_batch должен быть не меньше 1")
+        self.olap = olap
+        self.window = window
+        self.max_batch = max_batch
+        self.max_workers = max_workers
+        self.stats = BatcherStats()
+        self._pending: list[_Request] = []
+        self._lock = threading.Lock()
+        self._timer: threading.Timer | None = None
+
+    def submit(self, body: dict[str, Any]) -> Future:
+        """
+        Ставит запрос в очередь окна.
+
+        :param body: тело OLAP-запроса
+        :return: Future с ответом в формате query_olap
+        """
+        if not isinstance(body, dict) or not body:
+            raise ValueError("body должен быть непустым dict")
+        request = _describe(copy.deepcopy(body))
+        with self._lock:
+            self._pending.append(request)
+            self.stats.add(submitted=1)
+            if len(self._pending) >= self.max_batch:
+                # Окно закрывается досрочно, но запросы выполняет поток таймера, а не вызывающий
+                self._schedule(0)
+            elif self._timer is None:
+                self._schedule(self.window)
+        return request.future
+
+    def _schedule(self, delay: float) -> None:
+        """Запускает таймер выполнения ожидающих запросов (вызывается под self._lock)."""
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def query_olap(self, body: dict[str, Any]) -> dict[str, Any]:
+        """Запрос через окно объединения с ожиданием ответа (замена ``OLAP.query_olap``)."""
+        return self.submit(body).result()
+
+    def flush(self) -> None:
+        """Выполняет все ожидающие запросы, не дожидаясь окончания окна."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not pending:
+            return
+
+        groups: dict[str, list[_Request]] = {}
+        batches: list[list[_Request]] = []
+        for request in pending:
+            key = _fusion_key(request)
+            if key is None:
+                batches.append([request])
+            else:
+                groups.setdefault(key, []).append(request)
+        batches.extend(groups.values())
+        for _ in run_concurrently(self._execute, batches, max_workers=self.max_workers):
+            pass
+
+    def _execute(self, batch: list[_Request]) -> None:
+        try:
+            if len(batch) == 1:
+                self.stats.add(server_requests=1)
+                batch[0].future.set_result(self.olap.query_olap(batch[0].body))
+                return
+            self.stats.add(server_requests=1, fused=len(batch))
+            rows = [row for row in self.olap.query_olap(_fuse(batch)).get("data") or [] if isinstance(row, dict)]
+        except Exception as e:
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        for request in batch:
+            try:
+                request.future.set_result(_split(request, rows))
+            except Exception as e:
+                request.future.set_exception(e)
+
+    def close(self) -> None:
+        """Выполняет ожидающие запросы."""
+        self.flush()
+
+    def __enter__(self) -> OlapBatcher:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,285 @@
+"""
+Кэш результатов OLAP-запросов по дням.
+
+Закрытые торговые дни больше не меняются, а дашборд за 365 дней каждый раз скачивает
+всю историю. ``CachedOLAP`` хранит результат запроса по дневным партициям: ключ —
+нормализованное тело запроса (без периода), ``base_url`` сервера и день. Дни старше
+``settle_days`` берутся из хранилища, с сервера запрашиваются только отсутствующие
+и последние (еще открытые) дни — смежные дни одним запросом.
+"""
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+from collections.abc import Callable, Iterable, Mapping
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.core.concurrency import run_concurrently
+from iiko_api.core.dates import parse_olap_day
+from iiko_api.endpoints.olap import build_fiscal_sales_olap_body, fiscal_sales_from_payload
+from iiko_api.olap.split import (
+    check_additive,
+    day_bounds,
+    find_date_range_filter,
+    merge_olap_rows,
+    with_date_range,
+)
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.olap import OLAP
+
+DEFAULT_SETTLE_DAYS = 2
+
+
+class MemoryOlapStore:
+    """Хранилище партиций в памяти процесса."""
+
+    def __init__(self):
+        self._data: dict[tuple[str, date], str] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str, days: Iterable[date]) -> dict[date, str]:
+        with self._lock:
+            return {day: self._data[key, day] for day in days if (key, day) in self._data}
+
+    def save(self, key: str, partitions: Mapping[date, str]) -> None:
+        with self._lock:
+            for day, rows in partitions.items():
+                self._data[key, day] = rows
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class SqliteOlapStore:
+    """
+    Хранилище партиций в файле SQLite (переживает перезапуск процесса).
+
+    :param path: путь к файлу базы (":memory:" — база в памяти)
+    """
+
+    def __init__(self, path: str | Path):
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS olap_cache ("
+                "key TEXT NOT NULL, day TEXT NOT NULL, rows TEXT NOT NULL, PRIMARY KEY (key, day))"
+            )
+
+    def load(self, key: str, days: Iterable[date]) -> dict[date, str]:
+        wanted = {day.isoformat(): day for day in days}
+        if not wanted:
+            return {}
+        with self._lock:
+            cursor = self._connection.execute(
+                "SELECT day, rows FROM olap_cache WHERE key = ? AND day BETWEEN ? AND ?",
+                (key, min(wanted), max(wanted)),
+            )
+            return {wanted[day]: rows for day, rows in cursor if day in wanted}
+
+    def save(self, key: str, partitions: Mapping[date, str]) -> None:
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO olap_cache (key, day, rows) VALUES (?, ?, ?)",
+                [(key, day.isoformat(), rows) for day, rows in partitions.items()],
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM olap_cache")
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def _normalize_filters(filters: Mapping[str, Any], date_field: str) -> dict[str, Any]:
+    normalized = {}
+    for name, value in filters.items():
+        if name == date_field:
+            continue
+        if isinstance(value, Mapping) and isinstance(value.get("values"), list):
+            value = {**value, "values": sorted(value["values"], key=str)}
+        normalized[name] = value
+    return normalized
+
+
+def cache_key(body: Mapping[str, Any], base_url: str, date_field: str) -> str:
+    """
+    Ключ партиций запроса: хеш тела без периода и buildSummary, сервера и поля даты.
+
+    Порядок значений в фильтрах IncludeValues/ExcludeValues не влияет на ключ.
+    """
+    normalized = {
+        name: value for name, value in body.items()
+        if name not in ("filters", "buildSummary")
+    }
+    normalized["filters"] = _normalize_filters(body.get("filters") or {}, date_field)
+    normalized["dateField"] = date_field
+    normalized["baseUrl"] = base_url.rstrip("/")
+    text = json.dumps(normalized, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _contiguous_runs(days: list[date]) -> list[tuple[date, date]]:
+    runs: list[tuple[date, date]] = []
+    for day in sorted(days):
+        if runs and runs[-1][1] + timedelta(days=1) == day:
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+def _encode_rows(rows: list[dict[str, Any]]) -> str:
+    # Decimal сохраняется строкой, чтобы не терять точность; при чтении меры восстанавливаются
+    return json.dumps(rows, ensure_ascii=False, default=str)
+
+
+def _decode_rows(text: str, measures: list[str]) -> list[dict[str, Any]]:
+    rows = json.loads(text)
+    for row in rows:
+        for name in measures:
+            if isinstance(row.get(name), str):
+                row[name] = Decimal(row[name])
+    return rows
+
+
+class CachedOLAP:
+    """
+    OLAP-запросы с кэшем закрытых дней.
+
+    Запрос должен содержать фильтр DateRange с границами на начало суток. Поле фильтра
+    добавляется в groupByRowFields (если его там нет), строки раскладываются по дням,
+    а в ответе сворачиваются обратно — в этом случае все aggregateFields должны быть
+    аддитивными. Запросы с другими границами периода выполняются без кэша.
+
+    :param olap: эндпоинты OLAP (``iiko_client.olap``)
+    :param store: хранилище партиций (по умолчанию MemoryOlapStore)
+    :param settle_days: сколько последних дней (кроме сегодняшнего) считаются открытыми
+        и всегда запрашиваются с сервера
+    :param max_workers: максимальное число одновременных запросов недостающих периодов
+    :param today: функция текущей даты (по умолчанию date.today)
+    """
+
+    def __init__(
+        self,
+        olap: OLAP,
+        store: MemoryOlapStore | SqliteOlapStore | None = None,
+        *,
+        settle_days: int = DEFAULT_SETTLE_DAYS,
+        max_workers: int = 4,
+        today: Callable[[], date] = date.today,
+    ):
+        if settle_days < 0:
+            raise ValueError("settle_days не может быть отрицательным")
+        self.olap = olap
+        self.store = store if store is not None else MemoryOlapStore()
+        self.settle_days = settle_days
+        self.max_workers = max_workers
+        self.today = today
+
+    def is_closed(self, day: date) -> bool:
+        """Закрыт ли день (его данные можно брать из кэша)."""
+        return (self.today() - day).days > self.settle_days
+
+    def query_olap(
+        self,
+        body: dict[str, Any],
+        *,
+        date_field: str | None = None,
+        additive_fields: list[str] | None = None,
+    ) -> dict[str, Any]:
+        """
+        OLAP-запрос (как ``OLAP.query_olap``) с кэшем закрытых дней.
+
+        :param body: тело OLAP-запроса с фильтром DateRange
+        :param date_field: поле фильтра DateRange, если их в теле несколько
+        :param additive_fields: поля, которые следует считать аддитивными независимо от имени
+        :raises ValueError: если поле даты не в группировке, а среди aggregateFields есть неаддитивные,
+            или в ответе есть строка без значения поля даты
+        """
+        if not isinstance(body, dict) or not body:
+            raise ValueError("body должен быть непустым dict")
+        field, date_filter = find_date_range_filter(body, date_field)
+        bounds = day_bounds(date_filter)
+        if bounds is None:
+            return self.olap.query_olap(body)
+        first, last = bounds
+
+        row_fields = list(body.get("groupByRowFields", []))
+        collapse = field not in row_fields and field not in body.get("groupByColFields", [])
+        if collapse:
+            check_additive(body, additive_fields)
+        partition_body = copy.deepcopy(body)
+        partition_body["buildSummary"] = False
+        if collapse:
+            partition_body["groupByRowFields"] = [*row_fields, field]
+
+        measures = list(body.get("aggregateFields", []))
+        key = cache_key(body, self.olap.client.base_url, field)
+        days = [first + timedelta(days=offset) for offset in range((last - first).days + 1)]
+        closed = [day for day in days if self.is_closed(day)]
+        partitions = {
+            day: _decode_rows(text, measures)
+            for day, text in self.store.load(key, closed).items()
+        }
+        missing = [day for day in days if day not in partitions]
+        fetched = self._fetch(partition_body, field, _contiguous_runs(missing))
+        partitions.update(fetched)
+        self.store.save(key, {
+            day: _encode_rows(rows) for day, rows in fetched.items() if self.is_closed(day)
+        })
+
+        rows = [row for day in days for row in partitions.get(day, [])]
+        if collapse:
+            key_fields = [*row_fields, *body.get("groupByColFields", [])]
+            rows = merge_olap_rows(rows, key_fields, measures)
+        return {"data": rows}
+
+    def _fetch(
+        self,
+        body: dict[str, Any],
+        field: str,
+        runs: list[tuple[date, date]],
+    ) -> dict[date, list[dict[str, Any]]]:
+        """Запрашивает периоды и раскладывает строки по дням (дни без строк — пустые партиции)."""
+        def _query(run: tuple[date, date]) -> dict[str, Any]:
+            start = datetime.combine(run[0], datetime.min.time())
+            end = datetime.combine(run[1] + timedelta(days=1), datetime.min.time())
+            return self.olap.query_olap(with_date_range(body, field, start, end))
+
+        partitions: dict[date, list[dict[str, Any]]] = {}
+        for outcome in run_concurrently(_query, runs, max_workers=self.max_workers, fail_fast=True):
+            run_start, run_end = outcome.item
+            for offset in range((run_end - run_start).days + 1):
+                partitions[run_start + timedelta(days=offset)] = []
+            for row in outcome.result.get("data") or []:
+                if not isinstance(row, dict):
+                    continue
+                if not row.get(field):
+                    # Строку без дня нельзя отнести к партиции
+                    raise ValueError(f"Строка OLAP без значения {field}, кэш по дням неприменим: {row!r}")
+                partitions.setdefault(parse_olap_day(row[field]), []).append(row)
+        return partitions
+
+    def get_fiscal_sales_by_day(
+        self,
+        date_from: datetime | date,
+        date_to: datetime | date,
+        department_id: str,
+    ) -> dict[date, Decimal]:
+        """Фискальная выручка по дням (как ``OLAP.get_fiscal_sales_by_day``) с кэшем закрытых дней."""
+        body = build_fiscal_sales_olap_body(date_from, date_to, department_id)
+        return fiscal_sales_from_payload(self.query_olap(body))
+
+    def clear(self) -> None:
+        """Очищает хранилище."""
+        self.store.clear()
@@ -0,0 +1,282 @@
+"""
+Выгрузка строк OLAP-отчета в NDJSON, Arrow IPC и Parquet.
+
+Схема выгрузки определяется телом запроса: поля ``groupByRowFields``/``groupByColFields``
+становятся строковыми колонками, поля ``aggregateFields`` — десятичными с фиксированным
+числом знаков (NDJSON — точная десятичная запись числа, Arrow/Parquet — ``decimal128``).
+Строки пишутся пачками по ``batch_size`` (в Parquet — одна группа строк на пачку),
+деньги не проходят через float.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import IO, Any
+
+from iiko_api.olap.money import MONEY_SCALE, parse_money_column
+from iiko_api.olap.stream import OlapRow, RawNumber
+
+EXPORT_FORMATS = ("ndjson", "arrow", "parquet")
+DEFAULT_BATCH_SIZE = 65_536
+# Точность decimal128 в Arrow/Parquet
+DECIMAL_PRECISION = 38
+
+
+@dataclass(frozen=True)
+class OlapSchema:
+    """
+    Схема выгрузки OLAP-отчета.
+
+    Attributes:
+        dimensions: строковые колонки (поля группировки)
+        measures: десятичные колонки (поля агрегации)
+        scales: число знаков после запятой для каждой меры
+    """
+    dimensions: tuple[str, ...]
+    measures: tuple[str, ...]
+    scales: dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_body(
+        cls,
+        body: Mapping[str, Any],
+        scales: Mapping[str, int] | None = None,
+        *,
+        default_scale: int = MONEY_SCALE,
+    ) -> OlapSchema:
+        """Схема по телу OLAP-запроса (groupByRowFields, groupByColFields, aggregateFields)."""
+        measures = tuple(body.get("aggregateFields", []))
+        return cls(
+            dimensions=(*body.get("groupByRowFields", []), *body.get("groupByColFields", [])),
+            measures=measures,
+            scales={name: (scales or {}).get(name, default_scale) for name in measures},
+        )
+
+    @classmethod
+    def infer(
+        cls,
+        row: Mapping[str, Any],
+        scales: Mapping[str, int] | None = None,
+        *,
+        default_scale: int = MONEY_SCALE,
+    ) -> OlapSchema:
+        """
+        Схема по первой строке отчета (для get_olap_by_preset_id, где тела запроса нет).
+
+        Меры — поля с числовым значением, остальные поля — измерения.
+        """
+        get = _raw_getter(row)
+        measures = tuple(
+            name for name in row
+            if isinstance(get(name), (int, float, Decimal, RawNumber)) and not isinstance(get(name), bool)
+        )
+        return cls(
+            dimensions=tuple(name for name in row if name not in measures),
+            measures=measures,
+            scales={name: (scales or {}).get(name, default_scale) for name in measures},
+        )
+
+    def to_arrow(self) -> Any:
+        """Схема pyarrow: измерения — string, меры — decimal128(38, scale)."""
+        pa = _import_pyarrow()
+        return pa.schema(
+            [pa.field(name, pa.string()) for name in self.dimensions]
+            + [pa.field(name, pa.decimal128(DECIMAL_PRECISION, self.scales[name])) for name in self.measures]
+        )
+
+
+def _import_pyarrow() -> Any:
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Для выгрузки в Arrow/Parquet требуется pyarrow: pip install pyarrow") from e
+    return pa
+
+
+def _batches(rows: Iterable[Mapping[str, Any]], size: int) -> Iterator[list[Mapping[str, Any]]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _chain_first(first: list[Mapping[str, Any]], rest: Iterator[list[Mapping[str, Any]]]) -> Iterator[list]:
+    if first:
+        yield first
+    yield from rest
+
+
+def _raw_getter(row: Mapping[str, Any]) -> Any:
+    # OlapRow отдает исходный текст числа, без промежуточного Decimal
+    return row.raw if isinstance(row, OlapRow) else row.get
+
+
+def _dimension_text(value: Any) -> str | None:
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _format_fixed(units: int, scale: int) -> str:
+    """Десятичная запись числа units * 10^-scale без Decimal и float."""
+    if not scale:
+        return str(units)
+    digits = str(abs(units)).rjust(scale + 1, "0")
+    sign = "-" if units < 0 else ""
+    return f"{sign}{digits[:-scale]}.{digits[-scale:]}"
+
+
+def _columns(batch: list[Mapping[str, Any]], schema: OlapSchema) -> tuple[dict[str, list], dict[str, Any]]:
+    getters = [_raw_getter(row) for row in batch]
+    dimensions = {name: [_dimension_text(get(name)) for get in getters] for name in schema.dimensions}
+    measures = {
+        name: parse_money_column((get(name) for get in getters), field=name, scale=schema.scales[name])
+        for name in schema.measures
+    }
+    return dimensions, measures
+
+
+def _write_ndjson(batches: Iterable[list[Mapping[str, Any]]], schema: OlapSchema, sink: IO[bytes]) -> int:
+    names = [json.dumps(name, ensure_ascii=False) for name in (*schema.dimensions, *schema.measures)]
+    written = 0
+    for batch in batches:
+        dimensions, measures = _columns(batch, schema)
+        columns = [[json.dumps(value, ensure_ascii=False) for value in values] for values in dimensions.values()]
+        columns += [
+            [_format_fixed(units, schema.scales[name]) for units in measures[name]] for name in schema.measures
+        ]
+        lines = [
+            "{" + ",".join(f"{name}:{value}" for name, value in zip(names, values, strict=True)) + "}\n"
+            for values in zip(*columns, strict=True)
+        ] if columns else ["{}\n"] * len(batch)
+        sink.write("".join(lines).encode())
+        written += len(batch)
+    return written
+
+
+def _arrow_batch(batch: list[Mapping[str, Any]], schema: OlapSchema, arrow_schema: Any) -> Any:
+    pa = _import_pyarrow()
+    dimensions, measures = _columns(batch, schema)
+    arrays = [pa.array(dimensions[name], pa.string()) for name in schema.dimensions]
+    for name in schema.measures:
+        exponent = -schema.scales[name]
+        arrays.append(pa.array(
+            [Decimal(units).scaleb(exponent) for units in measures[name]],
+            pa.decimal128(DECIMAL_PRECISION, schema.scales[name]),
+        ))
+    return pa.RecordBatch.from_arrays(arrays, schema=arrow_schema)
+
+
+def _write_arrow(batches: Iterable[list[Mapping[str, Any]]], schema: OlapSchema, sink: Any) -> int:
+    pa = _import_pyarrow()
+    arrow_schema = schema.to_arrow()
+    written = 0
+    with pa.ipc.new_file(sink, arrow_schema) as writer:
+        for batch in batches:
+            writer.write_batch(_arrow_batch(batch, schema, arrow_schema))
+            written += len(batch)
+    return written
+
+
+def _write_parquet(batches: Iterable[list[Mapping[str, Any]]], schema: OlapSchema, sink: Any) -> int:
+    pa = _import_pyarrow()
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Для выгрузки в Parquet требуется pyarrow с поддержкой parquet") from e
+    arrow_schema = schema.to_arrow()
+    written = 0
+    with pq.ParquetWriter(sink, arrow_schema) as writer:
+        for batch in batches:
+            writer.write_table(pa.Table.from_batches([_arrow_batch(batch, schema, arrow_schema)]))
+            written += len(batch)
+    return written
+
+
+_WRITERS = {"ndjson": _write_ndjson, "arrow": _write_arrow, "parquet": _write_parquet}
+
+
+def export_olap_rows(
+    rows: Iterable[Mapping[str, Any]],
+    target: str | Path | IO[bytes],
+    format: str = "ndjson",
+    *,
+    schema: OlapSchema | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Выгружает строки OLAP-отчета в файл.
+
+    :param rows: строки отчета (dict из query_olap или OlapRow из iter_olap_rows)
+    :param target: путь к файлу (заменяется только после успешной выгрузки) или бинарный файловый объект
+    :param format: "ndjson", "arrow" (Arrow IPC file) или "parquet"
+    :param schema: схема выгрузки (OlapSchema.from_body); если не задана — по первой строке
+    :param batch_size: число строк в пачке (группе строк Parquet)
+    :return: число выгруженных строк
+    :raises ValueError: если формат неизвестен или значение меры не является числом
+    :raises ImportError: если для Arrow/Parquet не установлен pyarrow
+    """
+    if format not in _WRITERS:
+        raise ValueError(f"Неизвестный формат выгрузки: {format!r}. Доступны: {', '.join(EXPORT_FORMATS)}")
+    if batch_size < 1:
+        raise ValueError("batch_size должен быть не меньше 1")
+    if format != "ndjson":
+        # Проверяем зависимость до создания файла
+        _import_pyarrow()
+    rows = (row for row in rows if isinstance(row, Mapping))
+    batches = _batches(rows, batch_size)
+    if schema is None:
+        first = next(batches, [])
+        schema = OlapSchema.infer(first[0]) if first else OlapSchema((), ())
+        batches = _chain_first(first, batches)
+
+    if not isinstance(target, (str, Path)):
+        return _WRITERS[format](batches, schema, target)
+    # Пишем во временный файл рядом с целевым: при ошибке запроса или разбора
+    # предыдущая выгрузка остается нетронутой
+    path = Path(target)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            count = _WRITERS[format](batches, schema, sink)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+    return count
+
+
+def export_olap_payload(
+    payload: Mapping[str, Any],
+    target: str | Path | IO[bytes],
+    format: str = "ndjson",
+    *,
+    body: Mapping[str, Any] | None = None,
+    scales: Mapping[str, int] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Выгружает ответ query_olap / get_olap_by_preset_id в файл.
+
+    :param payload: ответ ({"data": [...]})
+    :param target: путь к файлу или бинарный файловый объект
+    :param format: "ndjson", "arrow" или "parquet"
+    :param body: тело запроса (определяет схему); без него схема берется по первой строке
+    :param scales: число знаков после запятой для отдельных мер (по умолчанию 2)
+    :param batch_size: число строк в пачке
+    :return: число выгруженных строк
+    """
+    rows: Sequence[Any] = payload.get("data") or []
+    if body is not None:
+        schema = OlapSchema.from_body(body, scales)
+    else:
+        first = next((row for row in rows if isinstance(row, Mapping)), None)
+        schema = OlapSchema.infer(first, scales) if first is not None else OlapSchema((), ())
+    return export_olap_rows(rows, target, format, schema=schema, batch_size=batch_size)
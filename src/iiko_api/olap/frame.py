@@ -0,0 +1,394 @@
+"""
+Колоночное представление результата OLAP-отчета.
+
+``OLAP.query_olap`` возвращает ``{"data": [{...}, ...]}``, и каждый потребитель обходит
+строки-словари. ``OlapFrame`` хранит каждое поле ``groupByRowFields``/``groupByColFields``
+как словарно-кодированную колонку (список уникальных значений + массив кодов int32),
+а каждое поле ``aggregateFields`` — как непрерывный массив int64 с фиксированной точкой
+(сумма в копейках при scale=2). Деньги не проходят через float.
+
+Если установлен NumPy, ``filter``, ``take`` и ``group_by`` работают векторно над буферами
+колонок (маски по кодам, суммирование ``np.add.reduceat`` в int64); без NumPy — циклами Python.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from decimal import Decimal
+from typing import Any
+
+from iiko_api.olap.money import parse_money_column
+
+DEFAULT_SCALE = 2
+
+
+def _numpy() -> Any:
+    """Модуль numpy или None, если он не установлен."""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+# Предел ключа группы int64 в group_by; при большем числе комбинаций категорий — np.lexsort
+_MAX_GROUP_KEY = 2 ** 62
+
+# Тип элементов numpy для кодов ('i') и мер ('q')
+_NUMPY_DTYPES = {"i": "int32", "q": "int64"}
+
+
+def _as_array(typecode: str, values: Any) -> array:
+    """array из numpy.ndarray без поэлементного копирования через Python."""
+    result = array(typecode)
+    result.frombytes(values.astype(_NUMPY_DTYPES[typecode], copy=False).tobytes())
+    return result
+
+
+class DictColumn:
+    """
+    Словарно-кодированная колонка измерения.
+
+    Attributes:
+        categories: уникальные значения в порядке первого появления
+        codes: индекс значения в categories для каждой строки (array('i'))
+    """
+
+    __slots__ = ("categories", "codes", "_index")
+
+    def __init__(self, categories: list[Any], codes: array):
+        self.categories = categories
+        self.codes = codes
+        self._index: dict[Any, int] | None = None
+
+    @classmethod
+    def encode(cls, values: Iterable[Any]) -> DictColumn:
+        index: dict[Any, int] = {}
+        codes = array("i", (index.setdefault(value, len(index)) for value in values))
+        column = cls(list(index), codes)
+        column._index = index
+        return column
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def code_of(self, value: Any) -> int | None:
+        """Код значения или None, если значения нет в колонке."""
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.categories)}
+        return self._index.get(value)
+
+    def take(self, indices: Sequence[int]) -> DictColumn:
+        np = _numpy()
+        if np is not None:
+            codes = np.frombuffer(self.codes, dtype=np.int32)
+            return DictColumn(self.categories, _as_array("i", codes[np.asarray(indices, dtype=np.intp)]))
+        codes = self.codes
+        return DictColumn(self.categories, array("i", [codes[i] for i in indices]))
+
+    def values(self) -> list[Any]:
+        categories = self.categories
+        return [categories[code] for code in self.codes]
+
+
+class OlapFrame:
+    """
+    Колоночный результат OLAP-отчета.
+
+    Attributes:
+        dimensions: имена полей измерений (groupByRowFields + groupByColFields)
+        measures: имена полей мер (aggregateFields)
+        scales: число знаков после запятой для каждой меры (2 — копейки)
+    """
+
+    def __init__(
+        self,
+        dimension_columns: dict[str, DictColumn],
+        measure_columns: dict[str, array],
+        scales: dict[str, int],
+    ):
+        lengths = {len(column) for column in (*dimension_columns.values(), *measure_columns.values())}
+        if len(lengths) > 1:
+            raise ValueError("Колонки OlapFrame должны быть одной длины")
+        self._dimensions = dimension_columns
+        self._measures = measure_columns
+        self.scales = scales
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[Mapping[str, Any]],
+        dimensions: Sequence[str],
+        measures: Sequence[str],
+        scales: Mapping[str, int] | None = None,
+        *,
+        default_scale: int = DEFAULT_SCALE,
+    ) -> OlapFrame:
+        """
+        Строит фрейм из строк OLAP-ответа.
+
+        :param rows: строки (dict) из поля data
+        :param dimensions: поля измерений
+        :param measures: поля мер
+        :param scales: число знаков после запятой для отдельных мер (например {"DishAmountInt": 3})
+        :param default_scale: число знаков для остальных мер (по умолчанию 2)
+        :raises ValueError: если значение меры не является числом
+        """
+        resolved_scales = {name: (scales or {}).get(name, default_scale) for name in measures}
+        rows = [row for row in rows if isinstance(row, Mapping)]
+        dimension_columns = {
+            name: DictColumn.encode(row.get(name) for row in rows) for name in dimensions
+        }
+        measure_columns = {
+            name: parse_money_column((row.get(name) for row in rows), field=name, scale=resolved_scales[name])
+            for name in measures
+        }
+        return cls(dimension_columns, measure_columns, resolved_scales)
+
+    @classmethod
+    def from_payload(
+        cls,
+        payload: Mapping[str, Any],
+        body: Mapping[str, Any] | None = None,
+        scales: Mapping[str, int] | None = None,
+        *,
+        default_scale: int = DEFAULT_SCALE,
+    ) -> OlapFrame:
+        """
+        Строит фрейм из ответа ``query_olap``.
+
+        Поля измерений и мер берутся из тела запроса (groupByRowFields, groupByColFields,
+        aggregateFields). Без body меры — поля с числовым значением в первой строке.
+
+        :param payload: ответ query_olap ({"data": [...]})
+        :param body: тело OLAP-запроса
+        :param scales: число знаков после запятой для отдельных мер
+        :param default_scale: число знаков для остальных мер
+        """
+        rows = payload.get("data") or []
+        if body is not None:
+            dimensions = [*body.get("groupByRowFields", []), *body.get("groupByColFields", [])]
+            measures = list(body.get("aggregateFields", []))
+        else:
+            first = next((row for row in rows if isinstance(row, Mapping)), {})
+            measures = [
+                name for name, value in first.items()
+                if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool)
+            ]
+            dimensions = [name for name in first if name not in measures]
+        return cls.from_rows(rows, dimensions, measures, scales, default_scale=default_scale)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"OlapFrame(rows={self._length}, dimensions={self.dimensions}, measures={self.measures})"
+
+    @property
+    def dimensions(self) -> list[str]:
+        return list(self._dimensions)
+
+    @property
+    def measures(self) -> list[str]:
+        return list(self._measures)
+
+    def dimension(self, name: str) -> DictColumn:
+        """Словарно-кодированная колонка измерения."""
+        try:
+            return self._dimensions[name]
+        except KeyError:
+            raise KeyError(f"Измерение {name!r} отсутствует в OlapFrame") from None
+
+    def measure(self, name: str) -> array:
+        """Колонка меры в целых единицах 10^-scale (array('q'))."""
+        try:
+            return self._measures[name]
+        except KeyError:
+            raise KeyError(f"Мера {name!r} отсутствует в OlapFrame") from None
+
+    def decimals(self, name: str) -> list[Decimal]:
+        """Значения меры как Decimal."""
+        scale = -self.scales[name]
+        return [Decimal(value).scaleb(scale) for value in self.measure(name)]
+
+    def sum(self, name: str) -> Decimal:
+        """Сумма меры как Decimal (точно, без float)."""
+        return Decimal(sum(self.measure(name))).scaleb(-self.scales[name])
+
+    def take(self, indices: Sequence[int]) -> OlapFrame:
+        """Фрейм из строк с указанными индексами."""
+        np = _numpy()
+        if np is not None:
+            positions = np.asarray(indices, dtype=np.intp)
+            measures = {
+                name: _as_array("q", np.frombuffer(column, dtype=np.int64)[positions])
+                for name, column in self._measures.items()
+            }
+        else:
+            measures = {name: array("q", [column[i] for i in indices]) for name, column in self._measures.items()}
+        return OlapFrame(
+            {name: column.take(indices) for name, column in self._dimensions.items()},
+            measures,
+            dict(self.scales),
+        )
+
+    def filter(self, **conditions: Any) -> OlapFrame:
+        """
+        Отбор строк по значениям измерений.
+
+        Условие — одно значение или множество/список допустимых значений. Поля с точкой
+        в имени передаются через распаковку: ``frame.filter(**{"Department.Id": {"d1", "d2"}})``.
+        Сравнение идет по кодам словаря, значения строк не декодируются.
+        """
+        allowed_codes: list[tuple[DictColumn, set[int]]] = []
+        for name, expected in conditions.items():
+            column = self.dimension(name)
+            if isinstance(expected, (set, frozenset, list, tuple)):
+                allowed = {code for value in expected if (code := column.code_of(value)) is not None}
+            else:
+                code = column.code_of(expected)
+                allowed = set() if code is None else {code}
+            allowed_codes.append((column, allowed))
+
+        np = _numpy()
+        if np is not None:
+            mask = np.ones(self._length, dtype=bool)
+            for column, allowed in allowed_codes:
+                mask &= np.isin(np.frombuffer(column.codes, dtype=np.int32), np.fromiter(allowed, dtype=np.int32))
+            return self.take(np.flatnonzero(mask))
+
+        selected: range | list[int] = range(self._length)
+        for column, allowed in allowed_codes:
+            codes = column.codes
+            selected = [i for i in selected if codes[i] in allowed]
+        return self.take(list(selected))
+
+    def group_by(self, *dimensions: str) -> OlapFrame:
+        """
+        Группировка по части измерений с суммированием мер.
+
+        Имеет смысл для аддитивных мер (суммы, количества).
+        """
+        columns = [self.dimension(name) for name in dimensions]
+        np = _numpy()
+        if np is not None and self._length:
+            return self._group_by_numpy(np, dimensions, columns)
+
+        group_of: dict[tuple[int, ...], int] = {}
+        row_groups = array(
+            "i",
+            (group_of.setdefault(key, len(group_of)) for key in zip(*(c.codes for c in columns), strict=True))
+            if columns else (0 for _ in range(self._length)),
+        )
+        if not columns and self._length:
+            group_of[()] = 0
+        group_count = len(group_of)
+
+        dimension_columns = {}
+        keys = list(group_of)
+        for position, (name, column) in enumerate(zip(dimensions, columns, strict=True)):
+            dimension_columns[name] = DictColumn(column.categories, array("i", (key[position] for key in keys)))
+
+        measure_columns = {}
+        for name, values in self._measures.items():
+            totals = [0] * group_count
+            for group, value in zip(row_groups, values, strict=True):
+                totals[group] += value
+            measure_columns[name] = array("q", totals)
+        return OlapFrame(dimension_columns, measure_columns, dict(self.scales))
+
+    def _group_by_numpy(self, np: Any, dimensions: Sequence[str], columns: list[DictColumn]) -> OlapFrame:
+        """group_by над буферами колонок: одна стабильная сортировка, суммы np.add.reduceat в int64."""
+        codes = [np.frombuffer(column.codes, dtype=np.int32) for column in columns]
+        sizes = [max(len(column.categories), 1) for column in columns]
+        if not codes:
+            permutation = np.arange(self._length)
+            starts = np.zeros(1, dtype=np.intp)
+        elif math.prod(sizes) < _MAX_GROUP_KEY:
+            # Ключ группы — одно число int64 (смешанная система счисления по числу категорий)
+            keys = np.zeros(self._length, dtype=np.int64)
+            for column_codes, size in zip(codes, sizes, strict=True):
+                keys = keys * size + column_codes
+            permutation = np.argsort(keys, kind="stable")
+            sorted_keys = keys[permutation]
+            starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        else:
+            permutation = np.lexsort(codes[::-1])
+            changed = np.zeros(self._length - 1, dtype=bool)
+            for column_codes in codes:
+                sorted_codes = column_codes[permutation]
+                changed |= sorted_codes[1:] != sorted_codes[:-1]
+            starts = np.flatnonzero(np.r_[True, changed])
+
+        # Сортировка стабильная: первая строка группы — ее первое появление; группы — в порядке появления
+        first_rows = permutation[starts]
+        order = np.argsort(first_rows, kind="stable")
+        dimension_columns = {
+            name: DictColumn(column.categories, _as_array("i", column_codes[first_rows[order]]))
+            for name, column, column_codes in zip(dimensions, columns, codes, strict=True)
+        }
+        measure_columns = {
+            name: _as_array("q", np.add.reduceat(np.frombuffer(values, dtype=np.int64)[permutation], starts)[order])
+            for name, values in self._measures.items()
+        }
+        return OlapFrame(dimension_columns, measure_columns, dict(self.scales))
+
+    def to_rows(self) -> Iterator[dict[str, Any]]:
+        """Строки как dict (меры — Decimal), в формате строк query_olap."""
+        names = [*self._dimensions, *self._measures]
+        columns = [column.values() for column in self._dimensions.values()]
+        columns += [self.decimals(name) for name in self._measures]
+        for values in zip(*columns, strict=True):
+            yield dict(zip(names, values, strict=True))
+
+    def to_numpy(self, *, as_float: bool = False) -> dict[str, Any]:
+        """
+        Колонки как массивы NumPy без построчных Python-объектов.
+
+        Меры — int64 в единицах 10^-scale (или float64 при as_float=True),
+        измерения — коды int32; значения кодов — в ``frame.dimension(name).categories``.
+
+        :raises ImportError: если NumPy не установлен
+        """
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError("Для OlapFrame.to_numpy требуется numpy: pip install numpy") from e
+        result: dict[str, Any] = {}
+        for name, column in self._dimensions.items():
+            result[name] = np.frombuffer(column.codes, dtype=np.int32)
+        for name, column in self._measures.items():
+            values = np.frombuffer(column, dtype=np.int64)
+            result[name] = values / 10 ** self.scales[name] if as_float else values
+        return result
+
+    def to_pandas(self, *, as_float: bool = False) -> Any:
+        """
+        DataFrame: измерения — Categorical (из кодов словаря), меры — int64 в единицах 10^-scale
+        (или float64 при as_float=True).
+
+        :raises ImportError: если pandas не установлен
+        """
+        try:
+            import numpy as np
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("Для OlapFrame.to_pandas требуется pandas: pip install pandas") from e
+        arrays = self.to_numpy(as_float=as_float)
+        data = {}
+        for name, column in self._dimensions.items():
+            codes, categories = arrays[name], column.categories
+            if None in categories:
+                # pandas не допускает None среди категорий: такие строки получают код -1 (NaN)
+                missing = categories.index(None)
+                remap = np.arange(len(categories), dtype=np.int32)
+                remap[missing] = -1
+                remap[missing + 1:] -= 1
+                codes = remap[codes]
+                categories = categories[:missing] + categories[missing + 1:]
+            data[name] = pd.Categorical.from_codes(codes, categories=pd.Index(categories, dtype=object))
+        for name in self._measures:
+            data[name] = arrays[name]
+        return pd.DataFrame(data)
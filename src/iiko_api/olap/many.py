@@ -0,0 +1,126 @@
+"""
+Параллельное выполнение набора разных OLAP-запросов.
+
+Запросы идут через общую сессию клиента (одна аутентификация), каждый со своим
+таймаутом: тривиальному отчету не нужно ждать таймаут, рассчитанный на годовой.
+"""
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.core.concurrency import TaskOutcome, run_concurrently
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.olap import OLAP
+
+Timeout = float | tuple[float, float] | None
+
+
+@dataclass
+class OlapManyStats:
+    """
+    Сводная статистика выполнения набора запросов.
+
+    Attributes:
+        wall_time: время выполнения всего набора в секундах
+        total_time: сумма времени выполнения запросов
+        max_time: время самого долгого запроса
+        succeeded: число успешных запросов
+        failed: число запросов с ошибкой
+    """
+    wall_time: float = 0.0
+    total_time: float = 0.0
+    max_time: float = 0.0
+    succeeded: int = 0
+    failed: int = 0
+
+    def add(self, outcome: TaskOutcome) -> None:
+        self.total_time += outcome.elapsed
+        self.max_time = max(self.max_time, outcome.elapsed)
+        if outcome.ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+
+
+@dataclass
+class OlapManyResult:
+    """
+    Результаты набора запросов в порядке входных тел.
+
+    Attributes:
+        outcomes: TaskOutcome для каждого тела (result — ответ query_olap, error — исключение)
+        stats: сводная статистика
+    """
+    outcomes: list[TaskOutcome[dict[str, Any]]]
+    stats: OlapManyStats = field(default_factory=OlapManyStats)
+
+    @property
+    def results(self) -> list[dict[str, Any] | None]:
+        """Ответы в порядке входных тел (None для запросов с ошибкой)."""
+        return [outcome.result for outcome in self.outcomes]
+
+    @property
+    def errors(self) -> dict[int, BaseException]:
+        """Ошибки по индексу входного тела."""
+        return {outcome.index: outcome.error for outcome in self.outcomes if outcome.error is not None}
+
+
+def _resolve_timeouts(count: int, timeout: Timeout | Sequence[Timeout]) -> list[Timeout]:
+    if isinstance(timeout, Sequence) and not isinstance(timeout, tuple):
+        if len(timeout) != count:
+            raise ValueError("Число таймаутов должно совпадать с числом тел запросов")
+        return list(timeout)
+    return [timeout] * count
+
+
+def iter_olap_many(
+    olap: OLAP,
+    bodies: Sequence[dict[str, Any]],
+    *,
+    timeout: Timeout | Sequence[Timeout] = None,
+    max_workers: int = 4,
+    fail_fast: bool = False,
+) -> Iterator[TaskOutcome[dict[str, Any]]]:
+    """
+    Выполняет запросы параллельно и отдает результаты по мере завершения.
+
+    Закрытие итератора отменяет еще не начатые запросы.
+
+    :param olap: эндпоинты OLAP
+    :param bodies: тела OLAP-запросов
+    :param timeout: таймаут HTTP-запроса в секундах — общий или список по телам
+        (None — таймаут клиента)
+    :param max_workers: максимальное число одновременных запросов
+    :param fail_fast: при первой ошибке отменить оставшиеся запросы и пробросить исключение
+    """
+    timeouts = _resolve_timeouts(len(bodies), timeout)
+
+    def _query(index: int) -> dict[str, Any]:
+        return olap.query_olap(bodies[index], timeout=timeouts[index])
+
+    for outcome in run_concurrently(_query, range(len(bodies)), max_workers=max_workers, fail_fast=fail_fast):
+        outcome.item = bodies[outcome.index]
+        yield outcome
+
+
+def query_olap_many(
+    olap: OLAP,
+    bodies: Sequence[dict[str, Any]],
+    *,
+    timeout: Timeout | Sequence[Timeout] = None,
+    max_workers: int = 4,
+    fail_fast: bool = False,
+) -> OlapManyResult:
+    """Выполняет запросы параллельно и возвращает результаты в порядке тел (см. iter_olap_many)."""
+    started = time.perf_counter()
+    stats = OlapManyStats()
+    outcomes: list[TaskOutcome[dict[str, Any]] | None] = [None] * len(bodies)
+    for outcome in iter_olap_many(olap, bodies, timeout=timeout, max_workers=max_workers, fail_fast=fail_fast):
+        outcomes[outcome.index] = outcome
+        stats.add(outcome)
+    stats.wall_time = time.perf_counter() - started
+    return OlapManyResult([outcome for outcome in outcomes if outcome is not None], stats)
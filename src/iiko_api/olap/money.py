@@ -0,0 +1,111 @@
+"""
+Пакетный разбор денежных колонок OLAP в целые единицы (копейки).
+
+``_parse_money_decimal`` разбирает одно значение: диспетчеризация по типу, очистка строки,
+создание ``Decimal`` и ``quantize``. Для колонки на миллионы значений ``parse_money_column``
+разбирает строки с обычной десятичной записью (``"123.45"``, ``RawNumber``) и float
+целочисленной арифметикой, ``Decimal`` — одним округлением без промежуточных объектов,
+а остальные значения передает построчному разбору — поэтому округление (HALF_UP)
+и ошибки совпадают с ``_parse_money_decimal``.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+
+from iiko_api.endpoints.olap import _parse_decimal
+
+MONEY_SCALE = 2
+
+
+def to_fixed(value: Any, *, field: str, scale: int = MONEY_SCALE) -> int:
+    """Значение в целых единицах 10^-scale (HALF_UP), ошибки как у _parse_money_decimal."""
+    number = _parse_decimal(value, field=field)
+    if not number.is_finite():
+        raise ValueError(f"Некорректное значение {field} в OLAP ответе: {value!r}")
+    return int(number.scaleb(scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def parse_money_column(
+    values: Iterable[Any],
+    *,
+    field: str,
+    scale: int = MONEY_SCALE,
+    as_numpy: bool = False,
+) -> Any:
+    """
+    Разбирает колонку меры в целые единицы 10^-scale (копейки при scale=2).
+
+    Результат совпадает с ``_parse_money_decimal(value) * 100`` для каждого значения:
+    None и "" — 0, округление HALF_UP, некорректные значения — ValueError с именем поля.
+
+    :param values: значения колонки (Decimal, str, RawNumber, int, float, None)
+    :param field: имя поля для сообщений об ошибках
+    :param scale: число знаков после запятой
+    :param as_numpy: вернуть numpy.ndarray int64 вместо array('q')
+    :raises ValueError: если значение не является числом или не помещается в int64
+    :raises ImportError: если as_numpy=True, а NumPy не установлен
+    """
+    if scale < 0:
+        raise ValueError("scale не может быть отрицательным")
+    factor = 10 ** scale
+    result = array("q")
+    append = result.append
+    try:
+        for value in values:
+            kind = type(value)
+            if kind is int:
+                append(value * factor)
+                continue
+            if value is None:
+                append(0)
+                continue
+            if kind is Decimal:
+                try:
+                    append(int(value.scaleb(scale).to_integral_value(rounding=ROUND_HALF_UP)))
+                except (ArithmeticError, ValueError):
+                    # NaN, Infinity: ошибка в формате _parse_money_decimal
+                    append(to_fixed(value, field=field, scale=scale))
+                continue
+            if kind is float:
+                # Как в _parse_decimal: float форматируется с 10 знаками, без Decimal(float)
+                text = format(value, ".10f")
+            elif isinstance(value, str):
+                text = value
+            else:
+                append(to_fixed(value, field=field, scale=scale))
+                continue
+
+            # Быстрый путь для записи "[-]digits[.digits]": целочисленная арифметика без Decimal
+            integer, _, fraction = text.partition(".")
+            negative = integer[:1] == "-"
+            if len(fraction) <= scale:
+                digits = integer + fraction.ljust(scale, "0")
+                tail = ""
+            else:
+                digits = integer + fraction[:scale]
+                tail = fraction[scale:]
+            unsigned = digits[1:] if negative else digits
+            if text.isascii() and unsigned.isdigit() and (not tail or tail.isdigit()):
+                units = int(digits)
+                # HALF_UP: округление модуля от нуля, если первая отбрасываемая цифра >= 5
+                if tail and tail[0] >= "5":
+                    units = units - 1 if negative else units + 1
+                if units or integer.lstrip("-") or fraction:
+                    append(units)
+                    continue
+            # Экспоненциальная запись, пробелы, запятая, "", ".", некорректные значения
+            append(to_fixed(value, field=field, scale=scale))
+    except OverflowError as e:
+        # array('q') не вмещает значение: ошибка в формате остальных разборщиков
+        raise ValueError(f"Значение {field} в OLAP ответе вне диапазона int64: {value!r}") from e
+
+    if not as_numpy:
+        return result
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("Для as_numpy=True требуется numpy: pip install numpy") from e
+    return np.frombuffer(result, dtype=np.int64).copy()
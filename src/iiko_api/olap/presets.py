@@ -0,0 +1,239 @@
+"""
+Выполнение преднастроенного OLAP-отчета за несколько периодов.
+
+``OLAP.get_olap_by_preset_id`` принимает один период, а помесячный отчет за год —
+это 12 последовательных запросов. ``run_preset_periods`` выполняет периоды параллельно
+(с ограничением числа одновременных запросов), возвращает результаты в порядке периодов,
+не прерывается из-за ошибки одного периода и может сохранять выполненные периоды
+в файл контрольной точки, чтобы повторный запуск запрашивал только оставшиеся.
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.core.concurrency import run_concurrently
+from iiko_api.core.dates import as_date
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.olap import OLAP
+
+GRANULARITIES = ("day", "week", "month")
+_DECIMAL_TAG = "__decimal__"
+
+
+@dataclass
+class PresetPeriodResult:
+    """
+    Результат отчета за один период.
+
+    Attributes:
+        date_from: начало периода (включается)
+        date_to: конец периода (не включается)
+        payload: ответ get_olap_by_preset_id (None при ошибке)
+        error: исключение запроса (None при успехе)
+        from_checkpoint: результат взят из контрольной точки, запрос не выполнялся
+    """
+    date_from: date
+    date_to: date
+    payload: dict[str, Any] | None = None
+    error: BaseException | None = None
+    from_checkpoint: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _next_boundary(day: date, granularity: str | int) -> date:
+    if isinstance(granularity, int):
+        return day + timedelta(days=granularity)
+    if granularity == "day":
+        return day + timedelta(days=1)
+    if granularity == "week":
+        return day + timedelta(days=7 - day.weekday())
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def split_periods(
+    date_from: datetime | date,
+    date_to: datetime | date,
+    granularity: str | int = "month",
+) -> list[tuple[date, date]]:
+    """
+    Делит период [date_from, date_to) на календарные периоды.
+
+    Периоды "week" и "month" выравниваются по началу недели (понедельник) и месяца,
+    первый и последний периоды обрезаются границами диапазона.
+
+    :param date_from: начало диапазона (включается)
+    :param date_to: конец диапазона (не включается)
+    :param granularity: "day", "week", "month" или длина периода в днях
+    :raises ValueError: если диапазон пуст или гранулярность неизвестна
+    """
+    if isinstance(granularity, bool) or (
+        not isinstance(granularity, int) and granularity not in GRANULARITIES
+    ):
+        raise ValueError(f"Неизвестная гранулярность: {granularity!r}. Доступны: {', '.join(GRANULARITIES)} или число дней")
+    if isinstance(granularity, int) and granularity < 1:
+        raise ValueError("Длина периода должна быть не меньше 1 дня")
+    start = as_date(date_from)
+    end = as_date(date_to)
+    if start >= end:
+        raise ValueError("date_from должен быть меньше date_to")
+    periods = []
+    while start < end:
+        boundary = min(_next_boundary(start, granularity), end)
+        periods.append((start, boundary))
+        start = boundary
+    return periods
+
+
+def _period_key(period: tuple[date, date]) -> str:
+    return f"{period[0].isoformat()}/{period[1].isoformat()}"
+
+
+def _encode_decimal(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return {_DECIMAL_TAG: str(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_decimal(obj: dict[str, Any]) -> Any:
+    if len(obj) == 1 and _DECIMAL_TAG in obj:
+        return Decimal(obj[_DECIMAL_TAG])
+    return obj
+
+
+class PresetCheckpoint:
+    """
+    Файл контрольной точки: ответы выполненных периодов отчета.
+
+    Формат — NDJSON: первая строка ``{"presetId": ...}``, далее по строке
+    ``{"period": ..., "payload": ...}`` на каждый выполненный период. Период дописывается
+    в конец файла, поэтому запись не зависит от числа уже сохраненных периодов.
+    Decimal сохраняются без потери точности. Оборванная при сбое последняя строка
+    и повторы периодов убираются при загрузке (файл атомарно переписывается).
+
+    :param path: путь к файлу
+    :param preset_id: UUID отчета; контрольная точка другого отчета не используется
+    :raises ValueError: если файл относится к другому отчету или поврежден
+    """
+
+    def __init__(self, path: str | Path, preset_id: str):
+        self.path = Path(path)
+        self.preset_id = preset_id
+        self.periods: dict[str, dict[str, Any]] = {}
+        if self.path.exists() and self.path.stat().st_size:
+            self._load()
+
+    def _load(self) -> None:
+        lines = self.path.read_text(encoding="utf-8").splitlines()
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Контрольная точка {self.path} повреждена: {e}") from e
+        if not isinstance(header, dict) or header.get("presetId") != self.preset_id:
+            other = header.get("presetId") if isinstance(header, dict) else None
+            raise ValueError(f"Контрольная точка {self.path} относится к отчету {other}, а не {self.preset_id}")
+        entries = lines[1:]
+        # Прежний формат: один JSON-объект со всеми периодами
+        legacy = json.loads(lines[0], object_hook=_decode_decimal).get("periods") or {}
+        self.periods.update(legacy)
+        for line in entries:
+            try:
+                entry = json.loads(line, object_hook=_decode_decimal)
+            except json.JSONDecodeError:
+                # Строка, оборванная при сбое процесса: период будет запрошен заново
+                continue
+            self.periods[entry["period"]] = entry["payload"]
+        if legacy or len(entries) != len(self.periods):
+            self._compact()
+
+    def _line(self, key: str, payload: dict[str, Any]) -> str:
+        return json.dumps({"period": key, "payload": payload}, ensure_ascii=False, default=_encode_decimal) + "\n"
+
+    def _header(self) -> str:
+        return json.dumps({"presetId": self.preset_id}, ensure_ascii=False) + "\n"
+
+    def _compact(self) -> None:
+        """Переписывает файл атомарно: заголовок и по строке на период."""
+        directory = self.path.parent
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                file.write(self._header())
+                for key, payload in self.periods.items():
+                    file.write(self._line(key, payload))
+            os.replace(temp_path, self.path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+    def get(self, period: tuple[date, date]) -> dict[str, Any] | None:
+        return self.periods.get(_period_key(period))
+
+    def save(self, period: tuple[date, date], payload: dict[str, Any]) -> None:
+        key = _period_key(period)
+        self.periods[key] = payload
+        if not self.path.exists() or not self.path.stat().st_size:
+            # Новый файл: заголовок и первый период
+            self._compact()
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(self._line(key, payload))
+
+
+def run_preset_periods(
+    olap: OLAP,
+    preset_id: str,
+    periods: Iterable[tuple[datetime | date, datetime | date]],
+    *,
+    max_workers: int = 4,
+    checkpoint: str | Path | None = None,
+    fail_fast: bool = False,
+) -> list[PresetPeriodResult]:
+    """
+    Выполняет преднастроенный отчет за каждый период.
+
+    :param olap: эндпоинты OLAP (``iiko_client.olap``)
+    :param preset_id: UUID преднастроенного отчета
+    :param periods: периоды (date_from, date_to), date_to не включается
+    :param max_workers: максимальное число одновременных запросов
+    :param checkpoint: путь к файлу контрольной точки; выполненные периоды из него не запрашиваются
+    :param fail_fast: при первой ошибке прекратить выполнение и пробросить исключение
+    :return: результаты в порядке periods; ошибки — в PresetPeriodResult.error
+    """
+    normalized: Sequence[tuple[date, date]] = [(as_date(start), as_date(end)) for start, end in periods]
+    store = PresetCheckpoint(checkpoint, preset_id) if checkpoint is not None else None
+    results = [PresetPeriodResult(start, end) for start, end in normalized]
+
+    pending = []
+    for index, period in enumerate(normalized):
+        payload = store.get(period) if store is not None else None
+        if payload is not None:
+            results[index].payload = payload
+            results[index].from_checkpoint = True
+        else:
+            pending.append(index)
+
+    def _fetch(index: int) -> dict[str, Any]:
+        start, end = normalized[index]
+        return olap.get_olap_by_preset_id(preset_id, start, end)
+
+    for outcome in run_concurrently(_fetch, pending, max_workers=max_workers, fail_fast=fail_fast):
+        result = results[outcome.item]
+        result.payload, result.error = outcome.result, outcome.error
+        if outcome.ok and store is not None:
+            store.save((result.date_from, result.date_to), outcome.result)
+    return results
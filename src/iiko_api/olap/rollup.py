@@ -0,0 +1,285 @@
+"""
+Локальная агрегация детального OLAP-результата.
+
+Дашборды запрашивают одни и те же продажи в разных разрезах: по дням, по подразделениям,
+по группам блюд — и каждый разрез это отдельный тяжелый ``query_olap``. ``OlapRollup``
+получает один детальный результат (например день × подразделение × блюдо) и отвечает
+на более грубые тела запросов в процессе: группировка по подмножеству измерений
+и фильтры по измерениям. Индексы групп и отборы строк кэшируются, поэтому повторные
+запросы дашборда не проходят по строкам заново. Допускаются только аддитивные меры.
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Mapping, Sequence
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from iiko_api.olap.frame import DictColumn, OlapFrame, _as_array, _numpy
+from iiko_api.olap.split import DATE_RANGE_FILTER, check_additive, parse_olap_datetime
+
+if TYPE_CHECKING:
+    from iiko_api.endpoints.olap import OLAP
+
+_VALUE_FILTERS = ("IncludeValues", "ExcludeValues")
+
+
+def _date_bounds(date_filter: Mapping[str, Any]) -> tuple[datetime, bool, datetime, bool]:
+    return (
+        parse_olap_datetime(date_filter["from"]),
+        date_filter.get("includeLow", True),
+        parse_olap_datetime(date_filter["to"]),
+        date_filter.get("includeHigh", False),
+    )
+
+
+def _covers(base: Mapping[str, Any], requested: Mapping[str, Any]) -> bool:
+    """Отбирает ли фильтр base все строки, которые отбирает requested."""
+    if base == requested:
+        return True
+    base_type, requested_type = base.get("filterType"), requested.get("filterType")
+    if base_type == requested_type == DATE_RANGE_FILTER:
+        base_low, base_include_low, base_high, base_include_high = _date_bounds(base)
+        low, include_low, high, include_high = _date_bounds(requested)
+        low_ok = low > base_low or (low == base_low and (base_include_low or not include_low))
+        high_ok = high < base_high or (high == base_high and (base_include_high or not include_high))
+        return low_ok and high_ok
+    base_values, values = set(base.get("values", ())), set(requested.get("values", ()))
+    if base_type == "IncludeValues" and requested_type == "IncludeValues":
+        return values <= base_values
+    if base_type == "ExcludeValues" and requested_type == "ExcludeValues":
+        return values >= base_values
+    if base_type == "ExcludeValues" and requested_type == "IncludeValues":
+        return not values & base_values
+    return False
+
+
+class OlapRollup:
+    """
+    Ответы на OLAP-запросы по детальному результату без обращения к серверу.
+
+    :param frame: детальный результат (OlapFrame)
+    :param base_body: тело запроса, которым получен frame; по нему проверяется,
+        что фильтры запроса не шире исходных (без него фильтры по полям вне frame не принимаются)
+    :param additive_fields: меры, которые следует считать аддитивными независимо от имени
+    :raises ValueError: если среди мер frame есть неаддитивные
+    """
+
+    def __init__(
+        self,
+        frame: OlapFrame,
+        base_body: Mapping[str, Any] | None = None,
+        *,
+        additive_fields: Sequence[str] | None = None,
+    ):
+        check_additive({"aggregateFields": frame.measures}, additive_fields)
+        self.frame = frame
+        self.base_body = base_body or {}
+        self._dimensions: dict[str, DictColumn] = {name: frame.dimension(name) for name in frame.dimensions}
+        self._group_index: dict[tuple[str, ...], tuple[array, list[tuple[int, ...]]]] = {}
+        self._selection: dict[tuple[str, str], frozenset[int]] = {}
+
+    @classmethod
+    def from_olap(
+        cls,
+        olap: OLAP,
+        body: dict[str, Any],
+        scales: dict[str, int] | None = None,
+        *,
+        additive_fields: Sequence[str] | None = None,
+    ) -> OlapRollup:
+        """Выполняет детальный запрос (query_olap_frame) и строит по нему OlapRollup."""
+        return cls(olap.query_olap_frame(body, scales), body, additive_fields=additive_fields)
+
+    @property
+    def dimensions(self) -> list[str]:
+        return list(self._dimensions)
+
+    def derive(self, name: str, source: str, func: Callable[[Any], Any]) -> None:
+        """
+        Добавляет вычисляемое измерение (например неделю или месяц по дате).
+
+        Функция применяется к уникальным значениям source, а не к строкам.
+
+        :param name: имя нового измерения
+        :param source: исходное измерение
+        :param func: преобразование значения
+        """
+        if name in self._dimensions:
+            raise ValueError(f"Измерение {name!r} уже существует")
+        if source not in self._dimensions:
+            raise KeyError(f"Измерение {source!r} отсутствует в OlapRollup")
+        column = self._dimensions[source]
+        mapped = DictColumn.encode(func(value) for value in column.categories)
+        remap = mapped.codes
+        self._dimensions[name] = DictColumn(mapped.categories, array("i", (remap[code] for code in column.codes)))
+
+    def can_answer(self, body: Mapping[str, Any]) -> bool:
+        """Можно ли ответить на тело запроса по детальному результату."""
+        return self._check(body) is None
+
+    def _check(self, body: Mapping[str, Any]) -> str | None:
+        """Причина, по которой нельзя ответить на запрос, или None."""
+        base_type = self.base_body.get("reportType")
+        if base_type is not None and body.get("reportType", base_type) != base_type:
+            return f"reportType {body.get('reportType')} отличается от исходного {base_type}"
+        for name in (*body.get("groupByRowFields", []), *body.get("groupByColFields", [])):
+            if name not in self._dimensions:
+                return f"поле группировки {name} отсутствует в детальном результате"
+        for name in body.get("aggregateFields", []):
+            if name not in self.frame.measures:
+                return f"мера {name} отсутствует в детальном результате"
+        filters = body.get("filters") or {}
+        base_filters = self.base_body.get("filters") or {}
+        for name, requested in filters.items():
+            base = base_filters.get(name)
+            if name in self._dimensions:
+                if requested.get("filterType") not in (*_VALUE_FILTERS, DATE_RANGE_FILTER):
+                    return f"фильтр {name}: тип {requested.get('filterType')} не поддерживается"
+                if base is not None and not _covers(base, requested):
+                    return f"фильтр {name} шире исходного"
+            elif base is None or not _covers(base, requested):
+                return f"фильтр по полю {name}, отсутствующему в детальном результате"
+        for name in base_filters:
+            if name not in filters:
+                return f"запрос без фильтра {name} шире исходного"
+        return None
+
+    def _select(self, name: str, requested: Mapping[str, Any]) -> frozenset[int]:
+        """Коды значений измерения, проходящих фильтр (кэшируется)."""
+        cache_key = (name, repr(sorted(requested.items(), key=lambda item: item[0])))
+        selected = self._selection.get(cache_key)
+        if selected is not None:
+            return selected
+        categories = self._dimensions[name].categories
+        filter_type = requested.get("filterType")
+        if filter_type == DATE_RANGE_FILTER:
+            low, include_low, high, include_high = _date_bounds(requested)
+            selected_codes = []
+            for code, value in enumerate(categories):
+                if value is None:
+                    continue
+                moment = parse_olap_datetime(value)
+                if (moment > low or include_low and moment == low) and (
+                    moment < high or include_high and moment == high
+                ):
+                    selected_codes.append(code)
+            selected = frozenset(selected_codes)
+        else:
+            values = set(requested.get("values", ()))
+            include = filter_type == "IncludeValues"
+            selected = frozenset(code for code, value in enumerate(categories) if (value in values) is include)
+        self._selection[cache_key] = selected
+        return selected
+
+    def _groups(self, dimensions: tuple[str, ...]) -> tuple[array, list[tuple[int, ...]]]:
+        """Номер группы для каждой строки и коды измерений групп (кэшируется)."""
+        cached = self._group_index.get(dimensions)
+        if cached is not None:
+            return cached
+        group_of: dict[tuple[int, ...], int] = {}
+        if dimensions:
+            columns = [self._dimensions[name].codes for name in dimensions]
+            row_groups = array("i", (group_of.setdefault(key, len(group_of)) for key in zip(*columns, strict=True)))
+        else:
+            row_groups = array("i", bytes(4 * len(self.frame)))
+            group_of[()] = 0
+        cached = (row_groups, list(group_of))
+        self._group_index[dimensions] = cached
+        return cached
+
+    def _sum(
+        self,
+        row_groups: array,
+        group_count: int,
+        checks: list[tuple[array, frozenset[int]]],
+        measures: list[str],
+    ) -> tuple[list[int], dict[str, array]]:
+        """Отобранные группы (в порядке появления) и суммы мер по ним."""
+        if checks:
+            rows = [i for i in range(len(self.frame)) if all(codes[i] in allowed for codes, allowed in checks)]
+        else:
+            rows = range(len(self.frame))
+
+        totals = {name: [0] * group_count for name in measures}
+        present = [False] * group_count
+        measure_columns = [(totals[name], self.frame.measure(name)) for name in measures]
+        for i in rows:
+            group = row_groups[i]
+            present[group] = True
+            for target, column in measure_columns:
+                target[group] += column[i]
+
+        groups = [group for group, seen in enumerate(present) if seen]
+        return groups, {name: array("q", (totals[name][g] for g in groups)) for name in measures}
+
+    def _sum_numpy(
+        self,
+        np: Any,
+        row_groups: array,
+        group_count: int,
+        checks: list[tuple[array, frozenset[int]]],
+        measures: list[str],
+    ) -> tuple[list[int], dict[str, array]]:
+        """_sum над буферами колонок: маска строк np.isin, суммы np.add.at в int64."""
+        group_codes = np.frombuffer(row_groups, dtype=np.int32)
+        mask = None
+        for codes, allowed in checks:
+            passed = np.isin(np.frombuffer(codes, dtype=np.int32), np.fromiter(allowed, dtype=np.int32, count=len(allowed)))
+            mask = passed if mask is None else mask & passed
+        if mask is not None:
+            group_codes = group_codes[mask]
+
+        present = np.bincount(group_codes, minlength=group_count) > 0
+        groups = np.flatnonzero(present)
+        measure_columns = {}
+        for name in measures:
+            values = np.frombuffer(self.frame.measure(name), dtype=np.int64)
+            totals = np.zeros(group_count, dtype=np.int64)
+            # np.add.at, а не bincount: bincount суммирует веса во float64 и теряет точность
+            np.add.at(totals, group_codes, values[mask] if mask is not None else values)
+            measure_columns[name] = _as_array("q", totals[groups])
+        return groups.tolist(), measure_columns
+
+    def query_frame(self, body: Mapping[str, Any]) -> OlapFrame:
+        """
+        Ответ на тело OLAP-запроса в виде OlapFrame.
+
+        :raises ValueError: если на запрос нельзя ответить по детальному результату
+        """
+        reason = self._check(body)
+        if reason is not None:
+            raise ValueError(f"Запрос нельзя выполнить по детальному результату: {reason}")
+        dimensions = (*body.get("groupByRowFields", []), *body.get("groupByColFields", []))
+        measures = list(body.get("aggregateFields", [])) or self.frame.measures
+        row_groups, keys = self._groups(tuple(dimensions))
+
+        # Фильтры: строка проходит, если код каждого отфильтрованного измерения в отборе
+        checks = [
+            (self._dimensions[name].codes, self._select(name, requested))
+            for name, requested in (body.get("filters") or {}).items()
+            if name in self._dimensions
+        ]
+        np = _numpy()
+        if np is not None and len(self.frame):
+            groups, measure_columns = self._sum_numpy(np, row_groups, len(keys), checks, measures)
+        else:
+            groups, measure_columns = self._sum(row_groups, len(keys), checks, measures)
+
+        dimension_columns = {
+            name: DictColumn(self._dimensions[name].categories, array("i", (keys[g][position] for g in groups)))
+            for position, name in enumerate(dimensions)
+        }
+        return OlapFrame(
+            dimension_columns,
+            measure_columns,
+            {name: self.frame.scales[name] for name in measures},
+        )
+
+    def query_olap(self, body: Mapping[str, Any]) -> dict[str, Any]:
+        """
+        Ответ на тело OLAP-запроса в формате query_olap ({"data": [...]}, меры — Decimal).
+
+        :raises ValueError: если на запрос нельзя ответить по детальному результату
+        """
+        return {"data": list(self.query_frame(body).to_rows())}
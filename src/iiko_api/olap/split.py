@@ -0,0 +1,242 @@
+"""
+Разбиение OLAP-запроса по периоду и слияние результатов.
+
+Годовой SALES-отчет с группировкой по дням и блюдам не укладывается в таймаут RMS.
+Фильтр ``DateRange`` тела запроса делится на окна, окна запрашиваются параллельно,
+а строки с одинаковыми значениями измерений складываются. Слияние корректно только
+для аддитивных мер (суммы, количества): средние, проценты и наценки по частям периода
+не складываются, поэтому такие запросы отклоняются.
+"""
+from __future__ import annotations
+
+import copy
+import re
+from collections.abc import Iterable, Mapping, Sequence
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from iiko_api.endpoints.olap import _parse_decimal
+
+DATE_RANGE_FILTER = "DateRange"
+
+# Слова в имени поля, означающие неаддитивную агрегацию
+NON_ADDITIVE_WORDS = frozenset({
+    "average", "avg", "percent", "percentage", "mark", "markup", "min", "max", "ratio", "share", "per",
+})
+
+_WORD_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+
+
+def is_additive_field(name: str) -> bool:
+    """
+    Можно ли складывать значения поля по частям периода.
+
+    Поле считается неаддитивным, если в его имени есть слово из NON_ADDITIVE_WORDS
+    (например "DishDiscountSumInt.average", "ProductCostBase.Percent", "ProductCostBase.MarkUp").
+    """
+    words = {word.lower() for word in _WORD_RE.findall(name)}
+    return not words & NON_ADDITIVE_WORDS
+
+
+def check_additive(body: Mapping[str, Any], additive_fields: Iterable[str] | None = None) -> None:
+    """
+    Проверяет, что все aggregateFields тела аддитивны.
+
+    :param body: тело OLAP-запроса
+    :param additive_fields: поля, которые следует считать аддитивными независимо от имени
+    :raises ValueError: если есть неаддитивные поля
+    """
+    allowed = set(additive_fields or ())
+    non_additive = [
+        name for name in body.get("aggregateFields", [])
+        if name not in allowed and not is_additive_field(name)
+    ]
+    if non_additive:
+        raise ValueError(
+            "Неаддитивные поля нельзя получить слиянием частей периода: "
+            f"{', '.join(non_additive)}. Укажите их в additive_fields, если они все же аддитивны"
+        )
+
+
+def parse_olap_datetime(value: str) -> datetime:
+    """Разбирает дату фильтра OLAP ("yyyy-MM-dd" или "yyyy-MM-ddTHH:mm:ss.SSS")."""
+    try:
+        return datetime.fromisoformat(str(value).strip())
+    except ValueError as e:
+        raise ValueError(f"Некорректная дата в OLAP фильтре: {value!r}") from e
+
+
+def format_olap_datetime(value: datetime) -> str:
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + f"{value.microsecond // 1000:03d}"
+
+
+def find_date_range_filter(body: Mapping[str, Any], date_field: str | None = None) -> tuple[str, dict[str, Any]]:
+    """
+    Находит фильтр DateRange в теле запроса.
+
+    :param body: тело OLAP-запроса
+    :param date_field: имя поля фильтра; если не задано, в теле должен быть ровно один DateRange
+    :return: (имя поля, фильтр)
+    :raises ValueError: если фильтр не найден, неоднозначен или задан не через from/to
+    """
+    filters = body.get("filters") or {}
+    if date_field is not None:
+        candidates = [date_field] if date_field in filters else []
+    else:
+        candidates = [
+            name for name, value in filters.items()
+            if isinstance(value, Mapping) and value.get("filterType") == DATE_RANGE_FILTER
+        ]
+    if not candidates:
+        raise ValueError("В теле OLAP-запроса нет фильтра DateRange")
+    if len(candidates) > 1:
+        raise ValueError(f"В теле OLAP-запроса несколько фильтров DateRange ({', '.join(candidates)}), укажите date_field")
+    name = candidates[0]
+    date_filter = filters[name]
+    if date_filter.get("filterType") != DATE_RANGE_FILTER or "from" not in date_filter or "to" not in date_filter:
+        raise ValueError(f"Фильтр {name} должен быть DateRange с полями from и to")
+    if date_filter.get("periodType", "CUSTOM") != "CUSTOM":
+        raise ValueError(f"Фильтр {name}: поддерживается только periodType=CUSTOM")
+    return name, date_filter
+
+
+def day_bounds(date_filter: Mapping[str, Any]) -> tuple[date, date] | None:
+    """
+    Дни фильтра DateRange.
+
+    :param date_filter: фильтр с полями from/to (как из find_date_range_filter)
+    :return: (первый день, последний день) включительно или None, если границы не на начало суток
+    :raises ValueError: если дата фильтра некорректна
+    """
+    start = parse_olap_datetime(date_filter["from"])
+    end = parse_olap_datetime(date_filter["to"])
+    if start.time() != datetime.min.time() or end.time() != datetime.min.time():
+        return None
+    first = start.date() if date_filter.get("includeLow", True) else start.date() + timedelta(days=1)
+    last = end.date() if date_filter.get("includeHigh", False) else end.date() - timedelta(days=1)
+    return first, last
+
+
+def with_date_range(
+    body: Mapping[str, Any],
+    date_field: str,
+    start: datetime,
+    end: datetime,
+    *,
+    include_low: bool = True,
+    include_high: bool = False,
+) -> dict[str, Any]:
+    """Копия тела запроса с другим периодом в фильтре date_field."""
+    new_body = copy.deepcopy(dict(body))
+    date_filter = new_body["filters"][date_field]
+    date_filter["from"] = format_olap_datetime(start)
+    date_filter["to"] = format_olap_datetime(end)
+    date_filter["includeLow"] = include_low
+    date_filter["includeHigh"] = include_high
+    return new_body
+
+
+def split_olap_body(
+    body: Mapping[str, Any],
+    window_days: int,
+    *,
+    date_field: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Делит период фильтра DateRange на окна по window_days дней.
+
+    Окна не пересекаются и покрывают исходный период: внутренние границы
+    включаются в следующее окно (includeLow=True, includeHigh=False), внешние
+    границы сохраняют includeLow/includeHigh исходного фильтра.
+
+    :param body: тело OLAP-запроса
+    :param window_days: длина окна в днях
+    :param date_field: имя поля фильтра DateRange (если их несколько)
+    :return: тела запросов по окнам в хронологическом порядке
+    :raises ValueError: если window_days < 1 или период задан некорректно
+    """
+    if window_days < 1:
+        raise ValueError("window_days должен быть не меньше 1")
+    if body.get("buildSummary") is True:
+        raise ValueError("buildSummary=True не поддерживается при разбиении запроса по периоду")
+    field, date_filter = find_date_range_filter(body, date_field)
+    start = parse_olap_datetime(date_filter["from"])
+    end = parse_olap_datetime(date_filter["to"])
+    if start > end:
+        raise ValueError(f"Фильтр {field}: from должен быть меньше или равен to")
+    include_low = date_filter.get("includeLow", True)
+    include_high = date_filter.get("includeHigh", False)
+
+    step = timedelta(days=window_days)
+    bodies = []
+    window_start = start
+    while True:
+        window_end = min(window_start + step, end)
+        last = window_end >= end
+        window_body = with_date_range(
+            body,
+            field,
+            window_start,
+            window_end,
+            include_low=include_low if window_start == start else True,
+            include_high=include_high if last else False,
+        )
+        window_body["buildSummary"] = False
+        bodies.append(window_body)
+        if last:
+            return bodies
+        window_start = window_end
+
+
+def _add(left: Any, right: Any, field: str) -> Any:
+    if left is None or left == "":
+        return right
+    if right is None or right == "":
+        return left
+    if type(left) is int and type(right) is int:
+        return left + right
+    return _parse_decimal(left, field=field) + _parse_decimal(right, field=field)
+
+
+def merge_olap_rows(
+    rows: Iterable[Mapping[str, Any]],
+    key_fields: Sequence[str],
+    measures: Sequence[str],
+) -> list[dict[str, Any]]:
+    """
+    Складывает меры строк с одинаковыми значениями key_fields.
+
+    Порядок строк — порядок первого появления ключа. Поля, не входящие в key_fields
+    и measures, отбрасываются.
+
+    :raises ValueError: если значение меры не является числом
+    """
+    merged: dict[tuple, dict[str, Any]] = {}
+    for row in rows:
+        if not isinstance(row, Mapping):
+            continue
+        key = tuple(row.get(name) for name in key_fields)
+        target = merged.get(key)
+        if target is None:
+            merged[key] = {
+                **{name: row.get(name) for name in key_fields},
+                **{name: row.get(name) for name in measures},
+            }
+            continue
+        for name in measures:
+            target[name] = _add(target[name], row.get(name), name)
+    return list(merged.values())
+
+
+def merge_olap_payloads(payloads: Iterable[Mapping[str, Any]], body: Mapping[str, Any]) -> dict[str, Any]:
+    """
+    Объединяет ответы query_olap по частям периода в ответ на исходное тело.
+
+    :param payloads: ответы по окнам
+    :param body: исходное тело запроса (groupByRowFields, groupByColFields, aggregateFields)
+    """
+    key_fields = [*body.get("groupByRowFields", []), *body.get("groupByColFields", [])]
+    measures = list(body.get("aggregateFields", []))
+    rows = (row for payload in payloads for row in payload.get("data") or [])
+    return {"data": merge_olap_rows(rows, key_fields, measures)}
+
@@ -0,0 +1,260 @@
+"""
+Потоковое чтение строк OLAP-отчета.
+
+``OLAP.query_olap`` декодирует ответ целиком, а ``get_fiscal_sales_by_day`` сразу
+разбирает каждую ячейку. Для широких отчетов, из которых нужна пара колонок,
+массив ``data`` можно читать из потока ответа по одному элементу: числа с дробной
+частью остаются исходным текстом и превращаются в ``Decimal`` только при обращении
+к полю (``OlapRow``).
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import date
+from decimal import Decimal
+from typing import Any
+
+from iiko_api.core.dates import parse_olap_day
+from iiko_api.endpoints.olap import _parse_decimal, _parse_money_decimal
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class RawNumber(str):
+    """Исходный текст JSON-числа с дробной частью (разбирается только по требованию)."""
+
+    __slots__ = ()
+
+
+_DECODER = json.JSONDecoder(parse_float=RawNumber)
+_WHITESPACE = " \t\n\r"
+# Значимые символы при пропуске значения: вне строки и внутри строки
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_STRING_END = re.compile(r'["\\]')
+
+
+class OlapRow(Mapping[str, Any]):
+    """
+    Строка OLAP-отчета без предварительного разбора значений.
+
+    ``row[name]`` возвращает числа как Decimal (разбор при обращении), остальные значения —
+    как в JSON. ``money``/``decimal``/``day`` разбирают поле так же, как ``get_fiscal_sales_by_day``.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict[str, Any]):
+        self._data = data
+
+    def __getitem__(self, name: str) -> Any:
+        value = self._data[name]
+        if type(value) is RawNumber:
+            return Decimal(value)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"OlapRow({self._data!r})"
+
+    def raw(self, name: str, default: Any = None) -> Any:
+        """Значение поля без разбора (дробные числа — исходный текст); default, если поля нет."""
+        return self._data.get(name, default)
+
+    def decimal(self, name: str) -> Decimal:
+        """Значение поля как Decimal (пустое значение — 0)."""
+        return _parse_decimal(self._data.get(name), field=name)
+
+    def money(self, name: str) -> Decimal:
+        """Денежное значение поля как Decimal с квантованием до 0.01 (HALF_UP)."""
+        return _parse_money_decimal(self._data.get(name), field=name)
+
+    def day(self, name: str = "OpenDate.Typed") -> date:
+        """Значение поля-даты как date."""
+        return parse_olap_day(self._data.get(name))
+
+    def to_dict(self) -> dict[str, Any]:
+        """Строка как dict с Decimal вместо дробных чисел (как строки query_olap)."""
+        return {name: self[name] for name in self._data}
+
+
+class _TextStream:
+    """Буфер текста поверх потока байтовых блоков."""
+
+    def __init__(self, chunks: Iterable[bytes | str], encoding: str):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        """Дочитывает следующий блок; False, если поток закончился."""
+        if self.exhausted:
+            return False
+        for chunk in self._chunks:
+            text = chunk if isinstance(chunk, str) else self._decoder.decode(chunk)
+            if text:
+                # Прочитанная часть буфера отбрасывается
+                self.buffer = self.buffer[self.pos:] + text
+                self.pos = 0
+                return True
+        self.buffer = self.buffer[self.pos:] + self._decoder.decode(b"", final=True)
+        self.pos = 0
+        self.exhausted = True
+        return False
+
+    def skip_whitespace(self) -> None:
+        while True:
+            buffer, pos = self.buffer, self.pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self.pos = pos
+            if pos < len(buffer) or not self.read_more():
+                return
+
+    def next_char(self) -> str:
+        """Следующий непробельный символ (без продвижения); "" в конце потока."""
+        self.skip_whitespace()
+        return self.buffer[self.pos] if self.pos < len(self.buffer) else ""
+
+    def expect(self, chars: str) -> str:
+        char = self.next_char()
+        if not char or char not in chars:
+            found = repr(char) if char else "конец ответа"
+            raise ValueError(f"Некорректный JSON OLAP-ответа: ожидался один из {chars!r}, получено {found}")
+        self.pos += 1
+        return char
+
+    def _read_at_least(self, size: int) -> bool:
+        """Дочитывает блоки, пока после pos не станет не меньше size символов; False в конце потока."""
+        while len(self.buffer) - self.pos < size:
+            if not self.read_more():
+                return False
+        return True
+
+    def value(self) -> Any:
+        """
+        Следующее JSON-значение; дочитывает поток, пока значение не будет полным.
+
+        Если значение не помещается в буфер, буфер перед повторным разбором как минимум удваивается,
+        поэтому значение на k блоков разбирается O(log k) раз, а не k.
+        """
+        self.skip_whitespace()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.exhausted:
+                    raise ValueError(f"Некорректный JSON OLAP-ответа: {e.msg}") from e
+                self._read_at_least(2 * (len(self.buffer) - self.pos) or 1)
+                continue
+            # Число на границе блока могло быть прочитано не полностью
+            if end == len(self.buffer) and not self.exhausted:
+                self.read_more()
+                continue
+            self.pos = end
+            return value
+
+    def skip_value(self) -> None:
+        """
+        Пропускает следующее JSON-значение без декодирования.
+
+        Объекты и массивы просматриваются по значимым символам с учетом строк и вложенности,
+        прочитанные блоки сразу отбрасываются. Содержимое пропущенного значения не проверяется.
+        """
+        if self.next_char() not in ("[", "{", '"'):
+            self.value()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            buffer = self.buffer
+            pattern = _STRING_END if in_string else _STRUCTURE
+            match = pattern.search(buffer, self.pos)
+            if match is None:
+                self.pos = len(buffer)
+                if not self.read_more():
+                    raise ValueError("Некорректный JSON OLAP-ответа: неожиданный конец ответа")
+                continue
+            char, pos = match.group(), match.start()
+            if char == "\\":
+                # Экранированный символ может оказаться в следующем блоке
+                self.pos = pos
+                if not self._read_at_least(2):
+                    raise ValueError("Некорректный JSON OLAP-ответа: неожиданный конец ответа")
+                self.pos += 2
+                continue
+            self.pos = pos + 1
+            if char == '"':
+                in_string = not in_string
+                if not in_string and depth == 0:
+                    return
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+
+def iter_json_array(
+    chunks: Iterable[bytes | str],
+    key: str = "data",
+    *,
+    encoding: str = "utf-8",
+) -> Iterator[Any]:
+    """
+    Элементы массива ``key`` JSON-объекта верхнего уровня, прочитанные из потока блоков.
+
+    Остальные поля объекта пропускаются без декодирования. Дробные числа возвращаются как RawNumber.
+
+    :param chunks: блоки тела ответа (bytes или str)
+    :param key: имя поля с массивом
+    :param encoding: кодировка байтовых блоков
+    :raises ValueError: если JSON некорректен
+    """
+    stream = _TextStream(chunks, encoding)
+    stream.expect("{")
+    if stream.next_char() == "}":
+        return
+    while True:
+        name = stream.value()
+        stream.expect(":")
+        if name == key and stream.next_char() == "[":
+            stream.expect("[")
+            if stream.next_char() == "]":
+                stream.pos += 1
+            else:
+                while True:
+                    yield stream.value()
+                    if stream.expect(",]") == "]":
+                        break
+        else:
+            stream.skip_value()
+        if stream.expect(",}") == "}":
+            return
+
+
+def iter_olap_rows(
+    chunks: Iterable[bytes | str],
+    *,
+    encoding: str = "utf-8",
+) -> Iterator[OlapRow]:
+    """
+    Строки OLAP-ответа (``{"data": [...]}``) из потока блоков.
+
+    :param chunks: блоки тела ответа (например ``response.iter_content(65536)``)
+    :param encoding: кодировка байтовых блоков
+    :raises ValueError: если JSON некорректен
+    """
+    for item in iter_json_array(chunks, "data", encoding=encoding):
+        if isinstance(item, dict):
+            yield OlapRow(item)
@@ -1,17 +1,165 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Any
+
+from ..core.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+from ..core.journal import WriteJournal
 from ..models.models import Item, Order
+from ..models.records import PriceRecord
+
+# Размер одного документа menuChange в пакетном режиме по умолчанию
+DEFAULT_MAX_ITEMS_PER_ORDER = 5000
+
+
+@dataclass
+class PriceOrderChunk:
+    """
+    Часть пакетного приказа: один документ menuChange для одного подразделения.
+
+    Attributes:
+        department_id: ID подразделения
+        order_date: Дата приказа вида "2024-12-23"
+        items: Позиции документа
+        response: Ответ set_new_order (None, если документ не отправлен или отправлен с ошибкой)
+        error: Исключение при отправке (None при успехе)
+    """
+    department_id: str
+    order_date: str
+    items: list[Item]
+    response: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class PriceOrderReport:
+    """
+    Результат пакетной установки цен.
+
+    Attributes:
+        chunks: Документы приказа в порядке отправки (по подразделениям)
+    """
+    chunks: list[PriceOrderChunk] = field(default_factory=list)
+
+    @property
+    def succeeded(self) -> list[PriceOrderChunk]:
+        return [chunk for chunk in self.chunks if chunk.ok]
+
+    @property
+    def failed(self) -> list[PriceOrderChunk]:
+        return [chunk for chunk in self.chunks if not chunk.ok]
+
+    @property
+    def ok(self) -> bool:
+        return all(chunk.ok for chunk in self.chunks)
+
+    @property
+    def failed_items(self) -> list[Item]:
+        """Позиции неотправленных документов."""
+        return [item for chunk in self.failed for item in chunk.items]
+
+
+@dataclass
+class PriceDiffReport:
+    """
+    Результат сравнения новых цен с действующими.
+
+    Attributes:
+        changed: Позиции, цена или флаги которых отличаются от действующих (или отсутствуют в приказах)
+        skipped: Число позиций, совпадающих с действующими
+        orders: Результат отправки changed (None для сравнения без отправки)
+    """
+    changed: list[Item] = field(default_factory=list)
+    skipped: int = 0
+    orders: PriceOrderReport | None = None
+
+    @property
+    def changed_count(self) -> int:
+        return len(self.changed)
+
+
+def _as_decimal(value: Any) -> Decimal | None:
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return Decimal(str(value))
+    except InvalidOperation:
+        return None
+
+
+def _current_prices(records: list[PriceRecord], order_date: str) -> dict[tuple[str, str], PriceRecord]:
+    """Действующая на order_date цена каждой пары (подразделение, продукт) без размера."""
+    current: dict[tuple[str, str], PriceRecord] = {}
+    for record in records:
+        if record.productSizeId is not None:
+            continue
+        starts = (record.dateFrom or "")[:10]
+        ends = (record.dateTo or "")[:10]
+        if starts > order_date or (ends and ends <= order_date):
+            continue
+        key = (record.departmentId, record.productId)
+        known = current.get(key)
+        if known is None or starts >= (known.dateFrom or "")[:10]:
+            current[key] = record
+    return current
+
+
+def _is_unchanged(item: Item, record: PriceRecord | None) -> bool:
+    if record is None or _as_decimal(record.price) != item.price:
+        return False
+    flags = (
+        (record.including, item.including),
+        (record.flyerProgram, item.flyerProgram),
+        (record.dishOfDay, item.dishOfDay),
+    )
+    return all(current is None or current == new for current, new in flags)
+
+
+def split_price_items(
+    dishes: list[Item],
+    order_date: str,
+    max_items_per_order: int = DEFAULT_MAX_ITEMS_PER_ORDER,
+) -> list[PriceOrderChunk]:
+    """
+    Группирует позиции по departmentId и делит группы на документы не больше max_items_per_order.
+
+    :param dishes: Список блюд с новыми ценами
+    :param order_date: Дата приказа вида "2024-12-23"
+    :param max_items_per_order: Максимальное число позиций в одном документе
+    :return: Документы в порядке первого появления подразделения в dishes
+    """
+    if max_items_per_order < 1:
+        raise ValueError("max_items_per_order должен быть не меньше 1")
+    by_department: dict[str, list[Item]] = {}
+    for item in dishes:
+        by_department.setdefault(item.departmentId, []).append(item)
+    return [
+        PriceOrderChunk(department_id, order_date, items[start:start + max_items_per_order])
+        for department_id, items in by_department.items()
+        for start in range(0, len(items), max_items_per_order)
+    ]
 
 
 class IikoPriceOrderService:
     """
     Класс для работы с сервисом формирования приказа
     """
-    def __init__(self, iiko_api):
+    def __init__(self, iiko_api, journal: WriteJournal | None = None):
         """
         Конструктор
 
         :param iiko_api: Объект класса IikoApi
+        :param journal: Журнал записей (WriteJournal): отправленные приказы не отправляются
+                        повторно, прерванные перепроверяются по действующим ценам
         """
         self.iiko_api = iiko_api
+        self.journal = journal
 
     def set_price(self, dishes: list[Item], order_date: str):
         """
@@ -25,4 +173,135 @@ class IikoPriceOrderService:
         # Создаем приказ
         order = Order(dateIncoming=order_date, items=dishes)
 
-        self.iiko_api.orders.set_new_order(order)
+        self._post_order(order, dishes)
+
+    def set_price_bulk(
+        self,
+        dishes: list[Item],
+        order_date: str,
+        *,
+        max_items_per_order: int = DEFAULT_MAX_ITEMS_PER_ORDER,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        short_name: str = "",
+    ) -> PriceOrderReport:
+        """
+        Пакетная установка цен: позиции группируются по подразделениям, делятся на документы
+        не больше max_items_per_order и отправляются параллельно.
+
+        Ошибка одного документа не прерывает остальные; неотправленные документы
+        можно отправить повторно через retry_failed.
+
+        :param dishes: Список блюд (в поле price должна быть указана новая цена)
+        :param order_date: Дата приказа вида "2024-12-23"
+        :param max_items_per_order: Максимальное число позиций в одном документе menuChange
+        :param max_workers: Максимальное число одновременных запросов
+        :param short_name: Короткое название документов приказа
+        :return: PriceOrderReport с результатом по каждому документу
+        """
+        report = PriceOrderReport(split_price_items(dishes, order_date, max_items_per_order))
+        self._send(report.chunks, max_workers=max_workers, short_name=short_name)
+        return report
+
+    def retry_failed(
+        self,
+        report: PriceOrderReport,
+        *,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        short_name: str = "",
+    ) -> PriceOrderReport:
+        """
+        Повторно отправляет документы отчета, завершившиеся ошибкой; успешные не отправляются.
+
+        :param report: Отчет set_price_bulk (обновляется на месте)
+        :param max_workers: Максимальное число одновременных запросов
+        :param short_name: Короткое название документов приказа
+        :return: тот же report
+        """
+        self._send(report.failed, max_workers=max_workers, short_name=short_name)
+        return report
+
+    def _post_order(self, order: Order, items: list[Item]) -> Any:
+        """Отправляет приказ (через журнал, если он задан)."""
+        if self.journal is None:
+            return self.iiko_api.orders.set_new_order(order)
+        return self.journal.run(
+            "order",
+            order,
+            lambda: self.iiko_api.orders.set_new_order(order),
+            # Прерванный приказ считается примененным, если все его цены уже действуют
+            verify=lambda: not self.diff_prices(items, order.dateIncoming).changed,
+        )
+
+    def _send(self, chunks: list[PriceOrderChunk], *, max_workers: int, short_name: str) -> None:
+        def _post(chunk: PriceOrderChunk) -> Any:
+            order = Order(dateIncoming=chunk.order_date, shortName=short_name, items=chunk.items)
+            return self._post_order(order, chunk.items)
+
+        for outcome in run_concurrently(_post, chunks, max_workers=max_workers):
+            chunk = outcome.item
+            chunk.response, chunk.error = outcome.result, outcome.error
+
+    def diff_prices(self, dishes: list[Item], order_date: str) -> PriceDiffReport:
+        """
+        Сравнивает новые цены с действующими на order_date, ничего не отправляя.
+
+        Действующие цены запрашиваются одним get_price_list по всем подразделениям dishes
+        и сравниваются через словарь по (departmentId, productId). Позиция считается
+        измененной, если отличается цена или флаги including/flyerProgram/dishOfDay,
+        либо цены для нее нет.
+
+        :param dishes: Список блюд с новыми ценами
+        :param order_date: Дата приказа вида "2024-12-23"
+        :return: PriceDiffReport (без orders)
+        """
+        report = PriceDiffReport()
+        if not dishes:
+            return report
+        department_ids = list(dict.fromkeys(item.departmentId for item in dishes))
+        next_day = (date.fromisoformat(order_date) + timedelta(days=1)).isoformat()
+        records = self.iiko_api.orders.get_price_list(
+            date_from=order_date,
+            date_to=next_day,
+            type_="BASE",
+            department_id=department_ids,
+            as_records=True,
+        )
+        current = _current_prices(records, order_date)
+        for item in dishes:
+            if _is_unchanged(item, current.get((item.departmentId, item.productId))):
+                report.skipped += 1
+            else:
+                report.changed.append(item)
+        return report
+
+    def set_changed_prices(
+        self,
+        dishes: list[Item],
+        order_date: str,
+        *,
+        max_items_per_order: int = DEFAULT_MAX_ITEMS_PER_ORDER,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        short_name: str = "",
+    ) -> PriceDiffReport:
+        """
+        Устанавливает цены, отправляя только позиции, отличающиеся от действующих (см. diff_prices).
+
+        Измененные позиции отправляются через set_price_bulk; если изменений нет, запросов
+        на создание приказа не выполняется.
+
+        :param dishes: Список блюд с новыми ценами
+        :param order_date: Дата приказа вида "2024-12-23"
+        :param max_items_per_order: Максимальное число позиций в одном документе menuChange
+        :param max_workers: Максимальное число одновременных запросов
+        :param short_name: Короткое название документов приказа
+        :return: PriceDiffReport с числом пропущенных и измененных позиций и результатом отправки
+        """
+        report = self.diff_prices(dishes, order_date)
+        report.orders = self.set_price_bulk(
+            report.changed,
+            order_date,
+            max_items_per_order=max_items_per_order,
+            max_workers=max_workers,
+            short_name=short_name,
+        )
+        return report
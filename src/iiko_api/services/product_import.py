@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..core.concurrency import DEFAULT_MAX_WORKERS, run_concurrently
+from ..core.journal import WriteJournal
+from ..exceptions import IikoValidationError
+from ..models.models import Product
+from .reference_validator import PRODUCTS, IikoReferenceValidator
+
+CREATED = "created"
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+DUPLICATE = "duplicate"
+FAILED = "failed"
+
+
+@dataclass
+class ProductImportResult:
+    """
+    Результат импорта одного элемента номенклатуры.
+
+    Attributes:
+        index: Позиция продукта во входной последовательности
+        product: Импортируемый продукт
+        action: created, updated, unchanged, duplicate (повтор в пакете) или failed
+        product_id: UUID элемента номенклатуры (None, если неизвестен)
+        response: Ответ import_product / update_product
+        error: Исключение (для failed)
+    """
+    index: int
+    product: Product
+    action: str
+    product_id: str | None = None
+    response: Any = None
+    error: BaseException | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class ProductImportSummary:
+    """
+    Сводка пакетного импорта.
+
+    Attributes:
+        results: Результаты по продуктам в порядке входной последовательности
+        counts: Число продуктов по action
+    """
+    results: list[ProductImportResult] = field(default_factory=list)
+    counts: Counter = field(default_factory=Counter)
+
+    @property
+    def failed(self) -> list[ProductImportResult]:
+        return [result for result in self.results if not result.ok]
+
+
+def _name_key(name: str | None) -> str | None:
+    return " ".join(name.split()).casefold() if name else None
+
+
+def _product_key(product: Product) -> tuple[str, str]:
+    """Ключ сопоставления: артикул, если задан, иначе нормализованное название."""
+    if product.num:
+        return ("num", product.num)
+    return ("name", _name_key(product.name))
+
+
+def _is_same(product: Product, existing: dict[str, Any]) -> bool:
+    """Совпадают ли заданные в product поля с элементом каталога."""
+    values = product.model_dump(mode="json", exclude_none=True)
+    return all(existing.get(name) == value for name, value in values.items())
+
+
+class IikoProductImportService:
+    """
+    Сервис пакетного импорта номенклатуры
+    """
+    def __init__(
+        self,
+        iiko_api,
+        journal: WriteJournal | None = None,
+        validator: IikoReferenceValidator | None = None,
+    ):
+        """
+        Конструктор
+
+        :param iiko_api: Объект класса IikoApi
+        :param journal: Журнал записей (WriteJournal). Прерванные сохранения перепроверяются
+                        сравнением с каталогом, журнал фиксирует результат каждого сохранения
+        :param validator: Проверка ссылок на справочники: продукты с несуществующими mainUnit,
+                          taxCategory, category или parent отклоняются без запроса к серверу
+        """
+        self.iiko_api = iiko_api
+        self.journal = journal
+        self.validator = validator
+
+    def iter_import_products(
+        self,
+        products: Iterable[Product],
+        *,
+        update_existing: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> Iterator[ProductImportResult]:
+        """
+        Импортирует продукты и отдает результат по каждому по мере готовности.
+
+        Каталог запрашивается один раз. Продукт сопоставляется с существующим элементом
+        по артикулу (num), а без артикула — по названию (без учета регистра и лишних пробелов).
+        Новые продукты создаются (import_product), отличающиеся — обновляются (update_product),
+        совпадающие и повторы внутри пакета пропускаются. Сохранения выполняются параллельно,
+        ошибка одного продукта не прерывает остальные.
+
+        :param products: Продукты для импорта
+        :param update_existing: Обновлять ли найденные в каталоге продукты (иначе они пропускаются)
+        :param max_workers: Максимальное число одновременных запросов
+        :return: итератор ProductImportResult (сначала пропущенные, затем сохраненные по мере завершения)
+        """
+        catalogue = self.iiko_api.nomenclature.get_nomenclature_list()
+        by_num: dict[str, dict[str, Any]] = {}
+        by_name: dict[str, list[dict[str, Any]]] = {}
+        for existing in catalogue:
+            if existing.get("num"):
+                by_num.setdefault(existing["num"], existing)
+            if existing.get("name"):
+                by_name.setdefault(_name_key(existing["name"]), []).append(existing)
+
+        seen: set[tuple[str, str]] = set()
+        to_save: list[tuple[int, Product, dict[str, Any] | None]] = []
+        for index, product in enumerate(products):
+            key = _product_key(product)
+            if key in seen:
+                yield ProductImportResult(index, product, DUPLICATE)
+                continue
+            seen.add(key)
+
+            if self.validator is not None:
+                issues = self.validator.product_issues(product, index)
+                if issues:
+                    error = IikoValidationError("; ".join(issue["message"] for issue in issues), errors=issues)
+                    yield ProductImportResult(index, product, FAILED, error=error)
+                    continue
+
+            if key[0] == "num":
+                existing = by_num.get(key[1])
+            else:
+                matches = by_name.get(key[1], [])
+                if len(matches) > 1:
+                    error = ValueError(f"Название {product.name!r} соответствует {len(matches)} элементам номенклатуры")
+                    yield ProductImportResult(index, product, FAILED, error=error)
+                    continue
+                existing = matches[0] if matches else None
+
+            if existing is not None and (not update_existing or _is_same(product, existing)):
+                yield ProductImportResult(index, product, UNCHANGED, product_id=existing.get("id"))
+            else:
+                to_save.append((index, product, existing))
+
+        for outcome in run_concurrently(self._save, to_save, max_workers=max_workers):
+            index, product, existing = outcome.item
+            action = CREATED if existing is None else UPDATED
+            if outcome.ok:
+                response = outcome.result
+                product_id = response.get("id") if isinstance(response, dict) else None
+                if existing is not None:
+                    product_id = existing.get("id")
+                elif self.validator is not None and product_id:
+                    self.validator.register(PRODUCTS, [product_id])
+                yield ProductImportResult(index, product, action, product_id=product_id, response=response)
+            else:
+                product_id = existing.get("id") if existing is not None else None
+                yield ProductImportResult(index, product, FAILED, product_id=product_id, error=outcome.error)
+
+    def import_products(
+        self,
+        products: Iterable[Product],
+        *,
+        update_existing: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> ProductImportSummary:
+        """
+        Импортирует продукты и возвращает сводку (см. iter_import_products).
+
+        :return: ProductImportSummary с результатами в порядке products
+        """
+        summary = ProductImportSummary()
+        for result in self.iter_import_products(products, update_existing=update_existing, max_workers=max_workers):
+            summary.results.append(result)
+            summary.counts[result.action] += 1
+        summary.results.sort(key=lambda result: result.index)
+        return summary
+
+    def _save(self, task: tuple[int, Product, dict[str, Any] | None]) -> Any:
+        _, product, existing = task
+
+        def _send() -> Any:
+            if existing is None:
+                return self.iiko_api.nomenclature.import_product(product)
+            return self.iiko_api.nomenclature.update_product(existing["id"], product)
+
+        if self.journal is None:
+            return _send()
+        payload = {"id": existing.get("id") if existing else None, "product": product.model_dump(mode="json")}
+        # Продукт отличается от каталога: подтвержденная ранее запись не пропускается
+        return self.journal.run("product", payload, _send, changed=True)
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from ..exceptions import IikoValidationError
+from ..models.bulk import BulkAssemblyChart
+from ..models.models import AssemblyChart, Product
+
+# Справочники, по которым проверяются ссылки
+MEASURE_UNITS = "measure_units"
+TAX_CATEGORIES = "tax_categories"
+PRODUCT_CATEGORIES = "product_categories"
+GROUPS = "groups"
+PRODUCTS = "products"
+
+# Поле Product -> справочник
+PRODUCT_REFERENCES = {
+    "mainUnit": MEASURE_UNITS,
+    "taxCategory": TAX_CATEGORIES,
+    "category": PRODUCT_CATEGORIES,
+    "parent": GROUPS,
+}
+
+_MESSAGES = {
+    MEASURE_UNITS: "единица измерения {value!r} не найдена",
+    TAX_CATEGORIES: "налоговая категория {value!r} не найдена",
+    PRODUCT_CATEGORIES: "категория продукта {value!r} не найдена",
+    GROUPS: "группа номенклатуры {value!r} не найдена",
+    PRODUCTS: "элемент номенклатуры {value!r} не найден",
+}
+
+
+def _ids(rows: Iterable[Any]) -> set[str]:
+    """id неудаленных элементов справочника."""
+    return {
+        row["id"]
+        for row in rows or []
+        if isinstance(row, dict) and row.get("id") and not row.get("deleted")
+    }
+
+
+class IikoReferenceValidator:
+    """
+    Локальная проверка ссылок на справочники перед записью в iiko.
+
+    Справочники (единицы измерения, налоговые категории, категории продуктов, группы и элементы
+    номенклатуры) загружаются один раз при первой проверке, которой они нужны, и кэшируются.
+    Весь пакет проверяется за один проход; ошибки возвращаются списком словарей
+    (index, field, value, message) или пробрасываются как IikoValidationError.
+    """
+    def __init__(self, iiko_api):
+        """
+        Конструктор
+
+        :param iiko_api: Объект класса IikoApi
+        """
+        self.iiko_api = iiko_api
+        self._cache: dict[str, set[str]] = {}
+        self._loaders: dict[str, Callable[[], Iterable[Any]]] = {
+            MEASURE_UNITS: lambda: self.iiko_api.references.get_measure_units(),
+            TAX_CATEGORIES: lambda: self.iiko_api.references.get_tax_categories(),
+            PRODUCT_CATEGORIES: lambda: self.iiko_api.references.get_product_categories(),
+            GROUPS: lambda: self.iiko_api.nomenclature.get_nomenclature_groups(),
+            PRODUCTS: lambda: self.iiko_api.nomenclature.get_nomenclature_list(),
+        }
+
+    def known_ids(self, reference: str) -> set[str]:
+        """
+        id элементов справочника (загружается при первом обращении).
+
+        :param reference: measure_units, tax_categories, product_categories, groups или products
+        """
+        if reference not in self._loaders:
+            raise ValueError(f"Неизвестный справочник: {reference!r}. Доступны: {', '.join(self._loaders)}")
+        if reference not in self._cache:
+            self._cache[reference] = _ids(self._loaders[reference]())
+        return self._cache[reference]
+
+    def register(self, reference: str, ids: Iterable[str]) -> None:
+        """
+        Добавляет id в кэш справочника (например созданные в этом же задании продукты).
+
+        Если справочник еще не загружен, ничего не делает: при загрузке id придут с сервера.
+        """
+        if reference in self._cache:
+            self._cache[reference].update(ids)
+
+    def refresh(self, *references: str) -> None:
+        """Сбрасывает кэш указанных справочников (без аргументов — всех)."""
+        for reference in references or list(self._cache):
+            self._cache.pop(reference, None)
+
+    def _issue(self, index: int, field: str, value: Any, reference: str) -> dict:
+        return {
+            "index": index,
+            "field": field,
+            "value": value,
+            "message": f"{field}: " + _MESSAGES[reference].format(value=value),
+        }
+
+    def product_issues(self, product: Product, index: int = 0) -> list[dict]:
+        """Ошибки ссылок одного продукта."""
+        issues = []
+        for field, reference in PRODUCT_REFERENCES.items():
+            value = getattr(product, field)
+            if value is not None and value not in self.known_ids(reference):
+                issues.append(self._issue(index, field, value, reference))
+        return issues
+
+    def assembly_chart_issues(self, chart: AssemblyChart | BulkAssemblyChart, index: int = 0) -> list[dict]:
+        """Ошибки ссылок одной техкарты (assembledProductId и productId ингредиентов)."""
+        products = self.known_ids(PRODUCTS)
+        header = chart.header if isinstance(chart, BulkAssemblyChart) else chart
+        issues = []
+        if header.assembledProductId not in products:
+            issues.append(self._issue(index, "assembledProductId", header.assembledProductId, PRODUCTS))
+        product_ids = chart.product_ids if isinstance(chart, BulkAssemblyChart) else [item.productId for item in chart.items]
+        for position, product_id in enumerate(product_ids):
+            if product_id not in products:
+                issues.append(self._issue(index, f"items[{position}].productId", product_id, PRODUCTS))
+        return issues
+
+    def validate_products(self, products: Iterable[Product]) -> list[dict]:
+        """Ошибки ссылок пакета продуктов (index — позиция продукта в пакете)."""
+        return [issue for index, product in enumerate(products) for issue in self.product_issues(product, index)]
+
+    def validate_assembly_charts(self, charts: Iterable[AssemblyChart | BulkAssemblyChart]) -> list[dict]:
+        """Ошибки ссылок пакета техкарт (index — позиция техкарты в пакете)."""
+        return [issue for index, chart in enumerate(charts) for issue in self.assembly_chart_issues(chart, index)]
+
+    def check_products(self, products: Iterable[Product]) -> None:
+        """
+        Проверяет пакет продуктов.
+
+        :raises IikoValidationError: если есть ссылки на несуществующие элементы справочников
+        """
+        _raise_if_any(self.validate_products(products), "продуктов")
+
+    def check_assembly_charts(self, charts: Iterable[AssemblyChart | BulkAssemblyChart]) -> None:
+        """
+        Проверяет пакет техкарт.
+
+        :raises IikoValidationError: если есть ссылки на несуществующие элементы номенклатуры
+        """
+        _raise_if_any(self.validate_assembly_charts(charts), "техкарт")
+
+
+def _raise_if_any(issues: list[dict], title: str) -> None:
+    if not issues:
+        return
+    shown = "; ".join(f"[{issue['index']}] {issue['message']}" for issue in issues[:10])
+    more = f" (и еще {len(issues) - 10})" if len(issues) > 10 else ""
+    raise IikoValidationError(f"Ошибки проверки {title}: {shown}{more}", errors=issues)
@@ -1,6 +1,8 @@
 """
 Конфигурация pytest для тестов iiko-api
 """
+import sys
+from typing import Any
 from unittest.mock import Mock
 
 import pytest
@@ -9,6 +11,45 @@ from requests import Response
 from iiko_api.core.base_client import BaseClient
 
 
+def make_chart(
+    product_id: str,
+    items: list[tuple],
+    *,
+    assembled: float = 1.0,
+    date_from: str = "2026-01-01",
+    date_to: str | None = None,
+) -> dict[str, Any]:
+    """
+    Техкарта в формате ответа get_all_assembly_charts.
+
+    :param items: строки (ingredient, amount_in) или (ingredient, amount_in, departments, inverse)
+    """
+    rows = []
+    for ingredient, amount_in, *spec in items:
+        row = {"productId": ingredient, "amountIn": amount_in, "amountOut": amount_in}
+        if spec:
+            row["storeSpecification"] = {"departments": spec[0], "inverse": spec[1]}
+        rows.append(row)
+    return {
+        "id": f"{product_id}-{date_from}",
+        "assembledProductId": product_id,
+        "dateFrom": f"{date_from}T00:00:00",
+        "dateTo": f"{date_to}T00:00:00" if date_to else None,
+        "assembledAmount": assembled,
+        "items": rows,
+    }
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_mode(request, monkeypatch) -> str:
+    """Прогоняет тест с NumPy (если установлен) и на чистом Python."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    return request.param
+
+
 @pytest.fixture
 def mock_base_client():
     """Создает мок BaseClient для тестирования"""
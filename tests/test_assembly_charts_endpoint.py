@@ -0,0 +1,104 @@
+"""
+Тесты пакетного сохранения техкарт
+"""
+from unittest.mock import Mock
+
+from iiko_api.core.journal import WriteJournal
+from iiko_api.endpoints.assembly_charts import AssemblyChartsEndpoints, assembly_chart_canonical
+from iiko_api.exceptions import IikoAPIError
+from iiko_api.models.models import (
+    AssemblyChart,
+    AssemblyChartItem,
+    ProductSizeAssemblyStrategy,
+    ProductWriteoffStrategy,
+    StoreSpecification,
+)
+
+
+def _chart(product_id: str, amount_in: float = 0.25, date_from: str = "2026-01-01") -> AssemblyChart:
+    return AssemblyChart(
+        assembledProductId=product_id,
+        dateFrom=date_from,
+        assembledAmount=1,
+        productWriteoffStrategy=ProductWriteoffStrategy.ASSEMBLE,
+        effectiveDirectWriteoffStoreSpecification=StoreSpecification(departments=["d-2", "d-1"]),
+        productSizeAssemblyStrategy=ProductSizeAssemblyStrategy.COMMON,
+        items=[
+            AssemblyChartItem(productId="i-1", amountIn=amount_in, amountOut=0.2),
+            AssemblyChartItem(productId="i-2", amountIn=1, sortWeight=1),
+        ],
+    )
+
+
+def _server_chart(product_id: str, amount_in: float = 0.25) -> dict:
+    """Техкарта в том виде, в котором ее возвращает getAll"""
+    return {
+        "id": f"chart-{product_id}",
+        "assembledProductId": product_id,
+        "dateFrom": "2026-01-01T00:00:00",
+        "dateTo": None,
+        "assembledAmount": 1.0,
+        "productWriteoffStrategy": "ASSEMBLE",
+        "effectiveDirectWriteoffStoreSpecification": {"departments": ["d-1", "d-2"], "inverse": False},
+        "productSizeAssemblyStrategy": "COMMON",
+        "items": [
+            {"id": "row-2", "productId": "i-2", "sortWeight": 1, "amountIn": 1.0, "amountMiddle": 0},
+            {"id": "row-1", "productId": "i-1", "sortWeight": 0, "amountIn": amount_in, "amountOut": 0.2000000001},
+        ],
+        "technologyDescription": None,
+    }
+
+
+def test_assembly_chart_canonical_ignores_server_noise():
+    """Порядок ингредиентов, служебные id, формат даты и null-комментарии не влияют на сравнение"""
+    assert assembly_chart_canonical(_chart("p-1")) == assembly_chart_canonical(_server_chart("p-1"))
+    assert assembly_chart_canonical(_chart("p-1", amount_in=0.3)) != assembly_chart_canonical(_server_chart("p-1"))
+
+
+def test_save_assembly_charts_saves_only_changed(mock_base_client):
+    """Отправляются только новые и измененные техкарты, ошибка одной не прерывает остальные"""
+    endpoint = AssemblyChartsEndpoints(mock_base_client)
+    endpoint.get_all_assembly_charts = Mock(return_value={
+        "assemblyCharts": [_server_chart("p-1"), _server_chart("p-2"), _server_chart("p-3")],
+    })
+
+    def save(chart):
+        if chart.assembledProductId == "p-3":
+            raise IikoAPIError("Ошибка при сохранении техкарты")
+        return {"id": f"saved-{chart.assembledProductId}"}
+
+    endpoint.save_assembly_chart = Mock(side_effect=save)
+    charts = [_chart("p-1"), _chart("p-2", amount_in=0.5), _chart("p-3", amount_in=0.5), _chart("p-4", date_from="2025-12-01")]
+
+    results = endpoint.save_assembly_charts(charts, max_workers=2)
+
+    endpoint.get_all_assembly_charts.assert_called_once_with("2025-12-01", include_prepared_charts=False)
+    assert [(r.action, r.existing_id) for r in results] == [
+        ("unchanged", "chart-p-1"),
+        ("saved", "chart-p-2"),
+        ("failed", "chart-p-3"),
+        ("saved", None),
+    ]
+    assert results[1].response == {"id": "saved-p-2"}
+    assert isinstance(results[2].error, IikoAPIError)
+    assert endpoint.save_assembly_chart.call_count == 3
+
+
+def test_save_assembly_charts_resends_after_server_drift(mock_base_client):
+    """Техкарта, подтвержденная в журнале, отправляется снова, если на сервере ее изменили"""
+    endpoint = AssemblyChartsEndpoints(mock_base_client)
+    endpoint.get_all_assembly_charts = Mock(return_value={"assemblyCharts": [_server_chart("p-1")]})
+    endpoint.save_assembly_chart = Mock(return_value={"id": "saved-p-1"})
+    journal = WriteJournal(":memory:")
+    charts = [_chart("p-1", amount_in=0.5)]
+
+    assert [r.action for r in endpoint.save_assembly_charts(charts, journal=journal)] == ["saved"]
+
+    # Запись применена, техкарта совпадает с сервером: повторный запуск ничего не отправляет
+    endpoint.get_all_assembly_charts.return_value = {"assemblyCharts": [_server_chart("p-1", amount_in=0.5)]}
+    assert [r.action for r in endpoint.save_assembly_charts(charts, journal=journal)] == ["unchanged"]
+
+    # Техкарту изменили на сервере после подтвержденной записи
+    endpoint.get_all_assembly_charts.return_value = {"assemblyCharts": [_server_chart("p-1", amount_in=0.4)]}
+    assert [r.action for r in endpoint.save_assembly_charts(charts, journal=journal)] == ["saved"]
+    assert endpoint.save_assembly_chart.call_count == 2
@@ -0,0 +1,147 @@
+"""
+Тесты для колоночных построителей BulkOrder и BulkAssemblyChart
+"""
+import json
+
+import pytest
+
+from iiko_api.endpoints.assembly_charts import AssemblyChartsEndpoints
+from iiko_api.endpoints.orders import OrdersEndpoints
+from iiko_api.models.bulk import BulkAssemblyChart, BulkOrder
+from iiko_api.models.models import (
+    AssemblyChart,
+    AssemblyChartItem,
+    Item,
+    Order,
+    ProductSizeAssemblyStrategy,
+    ProductWriteoffStrategy,
+    StoreSpecification,
+)
+
+CHART_HEADER = {
+    "assembledProductId": "dish-1",
+    "dateFrom": "2024-01-01",
+    "assembledAmount": 1,
+    "productWriteoffStrategy": ProductWriteoffStrategy.ASSEMBLE,
+    "effectiveDirectWriteoffStoreSpecification": StoreSpecification(),
+    "productSizeAssemblyStrategy": ProductSizeAssemblyStrategy.COMMON,
+    "description": 'Соус "items":[]',
+}
+
+
+def test_bulk_order_json_matches_order():
+    """JSON BulkOrder совпадает с JSON pydantic-модели Order"""
+    order = Order(
+        dateIncoming="2024-12-23",
+        shortName='Приказ "декабрь"',
+        items=[
+            Item(departmentId="d-1", productId="p-1", price=100),
+            Item(departmentId="d-1", productId="p-2", price=250, including=False, dishOfDay=True),
+        ],
+    )
+    bulk = BulkOrder(
+        "2024-12-23",
+        product_ids=["p-1", "p-2"],
+        department_ids="d-1",
+        prices=[100, 250],
+        including=[True, False],
+        dish_of_day=[False, True],
+        short_name='Приказ "декабрь"',
+    )
+
+    assert bulk.model_dump_json() == order.model_dump_json()
+
+
+def test_bulk_order_rejects_bad_column():
+    """Ошибка указывает колонку и индекс"""
+    with pytest.raises(ValueError, match=r"prices\[1\]"):
+        BulkOrder("2024-12-23", ["p-1", "p-2"], "d-1", [100, "250"])
+    with pytest.raises(ValueError, match="Длина колонки department_ids"):
+        BulkOrder("2024-12-23", ["p-1", "p-2"], ["d-1"], [100, 250])
+    with pytest.raises(ValueError, match=r"product_ids\[0\]"):
+        BulkOrder("2024-12-23", [""], "d-1", [100])
+
+
+def test_bulk_assembly_chart_json_matches_model():
+    """JSON BulkAssemblyChart совпадает с AssemblyChart.model_dump_json(exclude_none=True)"""
+    spec = StoreSpecification(departments=["d-1"], inverse=True)
+    chart = AssemblyChart(
+        items=[
+            AssemblyChartItem(productId="i-1", amountIn=0.25, amountOut=0.2),
+            AssemblyChartItem(productId="i-2", amountIn=1, sortWeight=1, storeSpecification=spec, packageTypeId="pk"),
+        ],
+        **CHART_HEADER,
+    )
+    bulk = BulkAssemblyChart(
+        ["i-1", "i-2"],
+        amounts_in=[0.25, 1],
+        amounts_out=[0.2, 0],
+        sort_weights=[0, 1],
+        store_specifications=[None, spec],
+        package_type_ids=[None, "pk"],
+        **CHART_HEADER,
+    )
+
+    assert bulk.model_dump_json() == chart.model_dump_json(exclude_none=True)
+
+
+def test_bulk_assembly_chart_rejects_non_numeric_amount():
+    """Нечисловое количество"""
+    with pytest.raises(ValueError, match=r"amounts_in\[1\]"):
+        BulkAssemblyChart(["i-1", "i-2"], [1.0, None], **CHART_HEADER)
+
+
+def test_set_new_order_accepts_bulk_order(mock_base_client, mock_success_response):
+    """set_new_order отправляет JSON BulkOrder как есть"""
+    mock_base_client.post.return_value = mock_success_response
+    bulk = BulkOrder("2024-12-23", ["p-1"], "d-1", [100])
+
+    OrdersEndpoints(mock_base_client).set_new_order(bulk)
+
+    sent = json.loads(mock_base_client.post.call_args.kwargs["data"])
+    assert sent["items"] == [{
+        "departmentId": "d-1", "productId": "p-1", "including": True,
+        "price": 100, "flyerProgram": False, "dishOfDay": False,
+    }]
+
+
+def test_save_assembly_chart_accepts_bulk_chart(mock_base_client, mock_success_response):
+    """save_assembly_chart отправляет JSON BulkAssemblyChart"""
+    mock_base_client.post.return_value = mock_success_response
+    bulk = BulkAssemblyChart(["i-1"], [0.5], **CHART_HEADER)
+
+    AssemblyChartsEndpoints(mock_base_client).save_assembly_chart(bulk)
+
+    sent = json.loads(mock_base_client.post.call_args.kwargs["data"])
+    assert sent["items"][0]["productId"] == "i-1"
+    assert sent["items"][0]["amountIn"] == 0.5
+
+
+def test_bulk_columns_accept_numpy_values():
+    """Колонки из DataFrame: numpy.int64, numpy.bool_ и numpy.str_"""
+    np = pytest.importorskip("numpy")
+    plain = BulkOrder("2024-12-23", ["p-1", "p-2"], "d-1", [100, 250], including=[True, False])
+    bulk = BulkOrder(
+        "2024-12-23",
+        np.array(["p-1", "p-2"]),
+        "d-1",
+        np.array([100, 250], dtype=np.int64),
+        including=np.array([True, False]),
+        dish_of_day=np.False_,
+    )
+    assert bulk.model_dump_json() == plain.model_dump_json()
+
+    chart = BulkAssemblyChart(["i-1"], np.array([0.5]), sort_weights=np.int64(2), **CHART_HEADER)
+    assert chart.model_dump_json() == BulkAssemblyChart(["i-1"], [0.5], sort_weights=2, **CHART_HEADER).model_dump_json()
+
+    with pytest.raises(ValueError, match=r"prices\[0\]"):
+        BulkOrder("2024-12-23", ["p-1"], "d-1", np.array([True]))
+    with pytest.raises(ValueError, match=r"including\[0\]"):
+        BulkOrder("2024-12-23", ["p-1"], "d-1", [100], including=[1])
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf"), -float("inf")])
+def test_bulk_assembly_chart_rejects_non_finite_amount(value):
+    """NaN и бесконечность не сериализуются в JSON"""
+    with pytest.raises(ValueError, match=r"amounts_out\[1\] должен быть конечным числом"):
+        BulkAssemblyChart(["i-1", "i-2"], [1.0, 2.0], [0.5, value], **CHART_HEADER)
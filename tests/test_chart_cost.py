@@ -0,0 +1,82 @@
+"""Food cost: sparse dish x ingredient matrix, balance-based prices and incremental updates."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from iiko_api.charts import AssemblyChartGraph, FoodCostMatrix, ingredient_costs_from_balance
+from tests.conftest import make_chart
+
+GRAPH = AssemblyChartGraph([
+    make_chart("pizza", [("dough", 0.3), ("cheese", 0.1)]),
+    make_chart("bread", [("dough", 0.5)]),
+    make_chart("dough", [("flour", 6.0), ("water", 4.0)], assembled=10.0),
+    make_chart("salad", [("tomato", 0.2), ("cheese", 0.05)]),
+])
+
+BALANCE = [
+    {"store": "s-1", "product": "flour", "amount": 100, "sum": 5000},
+    {"store": "s-2", "product": "flour", "amount": 100, "sum": 7000},
+    {"store": "s-1", "product": "cheese", "amount": 10, "sum": 8000},
+    {"store": "s-1", "product": "tomato", "amount": -2, "sum": -300},
+    {"store": "s-2", "product": "tomato", "amount": 5, "sum": 1000},
+]
+
+
+def test_ingredient_costs_from_balance() -> None:
+    assert ingredient_costs_from_balance(BALANCE) == {"flour": Decimal(60), "cheese": Decimal(800), "tomato": Decimal(200)}
+    assert ingredient_costs_from_balance(BALANCE, store_ids=["s-1"]) == {"flour": Decimal(50), "cheese": Decimal(800)}
+    # Суммы складываются в Decimal: (0.1 + 0.2) / 2 без двоичных артефактов float
+    prices = ingredient_costs_from_balance([
+        {"store": "s-1", "product": "salt", "amount": 1, "sum": 0.1},
+        {"store": "s-2", "product": "salt", "amount": 1.0, "sum": "0.2"},
+        {"store": "s-2", "product": "pepper", "amount": 3, "sum": 1},
+    ])
+    assert prices == {"salt": Decimal("0.1500"), "pepper": Decimal("0.3333")}
+    assert str(prices["salt"]) == "0.1500"
+    with pytest.raises(ValueError, match="sum остатка salt"):
+        ingredient_costs_from_balance([{"product": "salt", "amount": 1, "sum": "много"}])
+
+
+def test_compute_and_incremental_update(numpy_mode: str) -> None:
+    matrix = FoodCostMatrix(GRAPH, ["pizza", "bread", "salad"], on_date="2026-02-01")
+    assert len(matrix) == 3
+    assert matrix.nnz == 7
+    assert matrix.row("pizza") == pytest.approx({"flour": 0.18, "water": 0.12, "cheese": 0.1})
+
+    costs = matrix.compute(ingredient_costs_from_balance(BALANCE))
+    assert costs == {"pizza": Decimal("90.8"), "bread": Decimal(18), "salad": Decimal(80)}
+    assert all(cost.as_tuple().exponent == -4 for cost in costs.values())
+    assert matrix.unpriced == {"water"}
+
+    changed = matrix.update({"cheese": Decimal(900), "unknown": 1.0})
+    assert changed == {"pizza": Decimal("100.8"), "salad": Decimal(85)}
+    assert matrix.cost_of("bread") == Decimal(18)
+
+    # Затронутые блюда пересчитываются целиком: после серии обновлений результат равен compute
+    prices = {**ingredient_costs_from_balance(BALANCE), "cheese": Decimal(900), "water": 1.0}
+    for price in ("0.1", "0.37", "1.0"):
+        matrix.update({"water": price})
+    assert matrix.unpriced == set()
+    assert matrix.cost_of("pizza") == Decimal("100.92")
+    assert matrix.costs == FoodCostMatrix(GRAPH, ["pizza", "bread", "salad"], on_date="2026-02-01").compute(prices)
+
+
+def test_compute_with_empty_rows(numpy_mode: str) -> None:
+    # Продукт без техкарты — своя строка; блюда без ингредиентов нет, но пустая матрица допустима
+    matrix = FoodCostMatrix(GRAPH, ["flour", "pizza"], on_date="2026-02-01")
+    assert matrix.compute({"flour": 60.0}) == {"flour": Decimal(60), "pizza": Decimal("10.8")}
+    assert FoodCostMatrix(GRAPH, [], on_date="2026-02-01").compute({}) == {}
+    assert isinstance(matrix.cost_of("pizza"), Decimal)
+    assert matrix.update({}) == {}
+    with pytest.raises(ValueError, match="цены flour"):
+        matrix.update({"flour": "nan"})
+
+
+def test_update_requires_compute() -> None:
+    matrix = FoodCostMatrix(GRAPH, on_date="2026-02-01")
+    assert set(matrix.dishes) == {"pizza", "bread", "dough", "salad"}
+    with pytest.raises(ValueError, match="compute"):
+        matrix.update({"flour": 1.0})
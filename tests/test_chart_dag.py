@@ -0,0 +1,84 @@
+"""Local assembly chart expansion: nested charts, store specifications, date validity and cycles."""
+
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api import AssemblyChartCycleError
+from iiko_api.charts import AssemblyChartGraph
+from iiko_api.models.models import (
+    AssemblyChart,
+    AssemblyChartItem,
+    ProductSizeAssemblyStrategy,
+    ProductWriteoffStrategy,
+    StoreSpecification,
+)
+from tests.conftest import make_chart
+
+CHARTS = [
+    # Пицца: 0.3 кг теста и 0.1 кг соуса (соус — только в d-1, в остальных — 0.12 кг кетчупа)
+    make_chart("pizza", [("dough", 0.3), ("sauce", 0.1, ["d-1"], False), ("ketchup", 0.12, ["d-1"], True)]),
+    # Тесто: на 10 кг — 6 кг муки и 4 л воды
+    make_chart("dough", [("flour", 6.0), ("water", 4.0)], assembled=10.0),
+    # Соус: на 2 кг — 2.5 кг томатов
+    make_chart("sauce", [("tomato", 2.5)], assembled=2.0),
+]
+
+
+def test_expand_nested_charts_per_department() -> None:
+    graph = AssemblyChartGraph.from_response({"assemblyCharts": CHARTS, "preparedCharts": []})
+
+    in_d1 = graph.expand("pizza", 10, on_date="2026-02-01", department_id="d-1")
+    assert in_d1 == pytest.approx({"flour": 1.8, "water": 1.2, "tomato": 1.25})
+    in_d2 = graph.expand("pizza", 10, on_date="2026-02-01", department_id="d-2")
+    assert in_d2 == pytest.approx({"flour": 1.8, "water": 1.2, "ketchup": 1.2})
+    # Без подразделения действуют только строки без ограничений
+    assert graph.expand("pizza", on_date="2026-02-01") == pytest.approx({"flour": 0.18, "water": 0.12})
+    # Продукт без техкарты — сам себе конечный ингредиент
+    assert graph.expand("flour", 2, on_date="2026-02-01") == {"flour": 2}
+    assert graph.expand_many({"pizza": 10, "dough": 10}, on_date="2026-02-01", department_id="d-2") == pytest.approx(
+        {"flour": 7.8, "water": 5.2, "ketchup": 1.2}
+    )
+
+
+def test_expand_respects_chart_dates() -> None:
+    charts = [
+        make_chart("bread", [("flour", 0.5)], date_from="2025-01-01", date_to="2026-01-01"),
+        make_chart("bread", [("flour", 0.6)], date_from="2026-01-01"),
+    ]
+    graph = AssemblyChartGraph(charts)
+    assert graph.expand("bread", on_date=date(2025, 12, 31)) == {"flour": 0.5}
+    assert graph.expand("bread", on_date=date(2026, 1, 1)) == {"flour": 0.6}
+    assert graph.expand("bread", on_date="2024-06-01") == {"bread": 1.0}
+    assert graph.chart_for("bread", "2026-03-01").date_to is None
+
+
+def test_cycles_are_detected() -> None:
+    graph = AssemblyChartGraph([make_chart("a", [("b", 1)]), make_chart("b", [("c", 1)]), make_chart("c", [("a", 1)])])
+    with pytest.raises(AssemblyChartCycleError) as exc_info:
+        graph.expand("a", on_date="2026-02-01")
+    assert exc_info.value.cycle == ["a", "b", "c", "a"]
+    with pytest.raises(AssemblyChartCycleError):
+        graph.check_cycles("2026-02-01")
+
+
+def test_graph_from_models_and_api() -> None:
+    chart = AssemblyChart(
+        assembledProductId="salad",
+        dateFrom="2026-01-01",
+        assembledAmount=2,
+        productWriteoffStrategy=ProductWriteoffStrategy.DIRECT,
+        effectiveDirectWriteoffStoreSpecification=StoreSpecification(),
+        productSizeAssemblyStrategy=ProductSizeAssemblyStrategy.COMMON,
+        items=[AssemblyChartItem(productId="leaf", amountIn=0.4)],
+    )
+    assert AssemblyChartGraph([chart]).expand("salad", on_date="2026-01-05") == pytest.approx({"leaf": 0.2})
+
+    endpoints = MagicMock()
+    endpoints.get_all_assembly_charts.return_value = {"assemblyCharts": CHARTS}
+    graph = AssemblyChartGraph.from_api(endpoints, "2026-01-01")
+    endpoints.get_all_assembly_charts.assert_called_once_with("2026-01-01", None, include_prepared_charts=False)
+    assert sorted(graph.products) == ["dough", "pizza", "sauce"]
@@ -0,0 +1,135 @@
+"""Ingredient demand planning: forecast expansion per store and day, chart changes and shortfalls."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from iiko_api.charts import (
+    AssemblyChartGraph,
+    DemandPlan,
+    FoodCostMatrix,
+    IngredientShortfall,
+    build_dish_sales_olap_body,
+    department_stores,
+    dish_sales_from_olap,
+    forecast_by_weekday,
+)
+from tests.conftest import make_chart
+
+GRAPH = AssemblyChartGraph([
+    make_chart("pizza", [("dough", 0.3), ("cheese", 0.1)]),
+    make_chart("dough", [("flour", 6.0), ("water", 4.0)], assembled=10.0),
+    # С 3 февраля в салате больше сыра
+    make_chart("salad", [("cheese", 0.05), ("tomato", 0.2)], date_to="2026-02-03"),
+    make_chart("salad", [("cheese", 0.08), ("tomato", 0.2)], date_from="2026-02-03"),
+])
+
+
+def test_matrix_ingredient_demand(numpy_mode: str) -> None:
+    matrix = FoodCostMatrix(GRAPH, ["pizza", "salad"], on_date="2026-02-01")
+
+    # Количества округлены до точности техкарт: NumPy и Python дают одно и то же
+    assert matrix.ingredient_demand({"pizza": 10, "salad": 20, "unknown": 5}) == {
+        "flour": 1.8, "water": 1.2, "cheese": 2.0, "tomato": 4.0,
+    }
+    assert matrix.ingredient_demand({}) == {}
+
+
+def test_plan_per_store_and_day_with_chart_change(numpy_mode: str) -> None:
+    forecast = {
+        "d-1": {
+            "2026-02-02": {"pizza": 10, "salad": 20},
+            date(2026, 2, 3): {"salad": 10},
+        },
+        "d-2": {"2026-02-02": {"pizza": 5}},
+    }
+    plan = DemandPlan(GRAPH, forecast, stores={"d-1": "s-1"})
+
+    assert list(plan.demand) == ["s-1", "d-2"]
+    assert plan.demand["s-1"][date(2026, 2, 2)] == pytest.approx(
+        {"flour": 1.8, "water": 1.2, "cheese": 2.0, "tomato": 4.0}
+    )
+    assert plan.demand["s-1"][date(2026, 2, 3)] == pytest.approx({"cheese": 0.8, "tomato": 2.0})
+    assert plan.demand["d-2"][date(2026, 2, 2)] == pytest.approx({"flour": 0.9, "water": 0.6, "cheese": 0.5})
+    assert plan.totals("s-1")["cheese"] == pytest.approx(2.8)
+    assert plan.totals("unknown") == {}
+
+
+def test_shortfalls_are_cumulative() -> None:
+    plan = DemandPlan(
+        GRAPH,
+        {"d-1": {"2026-02-02": {"salad": 20}, "2026-02-03": {"salad": 10}}},
+        stores={"d-1": "s-1"},
+    )
+    balance = [
+        {"store": "s-1", "product": "cheese", "amount": 1.5, "sum": 900},
+        {"store": "s-1", "product": "tomato", "amount": 10, "sum": 1000},
+        {"store": "s-2", "product": "cheese", "amount": 100, "sum": 60000},
+    ]
+
+    shortfalls = plan.shortfalls({"response": balance})
+    assert shortfalls == [
+        IngredientShortfall("s-1", date(2026, 2, 3), "cheese", 1.8, 1.5, 0.3),
+    ]
+    # Без остатков не хватает всего
+    assert [(s.day, s.product_id) for s in plan.shortfalls([])] == [
+        (date(2026, 2, 2), "cheese"),
+        (date(2026, 2, 2), "tomato"),
+        (date(2026, 2, 3), "cheese"),
+        (date(2026, 2, 3), "tomato"),
+    ]
+
+
+def test_shortfalls_compare_in_fixed_point(numpy_mode: str) -> None:
+    # 0.1 + 0.2 сыра нарастающим итогом: во float это 0.30000000000000004
+    plan = DemandPlan(
+        GRAPH,
+        {"d-1": {"2026-02-01": {"salad": 2}, "2026-02-02": {"salad": 4}}},
+        stores={"d-1": "s-1"},
+    )
+    assert plan.totals("s-1") == {"cheese": 0.3, "tomato": 1.2}
+    enough = [{"store": "s-1", "product": "cheese", "amount": "0.3"}, {"store": "s-1", "product": "tomato", "amount": 1.2}]
+    assert plan.shortfalls(enough) == []
+
+    # Нехватка в одну единицу точности количеств не теряется
+    short = [{"store": "s-1", "product": "cheese", "amount": 0.299999}, enough[1]]
+    assert plan.shortfalls(short) == [
+        IngredientShortfall("s-1", date(2026, 2, 2), "cheese", 0.3, 0.299999, 0.000001),
+    ]
+    with pytest.raises(ValueError, match="amount остатка cheese"):
+        plan.shortfalls([{"store": "s-1", "product": "cheese", "amount": "много"}])
+
+
+def test_forecast_from_olap_history() -> None:
+    body = build_dish_sales_olap_body(date(2026, 1, 5), date(2026, 1, 18), ["d-1", "d-1"])
+    assert body["groupByRowFields"] == ["Department.Id", "OpenDate.Typed", "DishId"]
+    assert body["aggregateFields"] == ["DishAmountInt"]
+    assert body["filters"]["Department.Id"]["values"] == ["d-1"]
+    assert body["filters"]["OpenDate.Typed"]["to"] == "2026-01-19T00:00:00.000"
+    with pytest.raises(ValueError):
+        build_dish_sales_olap_body(date(2026, 1, 2), date(2026, 1, 1), ["d-1"])
+
+    # Два понедельника: 5 и 12 января
+    history = dish_sales_from_olap({"data": [
+        {"Department.Id": "d-1", "OpenDate.Typed": "2026-01-05", "DishId": "pizza", "DishAmountInt": 10},
+        {"Department.Id": "d-1", "OpenDate.Typed": "2026-01-12", "DishId": "pizza", "DishAmountInt": 14},
+        {"Department.Id": "d-1", "OpenDate.Typed": "2026-01-12", "DishId": "salad", "DishAmountInt": 6},
+        {"Department.Id": "d-1", "OpenDate.Typed": "2026-01-06", "DishId": "pizza", "DishAmountInt": 3},
+        {"Department.Id": None, "OpenDate.Typed": "2026-01-06", "DishId": "pizza", "DishAmountInt": 3},
+    ]})
+    assert history["d-1"][date(2026, 1, 12)] == {"pizza": 14.0, "salad": 6.0}
+
+    forecast = forecast_by_weekday(history, ["2026-02-02", "2026-02-04"])
+    assert forecast == {"d-1": {date(2026, 2, 2): {"pizza": 12.0, "salad": 3.0}, date(2026, 2, 4): {}}}
+
+
+def test_department_stores() -> None:
+    stores = [
+        {"id": "s-1", "parentId": "d-1"},
+        {"id": "s-2", "parentId": "d-1"},
+        {"id": "s-3", "parentId": "d-2"},
+        {"id": "s-4", "parentId": None},
+    ]
+    assert department_stores(stores) == {"d-1": "s-1", "d-2": "s-3"}
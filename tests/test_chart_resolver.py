@@ -0,0 +1,89 @@
+"""Date-effective assembly chart lookups: overlapping versions, gaps and change history."""
+
+from __future__ import annotations
+
+from datetime import date
+
+from iiko_api.charts import AssemblyChartGraph, ChartResolver
+from tests.conftest import make_chart
+
+CHARTS = [
+    make_chart("bread", [("flour", 1.0)], date_to="2026-03-01"),
+    # Перекрывает первую версию: с 2026-02-01 действует она
+    make_chart("bread", [("rye", 1.0)], date_from="2026-02-01"),
+    # Пирог: действует только в январе и снова с апреля
+    make_chart("pie", [("apple", 1.0)], date_to="2026-02-01"),
+    make_chart("pie", [("cherry", 1.0)], date_from="2026-04-01"),
+]
+
+
+def _ingredient(version) -> str | None:
+    return version.items[0].product_id if version is not None else None
+
+
+def test_effective_picks_latest_started_version() -> None:
+    resolver = ChartResolver.from_response({"assemblyCharts": CHARTS})
+
+    assert _ingredient(resolver.effective("bread", "2025-12-31")) is None
+    assert _ingredient(resolver.effective("bread", "2026-01-15")) == "flour"
+    assert _ingredient(resolver.effective("bread", date(2026, 2, 1))) == "rye"
+    assert _ingredient(resolver.effective("bread", "2027-01-01")) == "rye"
+    # Интервал действия без даты окончания и с исключающей датой окончания
+    assert _ingredient(resolver.effective("pie", "2026-01-31")) == "apple"
+    assert resolver.effective("pie", "2026-02-01") is None
+    assert _ingredient(resolver.effective("pie", "2026-04-01")) == "cherry"
+    assert resolver.effective("unknown", "2026-01-15") is None
+    assert sorted(resolver.products) == ["bread", "pie"]
+    assert [version.date_from for version in resolver.versions("pie")] == [date(2026, 1, 1), date(2026, 4, 1)]
+
+
+def test_changes_between_dates() -> None:
+    resolver = ChartResolver.from_response({"assemblyCharts": CHARTS})
+
+    changes = resolver.changes("pie", "2026-01-01", "2026-12-31")
+    assert [(day, _ingredient(version)) for day, version in changes] == [
+        (date(2026, 2, 1), None),
+        (date(2026, 4, 1), "cherry"),
+    ]
+    # Начальная дата не включается, конечная включается
+    assert [day for day, _ in resolver.changes("pie", "2026-02-01", "2026-04-01")] == [date(2026, 4, 1)]
+    # Конец первой версии хлеба перекрыт второй версией — смены нет
+    assert [day for day, _ in resolver.changes("bread", "2025-12-01", "2026-12-31")] == [
+        date(2026, 1, 1),
+        date(2026, 2, 1),
+    ]
+    assert resolver.changes("unknown", "2026-01-01", "2026-12-31") == []
+
+
+def test_bulk_lookups() -> None:
+    resolver = ChartResolver(
+        [make_chart(f"dish-{n}", [(f"old-{n}", 1.0)]) for n in range(2000)]
+        + [make_chart(f"dish-{n}", [(f"new-{n}", 1.0)], date_from="2026-06-01") for n in range(0, 2000, 2)]
+    )
+    ids = [f"dish-{n}" for n in range(2000)] + ["unknown"]
+
+    effective = resolver.effective_many(ids, "2026-07-01")
+    assert _ingredient(effective["dish-0"]) == "new-0"
+    assert _ingredient(effective["dish-1"]) == "old-1"
+    assert effective["unknown"] is None
+
+    changes = resolver.changes_many(ids, "2026-01-01", "2026-12-31")
+    assert len(changes) == 1000
+    assert [(day, _ingredient(version)) for day, version in changes["dish-2"]] == [(date(2026, 6, 1), "new-2")]
+
+
+def test_graph_uses_resolver() -> None:
+    graph = AssemblyChartGraph.from_response({"assemblyCharts": CHARTS})
+
+    assert isinstance(graph.resolver, ChartResolver)
+    assert graph.expand("bread", on_date="2026-01-15") == {"flour": 1.0}
+    assert graph.expand("bread", on_date="2026-02-15") == {"rye": 1.0}
+    assert graph.expand("pie", on_date="2026-03-01") == {"pie": 1.0}
+
+
+def test_dag_keeps_version_exports() -> None:
+    from iiko_api.charts import dag, resolver
+
+    assert dag.ChartEdge is resolver.ChartEdge
+    assert dag.ChartVersion is resolver.ChartVersion
+    assert dag.chart_version is resolver.chart_version
@@ -0,0 +1,25 @@
+"""Shared date helpers for API dates and user-supplied days."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+
+import pytest
+
+from iiko_api.core.dates import as_day, iso_day
+
+
+def test_iso_day() -> None:
+    assert iso_day("2026-02-01T00:00:00.000") == "2026-02-01"
+    assert iso_day("2026-02-01") == "2026-02-01"
+    assert iso_day(None) is None
+    assert iso_day("") is None
+
+
+def test_as_day() -> None:
+    assert as_day("2026-02-01T10:30:00") == date(2026, 2, 1)
+    assert as_day(date(2026, 2, 1)) == date(2026, 2, 1)
+    assert as_day(datetime(2026, 2, 1, 10, 30)) == date(2026, 2, 1)
+    assert as_day(None) == date.today()
+    with pytest.raises(ValueError):
+        as_day("01.02.2026")
@@ -0,0 +1,99 @@
+"""Write journal: confirmed writes are skipped, interrupted ones are verified before resending."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api import IikoPriceOrderService
+from iiko_api.core.journal import CONFIRMED, FAILED, PENDING, WriteJournal, payload_hash
+from iiko_api.models import Item, PriceRecord
+
+
+class Crash(BaseException):
+    """Имитация падения процесса во время отправки."""
+
+
+def test_payload_hash_is_canonical() -> None:
+    assert payload_hash({"b": 1, "a": [1, 2]}) == payload_hash({"a": [1, 2], "b": 1})
+    item = Item(departmentId="d", productId="p", price=1)
+    assert payload_hash(item) == payload_hash(item.model_dump_json())
+
+
+def test_run_skips_confirmed_and_resends_failed(tmp_path: Path) -> None:
+    path = tmp_path / "journal.sqlite"
+    send = MagicMock(side_effect=[RuntimeError("boom"), {"id": "1"}])
+    with WriteJournal(path) as journal:
+        with pytest.raises(RuntimeError):
+            journal.run("order", {"n": 1}, send)
+        assert journal.get("order", {"n": 1}).status == FAILED
+        assert journal.run("order", {"n": 1}, send) == {"id": "1"}
+
+    # Журнал переживает перезапуск: подтвержденная запись не отправляется повторно
+    with WriteJournal(path) as journal:
+        assert journal.run("order", {"n": 1}, send) == {"id": "1"}
+        assert [entry.status for entry in journal.entries()] == [CONFIRMED]
+    assert send.call_count == 2
+
+
+def test_changed_write_is_resent_despite_confirmed_entry() -> None:
+    journal = WriteJournal(":memory:")
+    send = MagicMock(side_effect=[{"id": "1"}, {"id": "2"}])
+    assert journal.run("product", {"n": 1}, send) == {"id": "1"}
+    assert journal.run("product", {"n": 1}, send) == {"id": "1"}
+    # Данные на сервере разошлись с подтвержденной записью
+    assert journal.run("product", {"n": 1}, send, changed=True) == {"id": "2"}
+    assert journal.get("product", {"n": 1}).response == {"id": "2"}
+    assert send.call_count == 2
+
+
+def test_interrupted_write_is_verified_before_resending(tmp_path: Path) -> None:
+    journal = WriteJournal(tmp_path / "journal.sqlite")
+
+    def crash() -> None:
+        raise Crash
+
+    with pytest.raises(Crash):
+        journal.run("order", {"n": 1}, crash)
+    assert [entry.status for entry in journal.entries(PENDING)] == [PENDING]
+
+    send = MagicMock(return_value={"id": "2"})
+    assert journal.run("order", {"n": 1}, send, verify=lambda: True) is None
+    send.assert_not_called()
+
+    with pytest.raises(Crash):
+        journal.run("order", {"n": 2}, crash)
+    assert journal.run("order", {"n": 2}, send, verify=lambda: False) == {"id": "2"}
+    assert journal.get("order", {"n": 2}).status == CONFIRMED
+
+
+def test_price_service_resumes_through_journal() -> None:
+    iiko_api = MagicMock()
+    iiko_api.orders.set_new_order.return_value = {"documentNumber": "1"}
+    journal = WriteJournal(":memory:")
+    service = IikoPriceOrderService(iiko_api, journal=journal)
+    dishes = [Item(departmentId="d1", productId="p1", price=100), Item(departmentId="d2", productId="p2", price=200)]
+
+    service.set_price_bulk(dishes, "2026-01-01")
+    assert iiko_api.orders.set_new_order.call_count == 2
+
+    # Повторный запуск того же пакета ничего не отправляет
+    report = service.set_price_bulk(dishes, "2026-01-01")
+    assert report.ok
+    assert iiko_api.orders.set_new_order.call_count == 2
+
+    # Прерванный приказ перепроверяется по действующим ценам
+    iiko_api.orders.set_new_order.side_effect = Crash
+    changed = [Item(departmentId="d1", productId="p1", price=150)]
+    with pytest.raises(Crash):
+        service.set_price_bulk(changed, "2026-01-01", max_workers=1)
+    iiko_api.orders.set_new_order.side_effect = None
+    iiko_api.orders.get_price_list.return_value = [
+        PriceRecord(departmentId="d1", productId="p1", price=150, dateFrom="2026-01-01"),
+    ]
+    report = service.set_price_bulk(changed, "2026-01-01")
+    assert report.ok
+    assert iiko_api.orders.set_new_order.call_count == 3
+    assert journal.entries(PENDING) == []
@@ -0,0 +1,72 @@
+"""Pluggable JSON backends and Decimal-preserving fast decoding."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.core.base_client import BaseClient
+from iiko_api.core.json_backend import (
+    JSON_BACKENDS,
+    STDLIB_JSON_BACKEND,
+    get_json_backend,
+    response_json,
+)
+from iiko_api.endpoints.olap import OLAP
+
+PAYLOAD = b'{"data": [{"OpenDate.Typed": "2026-07-10", "DishDiscountSumInt": 1234.56, "Count": 3}]}'
+
+
+def test_default_client_backend_is_stdlib() -> None:
+    assert BaseClient("https://iiko.example", "u", "h").json_backend is STDLIB_JSON_BACKEND
+
+
+def test_unknown_backend_rejected() -> None:
+    with pytest.raises(ValueError, match="Неизвестный JSON backend"):
+        get_json_backend("simdjson-rs")
+
+
+def test_auto_backend_decodes_money_as_decimal() -> None:
+    backend = get_json_backend("auto")
+    payload = backend.loads(PAYLOAD, decimal=True)
+    row = payload["data"][0]
+    assert row["DishDiscountSumInt"] == Decimal("1234.56")
+    assert isinstance(row["DishDiscountSumInt"], Decimal)
+    assert row["Count"] == 3
+
+
+@pytest.mark.parametrize("name", JSON_BACKENDS)
+@pytest.mark.parametrize("raw", ["0.1", "10.30", "99999999999.99", "-0.05", "1e2"])
+def test_every_backend_matches_stdlib_decimal(name: str, raw: str) -> None:
+    pytest.importorskip(name)
+    data = f'{{"v": {raw}}}'.encode()
+    decoded = get_json_backend(name).loads(memoryview(data), decimal=True)
+    assert decoded == STDLIB_JSON_BACKEND.loads(data, decimal=True)
+    assert isinstance(decoded["v"], Decimal)
+
+
+def test_invalid_json_raises_value_error() -> None:
+    with pytest.raises(ValueError):
+        get_json_backend("auto").loads(b"{not json")
+
+
+def test_response_json_uses_backend_content() -> None:
+    backend = get_json_backend("auto")
+    response = MagicMock()
+    response.content = PAYLOAD
+    payload = response_json(response, backend, decimal=True)
+    assert payload["data"][0]["DishDiscountSumInt"] == Decimal("1234.56")
+    if not backend.is_stdlib:
+        response.json.assert_not_called()
+
+
+def test_query_olap_with_fast_backend() -> None:
+    client = MagicMock()
+    client.json_backend = get_json_backend("auto")
+    response = MagicMock()
+    response.content = PAYLOAD
+    client.post.return_value = response
+    payload = OLAP(client).query_olap({"reportType": "SALES"})
+    assert payload["data"][0]["DishDiscountSumInt"] == Decimal("1234.56")
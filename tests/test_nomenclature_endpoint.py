@@ -1,6 +1,7 @@
 """
 Тесты для NomenclatureEndpoints
 """
+import json
 from unittest.mock import Mock
 
 import pytest
@@ -66,3 +67,32 @@ def test_import_product_no_response_field(mock_base_client):
     # Должен вернуть весь ответ, если response отсутствует
     result = endpoint.import_product(product)
     assert result == {"result": "SUCCESS"}
+
+
+def test_update_product_sends_id(mock_base_client, mock_success_response):
+    """Тест обновления продукта: id передается в теле запроса"""
+    mock_base_client.post.return_value = mock_success_response
+
+    endpoint = NomenclatureEndpoints(mock_base_client)
+    product = Product(name="Test Product", num="A-1", mainUnit="unit-id", type=ProductType.DISH)
+
+    result = endpoint.update_product("123", product)
+
+    assert result == {"id": "123", "name": "Test"}
+    kwargs = mock_base_client.post.call_args.kwargs
+    assert kwargs["endpoint"] == "/resto/api/v2/entities/products/update"
+    body = json.loads(kwargs["data"])
+    assert body["id"] == "123"
+    assert body["num"] == "A-1"
+    assert body["type"] == "DISH"
+
+
+def test_update_product_api_error(mock_base_client, mock_error_response):
+    """Тест обработки ошибки API при обновлении продукта"""
+    mock_base_client.post.return_value = mock_error_response
+
+    endpoint = NomenclatureEndpoints(mock_base_client)
+    product = Product(name="Test Product", mainUnit="unit-id", type=ProductType.DISH)
+
+    with pytest.raises(IikoAPIError, match="Ошибка при обновлении продукта"):
+        endpoint.update_product("123", product)
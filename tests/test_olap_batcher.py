@@ -0,0 +1,122 @@
+"""OLAP query fusion: compatible bodies share one server request and get their own rows back."""
+
+from __future__ import annotations
+
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from iiko_api.endpoints.olap import build_fiscal_sales_olap_body
+from iiko_api.olap.batcher import OlapBatcher
+
+
+class FakeOlap:
+    """Сервер: продажи = номер дня, по подразделениям из фильтра."""
+
+    def __init__(self):
+        self.bodies: list[dict] = []
+        self.lock = threading.Lock()
+
+    def query_olap(self, body: dict) -> dict:
+        with self.lock:
+            self.bodies.append(body)
+        date_filter = body["filters"]["OpenDate.Typed"]
+        day = date.fromisoformat(date_filter["from"][:10])
+        end = date.fromisoformat(date_filter["to"][:10])
+        rows = []
+        while day < end:
+            for department in body["filters"]["Department.Id"]["values"]:
+                row = {"DishDiscountSumInt": Decimal(f"{day.day}.50"), "DishAmountInt": 1}
+                for name in body["groupByRowFields"]:
+                    row[name] = {"OpenDate.Typed": day.isoformat(), "Department.Id": department}.get(name, "x")
+                rows.append(row)
+            day += timedelta(days=1)
+        # Сервер сам сворачивает строки до группировки
+        merged: dict = {}
+        for row in rows:
+            key = tuple(row[name] for name in body["groupByRowFields"])
+            if key in merged:
+                merged[key]["DishDiscountSumInt"] += row["DishDiscountSumInt"]
+                merged[key]["DishAmountInt"] += row["DishAmountInt"]
+            else:
+                merged[key] = row
+        return {"data": list(merged.values())}
+
+
+def _body(start: date, end: date, department: str) -> dict:
+    return build_fiscal_sales_olap_body(start, end, department)
+
+
+def test_compatible_requests_are_fused_and_split_back() -> None:
+    server = FakeOlap()
+    with OlapBatcher(server, window=10) as batcher:  # type: ignore[arg-type]
+        futures = {
+            department: batcher.submit(_body(date(2026, 7, 1 + i), date(2026, 7, 3 + i), department))
+            for i, department in enumerate(["d1", "d2", "d3"])
+        }
+        collapsed = _body(date(2026, 7, 2), date(2026, 7, 3), "d1")
+        collapsed["groupByRowFields"] = []
+        total = batcher.submit(collapsed)
+    assert len(server.bodies) == 1
+    fused = server.bodies[0]
+    assert fused["filters"]["Department.Id"]["values"] == ["d1", "d2", "d3"]
+    assert fused["filters"]["OpenDate.Typed"]["from"].startswith("2026-07-01")
+    assert fused["filters"]["OpenDate.Typed"]["to"].startswith("2026-07-06")
+    assert set(fused["groupByRowFields"]) == {"OpenDate.Typed", "Department.Id"}
+
+    assert futures["d2"].result(timeout=1) == {"data": [
+        {"OpenDate.Typed": f"2026-07-0{day}", "DishDiscountSumInt": Decimal(f"{day}.50")} for day in (2, 3, 4)
+    ]}
+    assert total.result(timeout=1) == {"data": [{"DishDiscountSumInt": Decimal("6.00")}]}
+    assert batcher.stats.server_requests == 1 and batcher.stats.fused == 4
+
+
+def test_incompatible_requests_are_sent_alone() -> None:
+    server = FakeOlap()
+    batcher = OlapBatcher(server, window=10)  # type: ignore[arg-type]
+    first = batcher.submit(_body(date(2026, 7, 1), date(2026, 7, 1), "d1"))
+    other_report = _body(date(2026, 7, 1), date(2026, 7, 1), "d2")
+    other_report["filters"]["PayTypes.IsPrintCheque"]["values"] = ["NONFISCAL"]
+    second = batcher.submit(other_report)
+    batcher.flush()
+    assert len(server.bodies) == 2
+    assert first.result(timeout=1)["data"][0]["DishDiscountSumInt"] == Decimal("1.50")
+    assert second.result(timeout=1)["data"][0]["DishDiscountSumInt"] == Decimal("1.50")
+
+
+def test_window_timer_flushes_and_errors_reach_all_callers() -> None:
+    class FailingOlap:
+        def query_olap(self, body: dict) -> dict:
+            raise TimeoutError("RMS timeout")
+
+    batcher = OlapBatcher(FailingOlap(), window=0.01)  # type: ignore[arg-type]
+    futures = [batcher.submit(_body(date(2026, 7, 1), date(2026, 7, 2), d)) for d in ("d1", "d2")]
+    for future in futures:
+        with pytest.raises(TimeoutError):
+            future.result(timeout=2)
+
+
+def test_max_batch_flushes_immediately_off_the_caller_thread() -> None:
+    class SlowOlap(FakeOlap):
+        def __init__(self):
+            super().__init__()
+            self.release = threading.Event()
+            self.threads: list[threading.Thread] = []
+
+        def query_olap(self, body: dict) -> dict:
+            self.threads.append(threading.current_thread())
+            self.release.wait(5)
+            return super().query_olap(body)
+
+    server = SlowOlap()
+    batcher = OlapBatcher(server, window=10, max_batch=2)  # type: ignore[arg-type]
+    batcher.submit(_body(date(2026, 7, 1), date(2026, 7, 1), "d1"))
+    # submit не ждет сервер, хотя окно уже закрыто
+    result = batcher.submit(_body(date(2026, 7, 1), date(2026, 7, 1), "d2"))
+    assert not result.done()
+    server.release.set()
+    assert result.result(timeout=5)["data"]
+    assert len(server.bodies) == 1
+    assert threading.current_thread() not in server.threads
@@ -0,0 +1,130 @@
+"""Day-partitioned OLAP cache: closed days from the store, open days from the server."""
+
+from __future__ import annotations
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP, build_fiscal_sales_olap_body, fiscal_sales_from_payload
+from iiko_api.olap.cache import CachedOLAP, SqliteOlapStore, cache_key
+
+TODAY = date(2026, 3, 10)
+
+
+class FakeServer:
+    """query_olap по фиксированным дневным продажам с журналом запрошенных периодов."""
+
+    def __init__(self):
+        self.requests: list[tuple[str, str]] = []
+        self.client = MagicMock(base_url="https://demo.iiko.it")
+
+    def query_olap(self, body: dict) -> dict:
+        date_filter = body["filters"]["OpenDate.Typed"]
+        self.requests.append((date_filter["from"][:10], date_filter["to"][:10]))
+        start = date.fromisoformat(date_filter["from"][:10])
+        end = date.fromisoformat(date_filter["to"][:10])
+        rows = []
+        day = start
+        while day < end:
+            if day.day % 5:  # каждый пятый день без продаж
+                for department in ("d1", "d2"):
+                    row = {"OpenDate.Typed": day.isoformat(), "DishDiscountSumInt": Decimal(f"{day.day}.10")}
+                    if "Department.Id" in body["groupByRowFields"]:
+                        row["Department.Id"] = department
+                    rows.append(row)
+            day += timedelta(days=1)
+        return {"data": rows}
+
+
+def _cached(server: FakeServer, **kwargs) -> CachedOLAP:
+    return CachedOLAP(server, today=lambda: TODAY, **kwargs)  # type: ignore[arg-type]
+
+
+def test_second_call_fetches_only_open_days() -> None:
+    server = FakeServer()
+    cached = _cached(server, settle_days=2)
+    first = cached.get_fiscal_sales_by_day(date(2026, 1, 1), TODAY, "dep-1")
+    assert server.requests == [("2026-01-01", "2026-03-11")]
+
+    second = cached.get_fiscal_sales_by_day(date(2026, 1, 1), TODAY, "dep-1")
+    assert server.requests[1:] == [("2026-03-08", "2026-03-11")]
+    assert second == first
+    assert second[date(2026, 1, 3)] == Decimal("3.10")
+    assert date(2026, 1, 5) not in second
+
+
+def test_missing_ranges_are_fetched_as_contiguous_runs() -> None:
+    server = FakeServer()
+    cached = _cached(server)
+    cached.get_fiscal_sales_by_day(date(2026, 1, 10), date(2026, 1, 12), "dep-1")
+    server.requests.clear()
+    cached.get_fiscal_sales_by_day(date(2026, 1, 8), date(2026, 1, 15), "dep-1")
+    assert sorted(server.requests) == [("2026-01-08", "2026-01-10"), ("2026-01-13", "2026-01-16")]
+
+
+def test_date_field_is_collapsed_when_not_grouped() -> None:
+    server = FakeServer()
+    cached = _cached(server)
+    body = build_fiscal_sales_olap_body(date(2026, 1, 1), date(2026, 1, 3), "dep-1")
+    body["groupByRowFields"] = ["Department.Id"]
+    payload = cached.query_olap(body)
+    assert payload == {"data": [
+        {"Department.Id": "d1", "DishDiscountSumInt": Decimal("6.30")},
+        {"Department.Id": "d2", "DishDiscountSumInt": Decimal("6.30")},
+    ]}
+    body["aggregateFields"] = ["DishDiscountSumInt.average"]
+    with pytest.raises(ValueError, match="Неаддитивные"):
+        cached.query_olap(body)
+
+
+def test_sqlite_store_survives_reopen(tmp_path) -> None:
+    path = tmp_path / "olap.db"
+    server = FakeServer()
+    _cached(server, store=SqliteOlapStore(path)).get_fiscal_sales_by_day(date(2026, 1, 1), date(2026, 1, 31), "dep-1")
+
+    other = FakeServer()
+    sales = _cached(other, store=SqliteOlapStore(path)).get_fiscal_sales_by_day(
+        date(2026, 1, 1), date(2026, 1, 31), "dep-1"
+    )
+    assert other.requests == []
+    assert sales[date(2026, 1, 31)] == Decimal("31.10")
+    assert isinstance(sales[date(2026, 1, 31)], Decimal)
+
+
+def test_key_ignores_period_and_value_order() -> None:
+    body_a = build_fiscal_sales_olap_body(date(2026, 1, 1), date(2026, 1, 3), "dep-1")
+    body_b = build_fiscal_sales_olap_body(date(2026, 2, 1), date(2026, 2, 3), "dep-1")
+    assert cache_key(body_a, "https://a", "OpenDate.Typed") == cache_key(body_b, "https://a/", "OpenDate.Typed")
+    assert cache_key(body_a, "https://a", "OpenDate.Typed") != cache_key(body_a, "https://b", "OpenDate.Typed")
+    body_a["filters"]["Department.Id"]["values"] = ["x", "y"]
+    body_b["filters"]["Department.Id"]["values"] = ["y", "x"]
+    assert cache_key(body_a, "https://a", "OpenDate.Typed") == cache_key(body_b, "https://a", "OpenDate.Typed")
+
+
+def test_non_midnight_bounds_bypass_cache() -> None:
+    olap = MagicMock(spec=OLAP)
+    olap.client = MagicMock(base_url="https://a")
+    olap.query_olap.return_value = {"data": []}
+    body = build_fiscal_sales_olap_body(date(2026, 1, 1), date(2026, 1, 3), "dep-1")
+    body["filters"]["OpenDate.Typed"]["from"] = "2026-01-01T10:00:00.000"
+    assert CachedOLAP(olap).query_olap(body) == {"data": []}
+    olap.query_olap.assert_called_once_with(body)
+
+
+def test_row_without_day_is_reported() -> None:
+    olap = MagicMock(spec=OLAP)
+    olap.client = MagicMock(base_url="https://a")
+    olap.query_olap.return_value = {"data": [{"OpenDate.Typed": None, "DishDiscountSumInt": 1}]}
+    body = build_fiscal_sales_olap_body(date(2026, 1, 1), date(2026, 1, 3), "dep-1")
+    with pytest.raises(ValueError, match="без значения OpenDate.Typed"):
+        _cached(olap).query_olap(body)
+
+
+def test_fiscal_sales_from_payload_skips_rows_without_day() -> None:
+    assert fiscal_sales_from_payload({"data": [
+        {"OpenDate.Typed": "2026-01-02", "DishDiscountSumInt": 10.5},
+        {"OpenDate.Typed": None, "DishDiscountSumInt": 3},
+    ]}) == {date(2026, 1, 2): Decimal("10.50")}
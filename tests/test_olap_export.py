@@ -0,0 +1,106 @@
+"""OLAP export to NDJSON / Arrow IPC / Parquet with exact decimal measures."""
+
+from __future__ import annotations
+
+import io
+import json
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP
+from iiko_api.olap.export import OlapSchema, export_olap_payload, export_olap_rows
+from iiko_api.olap.stream import iter_olap_rows
+
+BODY = {
+    "reportType": "SALES",
+    "groupByRowFields": ["OpenDate.Typed", "Department"],
+    "groupByColFields": [],
+    "aggregateFields": ["DishDiscountSumInt", "DishAmountInt"],
+}
+PAYLOAD = {
+    "data": [
+        {"OpenDate.Typed": "2026-07-01", "Department": "Кафе", "DishDiscountSumInt": Decimal("100.005"), "DishAmountInt": 2},
+        {"OpenDate.Typed": "2026-07-02", "Department": None, "DishDiscountSumInt": Decimal("-0.1"), "DishAmountInt": Decimal("1.5")},
+        {"OpenDate.Typed": "2026-07-03", "Department": "Бар", "DishDiscountSumInt": None, "DishAmountInt": 0},
+    ]
+}
+
+
+def _ndjson(buffer: io.BytesIO) -> list[dict]:
+    return [json.loads(line, parse_float=Decimal) for line in buffer.getvalue().decode().splitlines()]
+
+
+def test_ndjson_writes_exact_decimals_in_schema_order() -> None:
+    buffer = io.BytesIO()
+    written = export_olap_payload(PAYLOAD, buffer, body=BODY, scales={"DishAmountInt": 3}, batch_size=2)
+    assert written == 3
+    lines = buffer.getvalue().decode().splitlines()
+    assert lines[0] == '{"OpenDate.Typed":"2026-07-01","Department":"Кафе","DishDiscountSumInt":100.01,"DishAmountInt":2.000}'
+    assert _ndjson(buffer)[1] == {
+        "OpenDate.Typed": "2026-07-02", "Department": None, "DishDiscountSumInt": Decimal("-0.10"), "DishAmountInt": Decimal("1.500"),
+    }
+    assert _ndjson(buffer)[2]["DishDiscountSumInt"] == Decimal("0.00")
+
+
+def test_schema_is_inferred_without_body() -> None:
+    buffer = io.BytesIO()
+    export_olap_payload(PAYLOAD, buffer)
+    assert list(_ndjson(buffer)[0]) == ["OpenDate.Typed", "Department", "DishDiscountSumInt", "DishAmountInt"]
+    assert OlapSchema.infer(PAYLOAD["data"][0]).measures == ("DishDiscountSumInt", "DishAmountInt")
+
+
+def test_streamed_rows_keep_raw_numbers() -> None:
+    raw = json.dumps({"data": [{"Department": "Кафе", "DishDiscountSumInt": 0.125}]}).encode()
+    buffer = io.BytesIO()
+    export_olap_rows(iter_olap_rows([raw]), buffer, schema=OlapSchema(("Department",), ("DishDiscountSumInt",), {"DishDiscountSumInt": 2}))
+    assert buffer.getvalue() == '{"Department":"Кафе","DishDiscountSumInt":0.13}\n'.encode()
+
+
+def test_invalid_format_and_measure() -> None:
+    with pytest.raises(ValueError, match="формат"):
+        export_olap_payload(PAYLOAD, io.BytesIO(), "csv")
+    with pytest.raises(ValueError, match="DishDiscountSumInt"):
+        export_olap_payload({"data": [{"DishDiscountSumInt": "abc"}]}, io.BytesIO(), body={"aggregateFields": ["DishDiscountSumInt"]})
+
+
+def test_olap_export_streams_response(tmp_path) -> None:
+    client = MagicMock()
+    response = MagicMock()
+    response.encoding = "utf-8"
+    response.iter_content.return_value = iter([json.dumps({"data": [{"OpenDate.Typed": "2026-07-01", "Department": "Бар", "DishDiscountSumInt": 1.005, "DishAmountInt": 1}]}).encode()])
+    client.post.return_value = response
+    path = tmp_path / "sales.ndjson"
+    assert OLAP(client).export_olap(BODY, path) == 1
+    assert json.loads(path.read_text(encoding="utf-8"), parse_float=Decimal)["DishDiscountSumInt"] == Decimal("1.01")
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_arrow_and_parquet_use_decimal128(tmp_path, fmt: str) -> None:
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / f"sales.{fmt}"
+    export_olap_payload(PAYLOAD, path, fmt, body=BODY, batch_size=2)
+    if fmt == "arrow":
+        table = pa.ipc.open_file(str(path)).read_all()
+    else:
+        import pyarrow.parquet as pq
+        table = pq.read_table(str(path))
+        assert pq.ParquetFile(str(path)).num_row_groups == 2
+    assert table.schema.field("DishDiscountSumInt").type == pa.decimal128(38, 2)
+    assert table.column("DishDiscountSumInt").to_pylist() == [Decimal("100.01"), Decimal("-0.10"), Decimal("0.00")]
+
+
+def test_failed_export_keeps_previous_file(tmp_path) -> None:
+    path = tmp_path / "sales.ndjson"
+    path.write_text("previous\n", encoding="utf-8")
+    client = MagicMock()
+    client.post.side_effect = ConnectionError("timeout")
+
+    with pytest.raises(ConnectionError):
+        OLAP(client).export_olap(BODY, path)
+    with pytest.raises(ValueError, match="DishDiscountSumInt"):
+        export_olap_payload({"data": [{"DishDiscountSumInt": "abc"}]}, path, body={"aggregateFields": ["DishDiscountSumInt"]})
+
+    assert path.read_text(encoding="utf-8") == "previous\n"
+    assert [p.name for p in tmp_path.iterdir()] == ["sales.ndjson"]
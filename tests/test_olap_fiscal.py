@@ -12,6 +12,7 @@ from iiko_api.endpoints.olap import (
     OLAP,
     _parse_decimal,
     _parse_money_decimal,
+    build_fiscal_sales_by_department_olap_body,
     build_fiscal_sales_olap_body,
 )
 
@@ -145,3 +146,33 @@ def test_get_olap_by_preset_id_accepts_datetime_and_normalizes_same_day() -> Non
             date_from=datetime(2026, 7, 1, 10, 0),
             date_to=datetime(2026, 7, 1, 18, 0),
         )
+
+
+def test_build_fiscal_sales_by_department_body_groups_by_department() -> None:
+    body = build_fiscal_sales_by_department_olap_body(date(2026, 7, 1), date(2026, 7, 2), ["d1", "d2", "d1"])
+    assert body["groupByRowFields"] == ["Department.Id", "OpenDate.Typed"]
+    assert body["filters"]["Department.Id"]["values"] == ["d1", "d2"]
+    with pytest.raises(ValueError, match="department_ids"):
+        build_fiscal_sales_by_department_olap_body(date(2026, 7, 1), date(2026, 7, 2), [])
+
+
+def test_fiscal_sales_for_departments_splits_large_id_lists() -> None:
+    olap = OLAP(MagicMock())
+    bodies: list[dict] = []
+
+    def fake_query(body: dict) -> dict:
+        bodies.append(body)
+        return {"data": [
+            {"Department.Id": department_id, "OpenDate.Typed": "2026-07-01", "DishDiscountSumInt": Decimal("10.005")}
+            for department_id in body["filters"]["Department.Id"]["values"]
+            if department_id != "d3"
+        ]}
+
+    olap.query_olap = fake_query  # type: ignore[method-assign]
+    sales = olap.get_fiscal_sales_by_day_for_departments(
+        date(2026, 7, 1), date(2026, 7, 1), ["d1", "d2", "d3", "d4", "d5"], max_departments_per_request=2
+    )
+    assert sorted(len(body["filters"]["Department.Id"]["values"]) for body in bodies) == [1, 2, 2]
+    assert list(sales) == ["d1", "d2", "d3", "d4", "d5"]
+    assert sales["d1"] == {date(2026, 7, 1): Decimal("10.01")}
+    assert sales["d3"] == {}
@@ -0,0 +1,130 @@
+"""Columnar OlapFrame: dictionary-encoded dimensions and fixed-point measures."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP
+from iiko_api.olap import frame as frame_module
+from iiko_api.olap.frame import OlapFrame
+
+BODY = {
+    "reportType": "SALES",
+    "groupByRowFields": ["OpenDate.Typed", "Department.Id"],
+    "groupByColFields": [],
+    "aggregateFields": ["DishDiscountSumInt", "DishAmountInt"],
+}
+PAYLOAD = {
+    "data": [
+        {"OpenDate.Typed": "2026-07-01", "Department.Id": "d1", "DishDiscountSumInt": Decimal("100.10"), "DishAmountInt": 2},
+        {"OpenDate.Typed": "2026-07-01", "Department.Id": "d2", "DishDiscountSumInt": Decimal("50.005"), "DishAmountInt": 1},
+        {"OpenDate.Typed": "2026-07-02", "Department.Id": "d1", "DishDiscountSumInt": "0.1", "DishAmountInt": Decimal("1.5")},
+    ]
+}
+
+
+def _frame() -> OlapFrame:
+    return OlapFrame.from_payload(PAYLOAD, BODY, scales={"DishAmountInt": 3})
+
+
+def test_from_payload_encodes_columns() -> None:
+    frame = _frame()
+    assert len(frame) == 3
+    assert frame.dimensions == ["OpenDate.Typed", "Department.Id"]
+    assert frame.dimension("Department.Id").categories == ["d1", "d2"]
+    assert list(frame.dimension("Department.Id").codes) == [0, 1, 0]
+    # HALF_UP до копеек, количество — до 0.001
+    assert list(frame.measure("DishDiscountSumInt")) == [10010, 5001, 10]
+    assert list(frame.measure("DishAmountInt")) == [2000, 1000, 1500]
+
+
+def test_sum_is_exact_decimal() -> None:
+    frame = _frame()
+    assert frame.sum("DishDiscountSumInt") == Decimal("150.21")
+    assert frame.sum("DishAmountInt") == Decimal("4.5")
+
+
+def test_filter_by_value_and_set() -> None:
+    frame = _frame()
+    assert frame.filter(**{"Department.Id": "d1"}).sum("DishDiscountSumInt") == Decimal("100.20")
+    assert len(frame.filter(**{"Department.Id": {"d2", "unknown"}})) == 1
+    assert len(frame.filter(**{"Department.Id": "unknown"})) == 0
+
+
+def test_group_by_sums_measures() -> None:
+    grouped = _frame().group_by("Department.Id")
+    rows = {row["Department.Id"]: row["DishDiscountSumInt"] for row in grouped.to_rows()}
+    assert rows == {"d1": Decimal("100.20"), "d2": Decimal("50.01")}
+    total = _frame().group_by()
+    assert len(total) == 1 and total.sum("DishAmountInt") == Decimal("4.5")
+
+
+def test_bad_measure_value_reports_field() -> None:
+    payload = {"data": [{"OpenDate.Typed": "2026-07-01", "Department.Id": "d1", "DishDiscountSumInt": "abc"}]}
+    with pytest.raises(ValueError, match="DishDiscountSumInt"):
+        OlapFrame.from_payload(payload, BODY)
+
+
+def test_to_numpy_without_row_objects() -> None:
+    np = pytest.importorskip("numpy")
+    arrays = _frame().to_numpy()
+    assert arrays["DishDiscountSumInt"].dtype == np.int64
+    assert arrays["DishDiscountSumInt"].tolist() == [10010, 5001, 10]
+    assert arrays["Department.Id"].tolist() == [0, 1, 0]
+
+
+def test_to_pandas_with_missing_dimension_value() -> None:
+    pd = pytest.importorskip("pandas")
+    payload = {"data": [
+        {"OpenDate.Typed": "2026-07-01", "Department.Id": "d1", "DishDiscountSumInt": 1, "DishAmountInt": 1},
+        {"OpenDate.Typed": "2026-07-01", "Department.Id": None, "DishDiscountSumInt": 2, "DishAmountInt": 1},
+        {"OpenDate.Typed": "2026-07-02", "Department.Id": "d2", "DishDiscountSumInt": 3, "DishAmountInt": 1},
+    ]}
+    df = OlapFrame.from_payload(payload, BODY).to_pandas()
+    assert list(df["Department.Id"].cat.categories) == ["d1", "d2"]
+    assert df["Department.Id"].tolist()[0] == "d1"
+    assert pd.isna(df["Department.Id"].tolist()[1])
+    assert df["Department.Id"].tolist()[2] == "d2"
+    assert df["DishDiscountSumInt"].tolist() == [100, 200, 300]
+
+
+@pytest.mark.parametrize("path", ["numpy", "numpy-lexsort", "python"])
+def test_filter_and_group_by_paths_agree(path: str, monkeypatch) -> None:
+    if path == "python":
+        monkeypatch.setattr(frame_module, "_numpy", lambda: None)
+    else:
+        pytest.importorskip("numpy")
+    if path == "numpy-lexsort":
+        monkeypatch.setattr(frame_module, "_MAX_GROUP_KEY", 0)
+    rows = [
+        {"OpenDate.Typed": f"2026-07-0{1 + i % 3}", "Department.Id": f"d{i % 4}", "DishDiscountSumInt": i, "DishAmountInt": 1}
+        for i in range(40)
+    ]
+    frame = OlapFrame.from_payload({"data": rows}, BODY)
+
+    filtered = frame.filter(**{"Department.Id": {"d3", "d1", "missing"}, "OpenDate.Typed": "2026-07-02"})
+    assert [row["DishDiscountSumInt"] for row in filtered.to_rows()] == [
+        Decimal(i) for i in range(40) if i % 4 in (1, 3) and i % 3 == 1
+    ]
+    grouped = frame.group_by("Department.Id", "OpenDate.Typed")
+    # Группы — в порядке первого появления, суммы точные
+    assert [(row["Department.Id"], row["OpenDate.Typed"]) for row in grouped.to_rows()][:3] == [
+        ("d0", "2026-07-01"), ("d1", "2026-07-02"), ("d2", "2026-07-03"),
+    ]
+    assert grouped.sum("DishDiscountSumInt") == Decimal(sum(range(40)))
+    assert len(grouped) == 12
+    assert frame.group_by().sum("DishAmountInt") == Decimal(40)
+    assert len(frame.filter(**{"Department.Id": "missing"})) == 0
+
+
+def test_query_olap_frame() -> None:
+    client = MagicMock()
+    response = MagicMock()
+    response.json.return_value = PAYLOAD
+    client.post.return_value = response
+    frame = OLAP(client).query_olap_frame(BODY)
+    assert isinstance(frame, OlapFrame)
+    assert frame.sum("DishDiscountSumInt") == Decimal("150.21")
@@ -0,0 +1,72 @@
+"""Concurrent OLAP batch: input order, per-query timeouts, partial failure and stats."""
+
+from __future__ import annotations
+
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP
+
+
+def _bodies(count: int) -> list[dict]:
+    return [{"reportType": "SALES", "groupByRowFields": [f"Field{i}"]} for i in range(count)]
+
+
+def _olap(fail: set[int] | None = None) -> OLAP:
+    client = MagicMock()
+    client.json_backend = None
+    lock = threading.Lock()
+    client.calls = []
+
+    def post(endpoint: str, *, json: dict, timeout=None):  # noqa: A002
+        index = int(json["groupByRowFields"][0].removeprefix("Field"))
+        with lock:
+            client.calls.append((index, timeout))
+        if fail and index in fail:
+            raise RuntimeError(f"boom {index}")
+        response = MagicMock()
+        response.json.return_value = {"data": [{"index": index}]}
+        response.content = b"{}"
+        return response
+
+    client.post.side_effect = post
+    return OLAP(client)
+
+
+def test_query_olap_many_keeps_input_order_and_passes_timeouts() -> None:
+    olap = _olap()
+    result = olap.query_olap_many(_bodies(12), timeout=[float(i) for i in range(12)], max_workers=4)
+    assert [payload["data"][0]["index"] for payload in result.results] == list(range(12))
+    assert sorted(olap.client.calls) == [(i, float(i)) for i in range(12)]
+    assert result.stats.succeeded == 12
+    assert result.stats.failed == 0
+    assert result.stats.max_time <= result.stats.total_time
+
+
+def test_query_olap_many_collects_errors_without_stopping() -> None:
+    olap = _olap(fail={3, 7})
+    result = olap.query_olap_many(_bodies(10), timeout=5)
+    assert set(result.errors) == {3, 7}
+    assert result.results[3] is None
+    assert result.results[4] == {"data": [{"index": 4}]}
+    assert result.stats.failed == 2
+    assert {timeout for _, timeout in olap.client.calls} == {5}
+
+
+def test_query_olap_many_default_timeout_and_validation() -> None:
+    olap = _olap()
+    olap.query_olap_many(_bodies(2))
+    assert {timeout for _, timeout in olap.client.calls} == {None}
+    with pytest.raises(ValueError, match="таймаутов"):
+        olap.query_olap_many(_bodies(3), timeout=[1, 2])
+
+
+def test_iter_olap_many_yields_outcomes_with_bodies() -> None:
+    olap = _olap()
+    bodies = _bodies(5)
+    outcomes = list(olap.iter_olap_many(bodies, timeout=(1, 30)))
+    assert sorted(outcome.index for outcome in outcomes) == list(range(5))
+    assert all(outcome.item is bodies[outcome.index] for outcome in outcomes)
+    assert {timeout for _, timeout in olap.client.calls} == {(1, 30)}
@@ -0,0 +1,49 @@
+"""Batch money column parsing: same HALF_UP rounding and errors as the per-value parser."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+import pytest
+
+from iiko_api.endpoints.olap import _parse_money_decimal
+from iiko_api.olap.money import parse_money_column
+from iiko_api.olap.stream import RawNumber
+
+VALUES = [
+    Decimal("100.10"), Decimal("50.005"), Decimal("-50.005"), Decimal("1E+2"), Decimal("1E-30"),
+    "0.1", "-0.005", "0.004999", ".5", "-.5", "5.", " 1 234,565 ", "1e3", "", None,
+    RawNumber("12.345"), 7, -3, 0.1, 2.675, -2.675,
+]
+
+
+def test_matches_per_value_parser() -> None:
+    expected = [int(_parse_money_decimal(value, field="DishSumInt").scaleb(2)) for value in VALUES]
+    column = parse_money_column(VALUES, field="DishSumInt")
+    assert column.typecode == "q"
+    assert list(column) == expected
+
+
+def test_custom_scale() -> None:
+    assert list(parse_money_column(["1.2345", Decimal("-1.2345"), 2], field="DishAmountInt", scale=3)) == [
+        1235, -1235, 2000,
+    ]
+
+
+@pytest.mark.parametrize("value", ["abc", ".", "-", True, float("inf"), Decimal("NaN"), [1]])
+def test_invalid_values_raise_like_per_value_parser(value: object) -> None:
+    with pytest.raises(ValueError, match="Некорректное значение DishSumInt"):
+        parse_money_column([Decimal("1.00"), value], field="DishSumInt")
+
+
+@pytest.mark.parametrize("value", [2**62, -(2**62), "99999999999999999999", Decimal("1e30"), 1e20])
+def test_out_of_int64_range_raises_value_error(value: object) -> None:
+    with pytest.raises(ValueError, match="DishSumInt.*вне диапазона int64"):
+        parse_money_column([1, value], field="DishSumInt")
+
+
+def test_as_numpy() -> None:
+    np = pytest.importorskip("numpy")
+    result = parse_money_column(["1.005", 2], field="DishSumInt", as_numpy=True)
+    assert result.dtype == np.int64
+    assert result.tolist() == [101, 200]
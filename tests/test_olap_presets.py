@@ -0,0 +1,113 @@
+"""Multi-period preset runner: calendar splitting, partial failure and checkpoint resume."""
+
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP
+from iiko_api.olap.presets import PresetCheckpoint, split_periods
+
+PRESET_ID = "3f2504e0-4f89-11d3-9a0c-0305e82c3301"
+
+
+def test_split_periods_by_month_week_and_days() -> None:
+    assert split_periods(date(2026, 1, 15), date(2026, 3, 10)) == [
+        (date(2026, 1, 15), date(2026, 2, 1)),
+        (date(2026, 2, 1), date(2026, 3, 1)),
+        (date(2026, 3, 1), date(2026, 3, 10)),
+    ]
+    # 2026-01-07 — среда, недели начинаются с понедельника
+    assert split_periods(date(2026, 1, 7), date(2026, 1, 20), "week") == [
+        (date(2026, 1, 7), date(2026, 1, 12)),
+        (date(2026, 1, 12), date(2026, 1, 19)),
+        (date(2026, 1, 19), date(2026, 1, 20)),
+    ]
+    assert len(split_periods(date(2025, 12, 30), date(2026, 1, 2), "day")) == 3
+    assert split_periods(date(2026, 1, 1), date(2026, 1, 8), 5)[-1] == (date(2026, 1, 6), date(2026, 1, 8))
+    with pytest.raises(ValueError, match="гранулярность"):
+        split_periods(date(2026, 1, 1), date(2026, 2, 1), "year")
+    with pytest.raises(ValueError, match="date_from"):
+        split_periods(date(2026, 1, 1), date(2026, 1, 1))
+
+
+def _olap(fail_months: set[int]) -> tuple[OLAP, list[date]]:
+    olap = OLAP(MagicMock())
+    calls: list[date] = []
+
+    def fake_preset(preset_id: str, date_from: date, date_to: date) -> dict:
+        calls.append(date_from)
+        if date_from.month in fail_months:
+            raise TimeoutError(f"timeout {date_from}")
+        return {"data": [{"Month": date_from.isoformat(), "DishSumInt": Decimal(f"{date_from.month}.10")}]}
+
+    olap.get_olap_by_preset_id = fake_preset  # type: ignore[method-assign]
+    return olap, calls
+
+
+def test_partial_failure_and_resume_from_checkpoint(tmp_path) -> None:
+    checkpoint = tmp_path / "preset.json"
+    olap, calls = _olap(fail_months={3})
+    results = olap.get_olap_by_preset_periods(
+        PRESET_ID, date_from=date(2026, 1, 1), date_to=date(2026, 5, 1), max_workers=2, checkpoint=checkpoint
+    )
+    assert [r.date_from.month for r in results] == [1, 2, 3, 4]
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert isinstance(results[2].error, TimeoutError)
+    assert results[3].payload["data"][0]["DishSumInt"] == Decimal("4.10")
+    header, *entries = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert header == {"presetId": PRESET_ID}
+    assert {entry["period"] for entry in entries} == {
+        "2026-01-01/2026-02-01", "2026-02-01/2026-03-01", "2026-04-01/2026-05-01",
+    }
+
+    retry, retry_calls = _olap(fail_months=set())
+    results = retry.get_olap_by_preset_periods(
+        PRESET_ID, date_from=date(2026, 1, 1), date_to=date(2026, 5, 1), checkpoint=checkpoint
+    )
+    assert retry_calls == [date(2026, 3, 1)]
+    assert all(r.ok for r in results)
+    assert [r.from_checkpoint for r in results] == [True, True, False, True]
+    assert results[0].payload["data"][0]["DishSumInt"] == Decimal("1.10")
+
+
+def test_checkpoint_appends_periods_and_drops_torn_tail(tmp_path) -> None:
+    path = tmp_path / "preset.ndjson"
+    store = PresetCheckpoint(path, PRESET_ID)
+    days = [(date(2026, 1, 1) + timedelta(days=n), date(2026, 1, 2) + timedelta(days=n)) for n in range(30)]
+    sizes = []
+    for period in days:
+        store.save(period, {"data": [{"DishSumInt": Decimal("1.10")}]})
+        sizes.append(path.stat().st_size)
+    # Каждый период дописывается строкой одного размера, файл не переписывается целиком
+    assert len({after - before for before, after in zip(sizes, sizes[1:], strict=False)}) == 1
+
+    # Процесс упал посреди записи периода
+    with open(path, "a", encoding="utf-8") as file:
+        file.write('{"period": "2026-02-01/2026-02-02", "payl')
+    reloaded = PresetCheckpoint(path, PRESET_ID)
+    assert len(reloaded.periods) == 30
+    assert reloaded.get(days[0]) == {"data": [{"DishSumInt": Decimal("1.10")}]}
+    assert len(path.read_text().splitlines()) == 31
+
+
+def test_checkpoint_of_other_preset_is_rejected(tmp_path) -> None:
+    checkpoint = tmp_path / "preset.json"
+    checkpoint.write_text(json.dumps({"presetId": "other", "periods": {}}))
+    olap, _ = _olap(set())
+    with pytest.raises(ValueError, match="Контрольная точка"):
+        olap.get_olap_by_preset_periods(PRESET_ID, [(date(2026, 1, 1), date(2026, 2, 1))], checkpoint=checkpoint)
+
+
+def test_fail_fast_and_argument_validation() -> None:
+    olap, _ = _olap(fail_months={1})
+    with pytest.raises(TimeoutError):
+        olap.get_olap_by_preset_periods(PRESET_ID, [(date(2026, 1, 1), date(2026, 2, 1))], fail_fast=True)
+    with pytest.raises(ValueError, match="periods"):
+        olap.get_olap_by_preset_periods(PRESET_ID)
+    with pytest.raises(ValueError, match="UUID"):
+        olap.get_olap_by_preset_periods("bad", date_from=date(2026, 1, 1), date_to=date(2026, 2, 1))
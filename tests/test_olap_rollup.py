@@ -0,0 +1,130 @@
+"""Local roll-up of a fine-grained OLAP result into coarser group-by/filter combinations."""
+
+from __future__ import annotations
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from iiko_api.olap.frame import OlapFrame
+from iiko_api.olap.rollup import OlapRollup
+
+BASE_BODY = {
+    "reportType": "SALES",
+    "groupByRowFields": ["OpenDate.Typed", "Department", "DishGroup"],
+    "aggregateFields": ["DishDiscountSumInt", "DishAmountInt"],
+    "filters": {
+        "OpenDate.Typed": {
+            "filterType": "DateRange", "periodType": "CUSTOM",
+            "from": "2026-07-01T00:00:00.000", "to": "2026-07-15T00:00:00.000",
+            "includeLow": True, "includeHigh": False,
+        },
+        "PayTypes.IsPrintCheque": {"filterType": "IncludeValues", "values": ["FISCAL"]},
+    },
+}
+ROWS = [
+    {"OpenDate.Typed": f"2026-07-{day:02d}", "Department": department, "DishGroup": group,
+     "DishDiscountSumInt": Decimal(f"{day}.{amount}5"), "DishAmountInt": amount}
+    for day in (1, 2, 8, 9)
+    for department in ("Кафе", "Бар")
+    for group, amount in (("Кухня", 1), ("Напитки", 2))
+]
+
+
+def _rollup() -> OlapRollup:
+    frame = OlapFrame.from_rows(ROWS, BASE_BODY["groupByRowFields"], BASE_BODY["aggregateFields"])
+    return OlapRollup(frame, BASE_BODY)
+
+
+def _body(group_by: list[str], **filters: dict) -> dict:
+    return {
+        "reportType": "SALES",
+        "groupByRowFields": group_by,
+        "aggregateFields": ["DishDiscountSumInt"],
+        "filters": {**BASE_BODY["filters"], **filters},
+    }
+
+
+def _expected(key: str, predicate=lambda row: True) -> dict:
+    totals: dict = {}
+    for row in ROWS:
+        if predicate(row):
+            quantized = row["DishDiscountSumInt"].quantize(Decimal("0.01"), rounding="ROUND_HALF_UP")
+            totals[row[key]] = totals.get(row[key], Decimal(0)) + quantized
+    return totals
+
+
+def test_coarser_group_by_matches_manual_sum(numpy_mode: str) -> None:
+    payload = _rollup().query_olap(_body(["Department"]))
+    assert {row["Department"]: row["DishDiscountSumInt"] for row in payload["data"]} == _expected("Department")
+    assert list(payload["data"][0]) == ["Department", "DishDiscountSumInt"]
+
+
+def test_filters_on_dimensions_and_narrower_date_range(numpy_mode: str) -> None:
+    body = _body(
+        ["DishGroup"],
+        **{
+            "Department": {"filterType": "ExcludeValues", "values": ["Бар"]},
+            "OpenDate.Typed": {
+                "filterType": "DateRange", "periodType": "CUSTOM",
+                "from": "2026-07-01T00:00:00.000", "to": "2026-07-08T00:00:00.000",
+                "includeLow": True, "includeHigh": False,
+            },
+        },
+    )
+    rows = _rollup().query_olap(body)["data"]
+    expected = _expected("DishGroup", lambda r: r["Department"] == "Кафе" and r["OpenDate.Typed"] < "2026-07-08")
+    assert {row["DishGroup"]: row["DishDiscountSumInt"] for row in rows} == expected
+
+
+def test_sums_stay_exact_and_empty_selection(numpy_mode: str) -> None:
+    # Суммы выше 2^53 не должны проходить через float64
+    rows = [{"Department": "Кафе", "DishSumInt": Decimal("45035996273704.97")} for _ in range(3)]
+    rollup = OlapRollup(OlapFrame.from_rows(rows, ["Department"], ["DishSumInt"]))
+    body = {"groupByRowFields": ["Department"], "aggregateFields": ["DishSumInt"]}
+    assert rollup.query_olap(body)["data"] == [{"Department": "Кафе", "DishSumInt": Decimal("135107988821114.91")}]
+
+    body["filters"] = {"Department": {"filterType": "IncludeValues", "values": ["Бар"]}}
+    assert rollup.query_olap(body)["data"] == []
+
+
+def test_derived_week_dimension() -> None:
+    rollup = _rollup()
+    rollup.derive("Week", "OpenDate.Typed", lambda value: date.fromisoformat(value).isocalendar()[1])
+    frame = rollup.query_frame(_body(["Week"]))
+    assert frame.dimension("Week").categories == [27, 28]
+    assert frame.sum("DishDiscountSumInt") == sum(_expected("Department").values())
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        _body(["Waiter"]),
+        {**_body(["Department"]), "aggregateFields": ["ProductCostBase.Percent"]},
+        {**_body(["Department"]), "filters": {"OpenDate.Typed": BASE_BODY["filters"]["OpenDate.Typed"]}},
+        _body(["Department"], **{"OrderType": {"filterType": "IncludeValues", "values": ["Доставка"]}}),
+        _body(["Department"], **{"OpenDate.Typed": {
+            "filterType": "DateRange", "from": "2026-06-01T00:00:00.000", "to": "2026-07-02T00:00:00.000",
+        }}),
+    ],
+)
+def test_cannot_answer_broader_or_unknown_queries(body: dict) -> None:
+    rollup = _rollup()
+    assert not rollup.can_answer(body)
+    with pytest.raises(ValueError, match="детальному результату"):
+        rollup.query_frame(body)
+
+
+def test_rejects_non_additive_measures() -> None:
+    frame = OlapFrame.from_rows([{"Department": "Кафе", "DishDiscountSumInt.average": 1}], ["Department"], ["DishDiscountSumInt.average"])
+    with pytest.raises(ValueError, match="Неаддитивные"):
+        OlapRollup(frame)
+
+
+def test_group_index_is_reused() -> None:
+    rollup = _rollup()
+    rollup.query_frame(_body(["Department"]))
+    index = rollup._group_index[("Department",)]
+    rollup.query_frame(_body(["Department"], **{"DishGroup": {"filterType": "IncludeValues", "values": ["Кухня"]}}))
+    assert rollup._group_index[("Department",)] is index
@@ -0,0 +1,170 @@
+"""Splitting OLAP DateRange filters into windows and merging additive results."""
+
+from __future__ import annotations
+
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.core.concurrency import run_concurrently
+from iiko_api.endpoints.olap import OLAP, build_fiscal_sales_olap_body
+from iiko_api.olap.split import (
+    check_additive,
+    day_bounds,
+    find_date_range_filter,
+    is_additive_field,
+    merge_olap_payloads,
+    split_olap_body,
+)
+
+
+def _body() -> dict:
+    return build_fiscal_sales_olap_body(date(2026, 1, 1), date(2026, 1, 10), "dep-1")
+
+
+def test_split_windows_cover_period_without_overlap() -> None:
+    bodies = split_olap_body(_body(), 4)
+    ranges = [
+        (b["filters"]["OpenDate.Typed"]["from"], b["filters"]["OpenDate.Typed"]["to"],
+         b["filters"]["OpenDate.Typed"]["includeHigh"])
+        for b in bodies
+    ]
+    assert ranges == [
+        ("2026-01-01T00:00:00.000", "2026-01-05T00:00:00.000", False),
+        ("2026-01-05T00:00:00.000", "2026-01-09T00:00:00.000", False),
+        ("2026-01-09T00:00:00.000", "2026-01-11T00:00:00.000", False),
+    ]
+    assert all(b["filters"]["OpenDate.Typed"]["includeLow"] for b in bodies)
+    # Остальные фильтры не меняются, исходное тело не мутируется
+    assert bodies[0]["filters"]["Department.Id"] == {"filterType": "IncludeValues", "values": ["dep-1"]}
+    assert _body()["filters"]["OpenDate.Typed"]["to"] == "2026-01-11T00:00:00.000"
+
+
+def test_split_keeps_outer_include_flags() -> None:
+    body = _body()
+    body["filters"]["OpenDate.Typed"].update(includeLow=False, includeHigh=True)
+    bodies = split_olap_body(body, 5)
+    assert bodies[0]["filters"]["OpenDate.Typed"]["includeLow"] is False
+    assert bodies[-1]["filters"]["OpenDate.Typed"]["includeHigh"] is True
+    assert bodies[1]["filters"]["OpenDate.Typed"]["includeLow"] is True
+
+
+def test_split_rejects_invalid_bodies() -> None:
+    with pytest.raises(ValueError, match="window_days"):
+        split_olap_body(_body(), 0)
+    with pytest.raises(ValueError, match="DateRange"):
+        split_olap_body({"filters": {}}, 5)
+    body = _body()
+    body["buildSummary"] = True
+    with pytest.raises(ValueError, match="buildSummary"):
+        split_olap_body(body, 5)
+
+
+@pytest.mark.parametrize(
+    ("name", "additive"),
+    [
+        ("DishDiscountSumInt", True),
+        ("DishAmountInt", True),
+        ("DishDiscountSumInt.average", False),
+        ("ProductCostBase.Percent", False),
+        ("ProductCostBase.MarkUp", False),
+        ("UniqOrderId.OrdersCount", True),
+    ],
+)
+def test_is_additive_field(name: str, additive: bool) -> None:
+    assert is_additive_field(name) is additive
+
+
+def test_check_additive_allows_override() -> None:
+    body = {"aggregateFields": ["DishSumInt", "DishDiscountSumInt.average"]}
+    with pytest.raises(ValueError, match="DishDiscountSumInt.average"):
+        check_additive(body)
+    check_additive(body, additive_fields=["DishDiscountSumInt.average"])
+
+
+def test_merge_sums_measures_by_key() -> None:
+    body = {"groupByRowFields": ["Department.Id"], "aggregateFields": ["DishDiscountSumInt", "DishAmountInt"]}
+    merged = merge_olap_payloads(
+        [
+            {"data": [{"Department.Id": "d1", "DishDiscountSumInt": Decimal("10.10"), "DishAmountInt": 1}]},
+            {"data": [
+                {"Department.Id": "d1", "DishDiscountSumInt": Decimal("0.20"), "DishAmountInt": 2},
+                {"Department.Id": "d2", "DishDiscountSumInt": None, "DishAmountInt": 3},
+            ]},
+        ],
+        body,
+    )
+    assert merged == {
+        "data": [
+            {"Department.Id": "d1", "DishDiscountSumInt": Decimal("10.30"), "DishAmountInt": 3},
+            {"Department.Id": "d2", "DishDiscountSumInt": None, "DishAmountInt": 3},
+        ]
+    }
+
+
+def test_query_olap_split_runs_windows_and_merges() -> None:
+    client = MagicMock()
+    olap = OLAP(client)
+    seen: list[str] = []
+
+    def fake_query(body: dict) -> dict:
+        start = body["filters"]["OpenDate.Typed"]["from"]
+        seen.append(start)
+        return {"data": [{"OpenDate.Typed": start[:10], "DishDiscountSumInt": Decimal("1.50")}]}
+
+    olap.query_olap = fake_query  # type: ignore[method-assign]
+    payload = olap.query_olap_split(_body(), 4, max_workers=2)
+    assert sorted(seen) == ["2026-01-01T00:00:00.000", "2026-01-05T00:00:00.000", "2026-01-09T00:00:00.000"]
+    assert [row["OpenDate.Typed"] for row in payload["data"]] == ["2026-01-01", "2026-01-05", "2026-01-09"]
+
+
+def test_query_olap_split_rejects_non_additive() -> None:
+    body = _body()
+    body["aggregateFields"] = ["DishDiscountSumInt.average"]
+    with pytest.raises(ValueError, match="Неаддитивные"):
+        OLAP(MagicMock()).query_olap_split(body, 4)
+
+
+def test_fiscal_sales_by_day_with_windows() -> None:
+    olap = OLAP(MagicMock())
+    olap.query_olap = lambda body: {  # type: ignore[method-assign]
+        "data": [{"OpenDate.Typed": body["filters"]["OpenDate.Typed"]["from"][:10], "DishDiscountSumInt": "5.005"}]
+    }
+    sales = olap.get_fiscal_sales_by_day(date(2026, 1, 1), date(2026, 1, 3), "dep-1", window_days=1)
+    assert sales == {date(2026, 1, d): Decimal("5.01") for d in (1, 2, 3)}
+
+
+def test_run_concurrently_limits_workers_and_collects_errors() -> None:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def task(item: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        try:
+            if item == 3:
+                raise RuntimeError("boom")
+            return item * 2
+        finally:
+            with lock:
+                active -= 1
+
+    outcomes = sorted(run_concurrently(task, range(6), max_workers=2), key=lambda o: o.index)
+    assert peak <= 2
+    assert [o.result for o in outcomes if o.ok] == [0, 2, 4, 8, 10]
+    assert isinstance(outcomes[3].error, RuntimeError)
+    with pytest.raises(RuntimeError, match="boom"):
+        list(run_concurrently(task, range(6), max_workers=2, fail_fast=True))
+
+
+def test_day_bounds_of_date_range_filter() -> None:
+    _, date_filter = find_date_range_filter(_body())
+    assert day_bounds(date_filter) == (date(2026, 1, 1), date(2026, 1, 10))
+    assert day_bounds({**date_filter, "includeLow": False, "includeHigh": True}) == (date(2026, 1, 2), date(2026, 1, 11))
+    assert day_bounds({**date_filter, "to": "2026-01-11T12:00:00.000"}) is None
@@ -0,0 +1,100 @@
+"""Streaming OLAP rows: incremental decoding of the data array and lazy Decimal parsing."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api.endpoints.olap import OLAP
+from iiko_api.olap.stream import OlapRow, RawNumber, iter_json_array, iter_olap_rows
+
+BODY = (
+    '{"summary": {"total": 1.5, "nested": [1, {"a": "]"}]}, '
+    '"data": [{"OpenDate.Typed": "2026-07-01", "Department": "Кафе \\"Центр\\"", "DishDiscountSumInt": 100.005, '
+    '"DishAmountInt": 3}, {"OpenDate.Typed": "2026-07-02", "Department": "Бар", "DishDiscountSumInt": 0.1, '
+    '"DishAmountInt": null}], "tail": true}'
+).encode()
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 64, 10_000])
+def test_rows_are_identical_for_any_chunking(size: int) -> None:
+    rows = [row.to_dict() for row in iter_olap_rows(_chunks(BODY, size))]
+    assert rows == json.loads(BODY, parse_float=Decimal)["data"]
+
+
+def test_row_parses_numbers_on_access() -> None:
+    row = next(iter_olap_rows([BODY]))
+    assert type(row.raw("DishDiscountSumInt")) is RawNumber
+    assert row["DishDiscountSumInt"] == Decimal("100.005")
+    assert row.money("DishDiscountSumInt") == Decimal("100.01")
+    assert row.day() == date(2026, 7, 1)
+    assert row["DishAmountInt"] == 3
+    assert isinstance(row, OlapRow) and "Department" in row and len(row) == 4
+
+
+def test_other_keys_and_empty_data() -> None:
+    assert list(iter_json_array([b'{"data": [], "x": 1}'])) == []
+    assert list(iter_json_array([b'{}'])) == []
+    assert list(iter_json_array([b'{"other": [1, 2]}'])) == []
+
+
+@pytest.mark.parametrize("body", [b'{"data": [{"a": 1}', b'[1, 2]', b'{"data": [{"a": 1} {"b": 2}]}'])
+def test_invalid_json_raises_value_error(body: bytes) -> None:
+    with pytest.raises(ValueError, match="JSON"):
+        list(iter_olap_rows(_chunks(body, 4)))
+
+
+def test_olap_iter_rows_streams_and_closes_response() -> None:
+    client = MagicMock()
+    response = MagicMock()
+    response.encoding = "utf-8"
+    response.iter_content.return_value = iter(_chunks(BODY, 16))
+    client.post.return_value = response
+    rows = OLAP(client).iter_olap_rows({"reportType": "SALES"}, chunk_size=16)
+    assert [row.money("DishDiscountSumInt") for row in rows] == [Decimal("100.01"), Decimal("0.10")]
+    assert client.post.call_args.kwargs["stream"] is True
+    response.iter_content.assert_called_once_with(16)
+    response.close.assert_called_once()
+    with pytest.raises(ValueError, match="body"):
+        OLAP(client).iter_olap_rows({})
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 64])
+def test_skipped_values_with_escapes_and_brackets(size: int) -> None:
+    body = (
+        b'{"summary": {"s": "a\\\\\\"]}[{", "n": [[], {}, "\\\\"], "e": "x\\\\"}, "count": 2, '
+        b'"flag": null, "data": [{"a": 1}]}'
+    )
+    assert json.loads(body)["summary"]["s"] == 'a\\"]}[{'
+    assert list(iter_json_array(_chunks(body, size))) == [{"a": 1}]
+
+
+def test_large_values_are_not_redecoded_per_chunk(monkeypatch) -> None:
+    import iiko_api.olap.stream as stream
+
+    calls = []
+    decoder = stream._DECODER
+
+    class CountingDecoder:
+        def raw_decode(self, text, pos):
+            calls.append(pos)
+            return decoder.raw_decode(text, pos)
+
+    monkeypatch.setattr(stream, "_DECODER", CountingDecoder())
+    summary = {f"k{i}": [i, {"v": "x" * 20}] for i in range(2000)}
+    row = {f"f{i}": i for i in range(2000)}
+    body = json.dumps({"summary": summary, "data": [row]}).encode()
+    chunks = _chunks(body, 256)
+    assert len(chunks) > 400
+
+    assert list(iter_json_array(chunks)) == [row]
+    # Ключи объекта и один разбор строки с удвоением буфера, а не по разу на каждый блок
+    assert len(calls) < 40
@@ -0,0 +1,94 @@
+"""Bulk price orders: per-department chunking, partial failure and retry of failed chunks."""
+
+from __future__ import annotations
+
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api import IikoAPIError, IikoPriceOrderService
+from iiko_api.models import Item, PriceRecord
+from iiko_api.services.price_order import split_price_items
+
+
+def _items(department: str, count: int) -> list[Item]:
+    return [Item(departmentId=department, productId=f"{department}-p{i}", price=100 + i) for i in range(count)]
+
+
+def _service(fail_departments: set[str]) -> tuple[IikoPriceOrderService, list[dict]]:
+    iiko_api = MagicMock()
+    sent: list[dict] = []
+    lock = threading.Lock()
+
+    def set_new_order(order):
+        payload = json.loads(order.model_dump_json())
+        with lock:
+            sent.append(payload)
+        if payload["items"][0]["departmentId"] in fail_departments:
+            raise IikoAPIError("Ошибка при создании приказа")
+        return {"documentNumber": str(len(sent))}
+
+    iiko_api.orders.set_new_order.side_effect = set_new_order
+    return IikoPriceOrderService(iiko_api), sent
+
+
+def test_split_price_items_groups_by_department_and_bounds_size() -> None:
+    dishes = _items("d1", 5) + _items("d2", 2) + _items("d1", 1)
+    chunks = split_price_items(dishes, "2026-01-01", max_items_per_order=3)
+    assert [(chunk.department_id, len(chunk.items)) for chunk in chunks] == [("d1", 3), ("d1", 3), ("d2", 2)]
+    with pytest.raises(ValueError, match="max_items_per_order"):
+        split_price_items(dishes, "2026-01-01", max_items_per_order=0)
+
+
+def test_set_price_bulk_reports_chunks_and_retries_only_failed() -> None:
+    service, sent = _service(fail_departments={"d2"})
+    dishes = _items("d1", 4) + _items("d2", 3)
+    report = service.set_price_bulk(dishes, "2026-01-01", max_items_per_order=2, short_name="reprice")
+
+    assert len(sent) == 4
+    assert all(payload["dateIncoming"] == "2026-01-01" and payload["shortName"] == "reprice" for payload in sent)
+    assert not report.ok
+    assert [chunk.department_id for chunk in report.failed] == ["d2", "d2"]
+    assert len(report.failed_items) == 3
+    assert all(chunk.response is not None for chunk in report.succeeded)
+
+    service.iiko_api.orders.set_new_order.side_effect = lambda order: {"ok": True}
+    service.retry_failed(report)
+    assert report.ok
+    assert service.iiko_api.orders.set_new_order.call_count == 6
+
+
+def test_set_changed_prices_sends_only_changed_items() -> None:
+    service, sent = _service(fail_departments=set())
+    service.iiko_api.orders.get_price_list.return_value = [
+        PriceRecord(departmentId="d1", productId="d1-p0", price=100.0, including=True, dateFrom="2025-06-01"),
+        # Более ранний приказ перекрыт действующим
+        PriceRecord(departmentId="d1", productId="d1-p1", price=101, dateFrom="2025-01-01", dateTo="2025-06-01"),
+        PriceRecord(departmentId="d1", productId="d1-p1", price=90, dateFrom="2025-06-01"),
+        PriceRecord(departmentId="d1", productId="d1-p2", price=102, flyerProgram=True, dateFrom="2025-06-01"),
+        PriceRecord(departmentId="d2", productId="d2-p0", price=100, dateFrom="2025-06-01"),
+        # Цена размера не сравнивается с позицией без размера
+        PriceRecord(departmentId="d2", productId="d2-p1", productSizeId="s1", price=101, dateFrom="2025-06-01"),
+    ]
+    dishes = _items("d1", 3) + _items("d2", 2)
+    report = service.set_changed_prices(dishes, "2026-01-01")
+
+    kwargs = service.iiko_api.orders.get_price_list.call_args.kwargs
+    assert kwargs["date_from"] == "2026-01-01"
+    assert kwargs["date_to"] == "2026-01-02"
+    assert kwargs["department_id"] == ["d1", "d2"]
+    assert report.skipped == 2
+    assert [item.productId for item in report.changed] == ["d1-p1", "d1-p2", "d2-p1"]
+    assert report.orders is not None and report.orders.ok
+    assert sorted(row["productId"] for payload in sent for row in payload["items"]) == ["d1-p1", "d1-p2", "d2-p1"]
+
+
+def test_set_changed_prices_without_changes_sends_nothing() -> None:
+    service, sent = _service(fail_departments=set())
+    service.iiko_api.orders.get_price_list.return_value = [
+        PriceRecord(departmentId="d1", productId="d1-p0", price=100, dateFrom="2025-06-01"),
+    ]
+    report = service.set_changed_prices(_items("d1", 1), "2026-01-01")
+    assert (report.skipped, report.changed_count, sent) == (1, 0, [])
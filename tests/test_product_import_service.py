@@ -0,0 +1,79 @@
+"""Bulk product import: matching by num/name, in-batch dedupe, skip unchanged and partial failure."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+from iiko_api import IikoAPIError, IikoProductImportService
+from iiko_api.core.journal import WriteJournal
+from iiko_api.models.models import Product, ProductType
+
+CATALOGUE = [
+    {"id": "p-1", "name": "Борщ", "num": "A-1", "mainUnit": "kg", "type": "DISH", "defaultSalePrice": 300.0},
+    {"id": "p-2", "name": "Морс  клюквенный", "num": None, "mainUnit": "l", "type": "DISH"},
+    {"id": "p-3", "name": "Салат", "num": "A-3", "mainUnit": "kg", "type": "DISH"},
+    {"id": "p-4", "name": "Салат", "num": "A-4", "mainUnit": "kg", "type": "DISH"},
+]
+
+
+def _product(name: str, num: str | None = None, price: int | None = None, unit: str = "kg") -> Product:
+    return Product(name=name, num=num, mainUnit=unit, type=ProductType.DISH, defaultSalePrice=price)
+
+
+def _service() -> IikoProductImportService:
+    iiko_api = MagicMock()
+    iiko_api.nomenclature.get_nomenclature_list.return_value = CATALOGUE
+
+    def import_product(product: Product) -> dict:
+        if product.name == "Ошибка":
+            raise IikoAPIError("Ошибка при импорте продукта")
+        return {"id": f"new-{product.name}"}
+
+    iiko_api.nomenclature.import_product.side_effect = import_product
+    iiko_api.nomenclature.update_product.side_effect = lambda product_id, product: {"id": product_id}
+    return IikoProductImportService(iiko_api)
+
+
+def test_import_products_saves_only_new_and_changed() -> None:
+    service = _service()
+    products = [
+        _product("Борщ", "A-1", 300),            # совпадает с каталогом
+        _product("Борщ новый", "A-1", 320),      # тот же артикул в пакете
+        _product("морс клюквенный", unit="l"),   # найден по названию, название исправлено
+        _product("Солянка", "B-1", 350),         # новый
+        _product("Ошибка", "B-2"),               # ошибка сохранения
+        _product("Салат"),                       # неоднозначное название
+        _product("Салат", "A-3", 200),           # изменился
+    ]
+    summary = service.import_products(products, max_workers=3)
+
+    assert [result.action for result in summary.results] == [
+        "unchanged", "duplicate", "updated", "created", "failed", "failed", "updated",
+    ]
+    assert summary.counts == {"unchanged": 1, "duplicate": 1, "created": 1, "failed": 2, "updated": 2}
+    assert summary.results[0].product_id == "p-1"
+    assert summary.results[3].product_id == "new-Солянка"
+    assert summary.results[2].product_id == "p-2"
+    assert summary.results[6].product_id == "p-3"
+    assert "соответствует 2" in str(summary.results[5].error)
+    service.iiko_api.nomenclature.get_nomenclature_list.assert_called_once()
+    assert service.iiko_api.nomenclature.update_product.call_count == 2
+    assert service.iiko_api.nomenclature.import_product.call_count == 2
+
+
+def test_iter_import_products_without_updates() -> None:
+    service = _service()
+    results = list(service.iter_import_products([_product("Борщ", "A-1", 999)], update_existing=False))
+    assert [(result.action, result.product_id) for result in results] == [("unchanged", "p-1")]
+    service.iiko_api.nomenclature.update_product.assert_not_called()
+
+
+def test_journal_resends_product_changed_on_server_after_confirmed_update() -> None:
+    service = _service()
+    service.journal = WriteJournal(":memory:")
+    products = [_product("Борщ", "A-1", 320)]
+    assert [r.action for r in service.import_products(products).results] == ["updated"]
+
+    # Цену в каталоге вернули к старой после подтвержденного обновления
+    assert [r.action for r in service.import_products(products).results] == ["updated"]
+    assert service.iiko_api.nomenclature.update_product.call_count == 2
@@ -0,0 +1,128 @@
+"""Тесты для компактных записей (as_records=True)."""
+
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from iiko_api.core.json_backend import get_json_backend
+from iiko_api.endpoints.employees import EmployeesEndpoints, RolesEndpoints
+from iiko_api.endpoints.nomenclature import NomenclatureEndpoints
+from iiko_api.endpoints.orders import OrdersEndpoints
+from iiko_api.endpoints.stores import StoresEndpoints
+from iiko_api.models.records import EmployeeRecord, PriceRecord, ProductRecord, to_records
+
+EMPLOYEES_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<employees>
+  <employee>
+    <id>e-1</id>
+    <name>Иванов</name>
+    <departmentCodes>001</departmentCodes>
+    <deleted>false</deleted>
+  </employee>
+  <employee>
+    <id>e-2</id>
+    <name>Петров</name>
+    <departmentCodes>001</departmentCodes>
+    <departmentCodes>002</departmentCodes>
+    <deleted>true</deleted>
+  </employee>
+</employees>
+"""
+
+
+def _response(text: str = "", json_data=None) -> Mock:
+    response = Mock()
+    response.status_code = 200
+    response.text = text
+    response.json.return_value = json_data
+    return response
+
+
+def test_get_employees_as_records(mock_base_client):
+    """XML разбирается сразу в EmployeeRecord, bool и списки нормализуются"""
+    mock_base_client.get.return_value = _response(EMPLOYEES_XML)
+
+    rows = EmployeesEndpoints(mock_base_client).get_employees(as_records=True)
+
+    assert rows == [
+        EmployeeRecord(id="e-1", name="Иванов", departmentCodes=("001",), deleted=False),
+        EmployeeRecord(id="e-2", name="Петров", departmentCodes=("001", "002"), deleted=True),
+    ]
+
+
+def test_get_roles_as_records_empty(mock_base_client):
+    """Пустой список ролей"""
+    mock_base_client.get.return_value = _response("<employeeRoles></employeeRoles>")
+
+    assert RolesEndpoints(mock_base_client).get_roles(as_records=True) == []
+
+
+def test_get_stores_as_records_invalid_xml(mock_base_client):
+    """Невалидный XML в режиме записей"""
+    mock_base_client.get.return_value = _response("<corporateItemDtoes>")
+
+    with pytest.raises(ValueError, match="XML"):
+        StoresEndpoints(mock_base_client).get_stores(as_records=True)
+
+
+def test_get_nomenclature_list_as_records(mock_base_client):
+    """Продукты как ProductRecord, лишние поля отбрасываются"""
+    mock_base_client.get.return_value = _response(json_data=[
+        {"id": "p-1", "name": "Борщ", "num": "00001", "type": "DISH", "deleted": False, "tags": ["x"]},
+    ])
+
+    rows = NomenclatureEndpoints(mock_base_client).get_nomenclature_list(as_records=True)
+
+    assert rows == [ProductRecord(id="p-1", name="Борщ", num="00001", type="DISH", deleted=False)]
+    assert rows[0].name == "Борщ"
+
+
+def test_get_price_list_as_records_unwraps_response(mock_base_client):
+    """Строки цен берутся из поля response"""
+    mock_base_client.get.return_value = _response(json_data={
+        "result": "SUCCESS",
+        "response": [{"departmentId": "d-1", "productId": "p-1", "price": 150, "including": True}],
+    })
+
+    rows = OrdersEndpoints(mock_base_client).get_price_list(date_from="2024-01-01", as_records=True)
+
+    assert rows == [PriceRecord(departmentId="d-1", productId="p-1", price=150, including=True)]
+
+
+def test_records_are_smaller_than_dicts():
+    """Запись без __dict__ занимает меньше памяти, чем dict с теми же полями"""
+    row = {"id": "p-1", "name": "Борщ", "num": "00001", "type": "DISH", "parent": "g-1", "deleted": False}
+    record = to_records(ProductRecord, [row])[0]
+
+    assert not hasattr(record, "__dict__")
+    assert sys.getsizeof(record) < sys.getsizeof(row)
+
+
+def test_to_records_rejects_non_dict():
+    """Неожиданный элемент ответа"""
+    with pytest.raises(ValueError, match="ожидался dict"):
+        to_records(ProductRecord, ["oops"])
+
+
+def test_msgspec_decodes_json_straight_into_records(mock_base_client):
+    """С msgspec JSON декодируется прямо в записи, без промежуточных dict"""
+    pytest.importorskip("msgspec")
+    mock_base_client.json_backend = get_json_backend("msgspec")
+    response = _response()
+    response.content = b'[{"id": "p-1", "name": "\\u0411\\u043e\\u0440\\u0449", "deleted": false, "tags": ["x"]}]'
+    mock_base_client.get.return_value = response
+
+    rows = NomenclatureEndpoints(mock_base_client).get_nomenclature_list(as_records=True)
+
+    assert rows == [ProductRecord(id="p-1", name="Борщ", deleted=False)]
+    response.json.assert_not_called()
+
+    response.content = b'{"result": "SUCCESS", "response": [{"departmentId": "d-1", "productId": "p-1", "price": 150}]}'
+    prices = OrdersEndpoints(mock_base_client).get_price_list(date_from="2024-01-01", as_records=True)
+    assert prices == [PriceRecord(departmentId="d-1", productId="p-1", price=150)]
+
+    response.content = b'[{"name": "no id"}]'
+    with pytest.raises(ValueError, match="невалидный JSON") as exc_info:
+        NomenclatureEndpoints(mock_base_client).get_nomenclature_list(as_records=True)
+    assert "ProductRecord" in str(exc_info.value.__cause__)
@@ -0,0 +1,103 @@
+"""Pre-flight reference validation: one load per reference, precise per-item errors, no doomed requests."""
+
+from __future__ import annotations
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from iiko_api import IikoProductImportService, IikoValidationError
+from iiko_api.endpoints.assembly_charts import AssemblyChartsEndpoints
+from iiko_api.models.models import (
+    AssemblyChart,
+    AssemblyChartItem,
+    Product,
+    ProductSizeAssemblyStrategy,
+    ProductType,
+    ProductWriteoffStrategy,
+    StoreSpecification,
+)
+from iiko_api.services.reference_validator import PRODUCTS, IikoReferenceValidator
+
+
+def _iiko_api() -> MagicMock:
+    iiko_api = MagicMock()
+    iiko_api.references.get_measure_units.return_value = [{"id": "kg"}, {"id": "old", "deleted": True}]
+    iiko_api.references.get_tax_categories.return_value = [{"id": "vat"}]
+    iiko_api.references.get_product_categories.return_value = []
+    iiko_api.nomenclature.get_nomenclature_groups.return_value = [{"id": "g-1"}]
+    iiko_api.nomenclature.get_nomenclature_list.return_value = [{"id": "p-1", "name": "Мука"}]
+    return iiko_api
+
+
+def _product(name: str, unit: str = "kg", **fields) -> Product:
+    return Product(name=name, mainUnit=unit, type=ProductType.GOODS, **fields)
+
+
+def _chart(product_id: str, *ingredients: str) -> AssemblyChart:
+    return AssemblyChart(
+        assembledProductId=product_id,
+        dateFrom="2026-01-01",
+        assembledAmount=1,
+        productWriteoffStrategy=ProductWriteoffStrategy.ASSEMBLE,
+        effectiveDirectWriteoffStoreSpecification=StoreSpecification(),
+        productSizeAssemblyStrategy=ProductSizeAssemblyStrategy.COMMON,
+        items=[AssemblyChartItem(productId=ingredient, amountIn=1) for ingredient in ingredients],
+    )
+
+
+def test_validate_products_reports_each_bad_reference_once_loaded() -> None:
+    iiko_api = _iiko_api()
+    validator = IikoReferenceValidator(iiko_api)
+    products = [
+        _product("ok", taxCategory="vat", parent="g-1"),
+        _product("bad", unit="old", category="c-404"),
+        _product("bad parent", parent="g-404"),
+    ]
+    issues = validator.validate_products(products * 100)
+
+    assert [(issue["index"], issue["field"], issue["value"]) for issue in issues[:3]] == [
+        (1, "mainUnit", "old"),
+        (1, "category", "c-404"),
+        (2, "parent", "g-404"),
+    ]
+    assert len(issues) == 300
+    iiko_api.references.get_measure_units.assert_called_once()
+    iiko_api.nomenclature.get_nomenclature_groups.assert_called_once()
+    with pytest.raises(IikoValidationError, match="и еще 290") as exc_info:
+        validator.check_products(products * 100)
+    assert exc_info.value.errors == issues
+
+
+def test_product_import_rejects_invalid_products_locally() -> None:
+    iiko_api = _iiko_api()
+    iiko_api.nomenclature.import_product.side_effect = lambda product: {"id": f"new-{product.name}"}
+    validator = IikoReferenceValidator(iiko_api)
+    validator.known_ids(PRODUCTS)
+    service = IikoProductImportService(iiko_api, validator=validator)
+
+    summary = service.import_products([_product("Сахар"), _product("Соль", unit="l")])
+
+    assert [result.action for result in summary.results] == ["created", "failed"]
+    assert summary.results[1].error.errors[0]["field"] == "mainUnit"
+    iiko_api.nomenclature.import_product.assert_called_once()
+    # Созданный продукт сразу доступен для проверки техкарт
+    assert validator.validate_assembly_charts([_chart("new-Сахар", "p-1")]) == []
+
+
+def test_save_assembly_charts_skips_charts_with_unknown_products(mock_base_client) -> None:
+    validator = IikoReferenceValidator(_iiko_api())
+    endpoint = AssemblyChartsEndpoints(mock_base_client)
+    endpoint.get_all_assembly_charts = MagicMock(return_value={"assemblyCharts": []})
+    endpoint.save_assembly_chart = MagicMock(return_value={"id": "chart"})
+
+    results = endpoint.save_assembly_charts([_chart("p-1", "p-1"), _chart("p-1", "p-404")], validator=validator)
+
+    assert [result.action for result in results] == ["saved", "failed"]
+    assert results[1].error.errors == [{
+        "index": 1,
+        "field": "items[0].productId",
+        "value": "p-404",
+        "message": "items[0].productId: элемент номенклатуры 'p-404' не найден",
+    }]
+    endpoint.save_assembly_chart.assert_called_once()
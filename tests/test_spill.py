@@ -0,0 +1,125 @@
+"""Spill-to-disk response bodies parsed through mmap."""
+
+from __future__ import annotations
+
+import io
+import json
+import warnings
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+from iiko_api.core.base_client import BaseClient
+from iiko_api.core.json_backend import get_json_backend, response_json
+from iiko_api.core.spill import response_preview, spilled_body, spool_response
+from iiko_api.endpoints.employees import EmployeesEndpoints
+from iiko_api.endpoints.olap import OLAP
+
+BIG_JSON = json.dumps({"data": [{"DishDiscountSumInt": 10.5, "DishName": "Борщ"}] * 500}).encode()
+
+
+def _stream_response(body: bytes, *, content_length: bool = True) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.raw = io.BytesIO(body)
+    response.headers = CaseInsensitiveDict({"Content-Length": str(len(body))} if content_length else {})
+    response.encoding = "utf-8"
+    response.request = MagicMock(url="https://iiko.example/x", method="POST", body=None)
+    return response
+
+
+def test_small_body_stays_in_memory() -> None:
+    response = _stream_response(b'{"data": []}')
+    spool_response(response, threshold=1024)
+    assert spilled_body(response) is None
+    assert response.json() == {"data": []}
+
+
+def test_small_body_without_content_length_stays_in_memory() -> None:
+    response = _stream_response(b'{"data": []}', content_length=False)
+    spool_response(response, threshold=1024, chunk_size=4)
+    assert spilled_body(response) is None
+    assert response.json() == {"data": []}
+
+
+@pytest.mark.filterwarnings("ignore:JSON backend:RuntimeWarning")
+@pytest.mark.parametrize("backend", ["json", "auto"])
+def test_large_body_is_spilled_and_parsed_from_mmap(backend: str, tmp_path) -> None:
+    response = _stream_response(BIG_JSON, content_length=False)
+    spool_response(response, threshold=1024, directory=str(tmp_path), chunk_size=700)
+
+    body = spilled_body(response)
+    assert body is not None and body.size == len(BIG_JSON)
+    payload = response_json(response, get_json_backend(backend), decimal=True)
+    assert len(payload["data"]) == 500
+    assert payload["data"][0]["DishDiscountSumInt"] == Decimal("10.5")
+    assert response_preview(response, 10) == BIG_JSON[:10].decode()
+
+
+def test_copying_backend_warns_on_spilled_body(tmp_path) -> None:
+    response = _stream_response(BIG_JSON)
+    spool_response(response, threshold=1024, directory=str(tmp_path))
+
+    with pytest.warns(RuntimeWarning, match="spill_threshold"):
+        assert len(response_json(response, get_json_backend("json"))["data"]) == 500
+
+
+def test_zero_copy_backend_does_not_warn(tmp_path) -> None:
+    pytest.importorskip("msgspec")
+    response = _stream_response(BIG_JSON)
+    spool_response(response, threshold=1024, directory=str(tmp_path))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        payload = response_json(response, get_json_backend("msgspec"), decimal=True)
+    assert payload["data"][0]["DishDiscountSumInt"] == Decimal("10.5")
+
+
+@pytest.mark.filterwarnings("ignore:JSON backend:RuntimeWarning")
+def test_spilled_invalid_json_reports_prefix_only() -> None:
+    client = MagicMock()
+    client.json_backend = get_json_backend("json")
+    response = _stream_response(b"<html>" + b"x" * 5000, content_length=True)
+    spool_response(response, threshold=100)
+    client.post.return_value = response
+
+    with pytest.raises(ValueError) as exc_info:
+        OLAP(client).query_olap({"reportType": "SALES"})
+
+    message = str(exc_info.value)
+    assert "<html>" in message
+    assert len(message) < 300
+
+
+def test_spilled_xml_is_parsed_from_file(mock_base_client) -> None:
+    employees = "".join(f"<employee><id>e-{i}</id><name>Имя {i}</name></employee>" for i in range(200))
+    response = _stream_response(f"<employees>{employees}</employees>".encode())
+    spool_response(response, threshold=256)
+    assert spilled_body(response) is not None
+    mock_base_client.get.return_value = response
+
+    rows = EmployeesEndpoints(mock_base_client).get_employees()
+    records = EmployeesEndpoints(mock_base_client).get_employees(as_records=True)
+
+    assert len(rows) == 200 and rows[199]["name"] == "Имя 199"
+    assert [r.id for r in records] == [f"e-{i}" for i in range(200)]
+
+
+@pytest.mark.filterwarnings("ignore:JSON backend:RuntimeWarning")
+def test_client_streams_and_spools_when_threshold_set(tmp_path) -> None:
+    client = BaseClient("https://iiko.example", "u", "h", spill_threshold=512, spill_dir=str(tmp_path))
+    client.session.post = MagicMock(return_value=_stream_response(BIG_JSON))  # type: ignore[method-assign]
+
+    response = client.post("/resto/api/v2/reports/olap", json={"reportType": "SALES"})
+
+    assert client.session.post.call_args.kwargs["stream"] is True
+    assert spilled_body(response) is not None
+    assert response_json(response, client.json_backend)["data"][0]["DishName"] == "Борщ"
+
+
+def test_negative_threshold_rejected() -> None:
+    with pytest.raises(ValueError, match="spill_threshold"):
+        BaseClient("https://iiko.example", "u", "h", spill_threshold=-1)